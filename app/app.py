@@ -3,13 +3,26 @@ Energy Dashboard API
 This is the entry point that exposes all our logic via HTTP endpoints
 """
 
-from flask import Flask, jsonify, request, render_template
+from flask import Flask, Response, jsonify, request, render_template
 from flask_cors import CORS
 from datetime import datetime, timedelta
+import math
+import os
+import numpy as np
 
 # Import our services and models
 from .services.data_generator import EnergyDataGenerator
-from .services.calculator import EnergyCalculator
+from .services.calculator import EnergyCalculator, EV_ARRIVAL_CHARGE, PERIOD_UNITS
+from .services.reading_store import READING_FIELDS, MappedReadingStore
+from .services.households import Household, HouseholdNotFound, HouseholdRegistry, normalise_household_id
+from .services.ingest import ReadingIngestor, NDJSON_MEDIA_TYPES
+from .services.live_feed import LiveFeed, LiveFeedFull
+from .services.response_cache import ResponseCache
+from .services.downsampling import MIN_POINTS, downsample_buckets
+from .services.ev_scheduler import EVScheduler, next_departure, surplus_forecast
+from .services.tariffs import get_tariff
+from .services.battery import BatterySimulator
+from .services import columnar
 from . import config
 
 # Initialise Flask app
@@ -17,26 +30,247 @@ app = Flask(__name__)
 CORS(app)  # Allow frontend to access this API
 
 # Initialize our services
-data_generator = EnergyDataGenerator()
+data_generator = EnergyDataGenerator(seed=config.DATA_SEED)
 calculator = EnergyCalculator()
+ingestor = ReadingIngestor()
+ev_scheduler = EVScheduler()
 
 # === GLOBAL DATA STORE ===
-# In a real app, this would be a database
-# For learning, we'll store in memory
-historical_readings = []
+# Readings are kept on disk as sorted columns and memory-mapped, so
+# "readings since X" is a binary search rather than a scan of every reading,
+# and all worker processes share the same pages
+historical_readings = None
+
+# The demo home: the readings above plus their hourly/daily/weekly rollups,
+# insight stats and forecast profiles, all kept up to date as readings are added
+demo_household = None
+
+def generate_missing_readings(last_timestamp):
+    """Readings to add at startup: a full history on first run, otherwise fill the gap to now"""
+    if last_timestamp is None:
+        print("🔄 Generating historical data...")
+        return data_generator.generate_historical_data(days=config.HISTORICAL_DAYS)
+    return data_generator.generate_range(last_timestamp + timedelta(microseconds=1))
 
 def initialize_data():
-    """Generate initial historical data on startup"""
-    global historical_readings
-    print("🔄 Generating historical data...")
-    historical_readings = data_generator.generate_historical_data(
-        days=config.HISTORICAL_DAYS
-    )
-    print(f"✅ Generated {len(historical_readings)} readings")
+    """Open the saved history on startup (generating it the first time)"""
+    global historical_readings, demo_household
+    path = config.HISTORY_DIR or os.path.join(app.instance_path, 'energy_history')
+    historical_readings = MappedReadingStore.open(path)
+    historical_readings.top_up(generate_missing_readings)
+    demo_household = Household(None, historical_readings, calculator)
+    print(f"✅ Loaded {len(historical_readings)} readings")
 
-# Generate data when the app starts
+# Load data when the app starts
 initialize_data()
 
+# The demo home answers requests without a ?household= parameter;
+# real homes each have their own partition, named by User.public_id
+households = HouseholdRegistry(
+    config.HOUSEHOLDS_DIR or os.path.join(app.instance_path, 'households'),
+    calculator
+)
+
+# Cache of API responses, scoped by household: new readings for a home drop
+# that home's responses, plus the fleet responses that include it
+FLEET_CACHE_SCOPE = 'fleet'
+
+def cache_scope():
+    """The ?household= a response was computed for (None for the demo home)"""
+    public_id = request.args.get('household')
+    if public_id is None:
+        return None
+    try:
+        return normalise_household_id(public_id)
+    except ValueError:
+        return public_id  # Answered with a 404, which is never cached
+
+def household_changed(public_id, window, reset):
+    """Store listener for every household partition"""
+    response_cache.invalidate(public_id, FLEET_CACHE_SCOPE)
+
+response_cache = ResponseCache(max_entries=config.RESPONSE_CACHE_MAX_ENTRIES, scope=cache_scope)
+historical_readings.subscribe(lambda window, reset: response_cache.invalidate(None))
+households.subscribe(household_changed)
+
+
+@app.before_request
+def refresh_readings():
+    """Pick up readings other worker processes have saved (cheap when nothing changed)"""
+    historical_readings.refresh()
+
+
+def selected_household():
+    """
+    The household named by the ?household=<public_id> query parameter
+    (the demo home if there isn't one)
+    Raises HouseholdNotFound for unknown households
+    """
+    public_id = request.args.get('household')
+    if public_id is None:
+        return demo_household
+    return households.get(public_id)
+
+def selected_max_points():
+    """?max_points= for chart data (None if it isn't a usable number)"""
+    try:
+        max_points = int(request.args.get('max_points', config.CHART_MAX_POINTS))
+    except ValueError:
+        return None
+    return max_points if max_points >= MIN_POINTS else None
+
+def wants_columnar():
+    """Did the client ask for columnar binary frames (Accept: application/vnd.rolsa.columnar)?"""
+    best = request.accept_mimetypes.best_match(['application/json', columnar.MEDIA_TYPE])
+    return best == columnar.MEDIA_TYPE
+
+def columnar_response(columns, headers=None):
+    """
+    Send whole columns as one binary frame (see services/columnar.py)
+    ?float32=true halves the size of the value columns
+    """
+    float32 = request.args.get('float32', '').lower() in ('1', 'true', 'yes')
+    return Response(columnar.encode_frame(columns, float32=float32), mimetype=columnar.MEDIA_TYPE, headers=headers)
+
+def selected_tariff():
+    """The tariff named by ?tariff= (DEFAULT_TARIFF if missing) - None if there's no such tariff"""
+    try:
+        return get_tariff(request.args.get('tariff', config.DEFAULT_TARIFF))
+    except KeyError:
+        return None
+
+def unknown_tariff():
+    """400 response for a ?tariff= we don't have"""
+    return jsonify({
+        'success': False,
+        'error': 'Unknown tariff',
+        'message': f"tariff must be one of: {', '.join(config.TARIFFS)}"
+    }), 400
+
+def selected_numbers(name, default):
+    """Positive numbers from a comma-separated ?name= (`default` if missing) - None if any aren't usable"""
+    if name not in request.args:
+        return list(default)
+    try:
+        numbers = [float(value) for value in request.args[name].split(',')]
+    except ValueError:
+        return None
+    return numbers if all(number > 0 for number in numbers) else None
+
+def selected_number(name, default, minimum, maximum):
+    """A number from ?name= between minimum and maximum (`default` if missing) - None if it isn't one"""
+    if name not in request.args:
+        return default
+    try:
+        number = float(request.args[name])
+    except ValueError:
+        return None
+    return number if minimum <= number <= maximum else None  # NaN fails both checks
+
+def invalid_number(name, minimum, maximum):
+    """400 response for a ?name= that isn't a number in range"""
+    return jsonify({
+        'success': False,
+        'error': f'Invalid {name}',
+        'message': f"{name} must be a number from {minimum:g} to {maximum:g}"
+    }), 400
+
+def selected_count(name, default, minimum, maximum):
+    """A whole number from ?name= between minimum and maximum (`default` if missing) - None if it isn't one"""
+    try:
+        count = int(request.args.get(name, default))
+    except ValueError:
+        return None
+    return count if minimum <= count <= maximum else None
+
+def invalid_count(name, minimum, maximum):
+    """400 response for a ?name= that isn't a whole number in range"""
+    return jsonify({
+        'success': False,
+        'error': f'Invalid {name}',
+        'message': f"{name} must be a whole number from {minimum} to {maximum}"
+    }), 400
+
+def selected_fleet():
+    """Household ids from ?households=id1,id2 (None = every household)"""
+    public_ids = request.args.get('households')
+    if not public_ids:
+        return None
+    return [public_id for public_id in public_ids.split(',') if public_id]
+
+
+# ============================================================================
+# SHARED CALCULATIONS - used by the endpoints and the live feed
+# ============================================================================
+
+DASHBOARD_PERIODS = ('today', 'week', 'month', 'all')
+
+def period_start(period, now=None):
+    """When a dashboard period starts ('all' has no start)"""
+    now = now or datetime.now()
+    if period == 'today':
+        return now.replace(hour=0, minute=0, second=0, microsecond=0)
+    elif period == 'week':
+        return now - timedelta(days=7)
+    elif period == 'month':
+        return now - timedelta(days=30)
+    return None  # 'all'
+
+def dashboard_metrics(period, current_reading=None, household=None, now=None):
+    """
+    Metrics for one dashboard period, including the live reading (if any)
+    Returns (DashboardMetrics, number of readings used)
+    """
+    household = household or demo_household
+    start_time = period_start(period, now)
+    
+    # Period totals come from the rollups (whole days/hours are pre-summed)
+    totals = household.rollups.energy_totals(start_time)
+    readings_count = household.store.count(start_time)
+    if current_reading is not None:
+        current_totals = calculator.energy_totals([current_reading])
+        totals = {field: totals[field] + current_totals[field] for field in totals}
+        readings_count += 1
+    
+    return calculator.metrics_from_totals(totals), readings_count
+
+def chart_data(starts, totals, max_points):
+    """
+    Energy Balance chart rows, downsampled to at most `max_points` buckets
+    Returns (rows, number of buckets before downsampling)
+    """
+    return calculator.buckets_to_dicts(*downsample_buckets(starts, totals, max_points)), len(starts)
+
+def chart_frame(starts, totals, max_points):
+    """The same buckets as chart_data(), as a columnar binary response"""
+    total_points = len(starts)
+    starts, totals = downsample_buckets(starts, totals, max_points)
+    return columnar_response({'period': starts, **totals}, headers={'X-Total-Points': str(total_points)})
+
+def energy_insights(household, now=None):
+    """Suggestions based on today's running stats"""
+    return household.insights.evaluate(now)
+
+def produce_live_update():
+    """One live update, computed once and pushed to every connected dashboard"""
+    historical_readings.refresh()
+    reading = data_generator.generate_current_reading()
+    ev_status = calculator.calculate_ev_charging_status()
+    return {
+        'reading': reading.to_dict(),
+        'metrics': {
+            period: dashboard_metrics(period, reading)[0].to_dict()
+            for period in DASHBOARD_PERIODS
+        },
+        'ev_charging': ev_status.to_dict(),
+        'percentage': ev_status.get_percentage()
+    }
+
+# One producer per process, shared by every open dashboard
+live_feed = LiveFeed(produce_live_update, interval=config.LIVE_UPDATE_SECONDS,
+                     max_subscribers=config.LIVE_MAX_STREAMS)
+historical_readings.subscribe(live_feed.poke)  # Push straight away when readings arrive
+
 
 # ============================================================================
 # API ENDPOINTS - This is how the frontend talks to our backend
@@ -67,6 +301,7 @@ def health_check():
 
 
 @app.route('/api/dashboard', methods=['GET'])
+@response_cache.cached(ttl=config.CACHE_TTL_DASHBOARD)
 def get_dashboard_metrics():
     """
     Get current dashboard metrics
@@ -81,86 +316,88 @@ def get_dashboard_metrics():
     
     Query Parameters:
         period: 'today', 'week', 'month', 'all' (default: 'today')
+        household: a user's public_id (default: the demo home)
     """
     # Get the time period from query parameters
     period = request.args.get('period', 'today')
+    household = selected_household()
     
-    # Filter readings based on period
-    now = datetime.now()
-    if period == 'today':
-        # Get today's readings
-        start_time = now.replace(hour=0, minute=0, second=0, microsecond=0)
-        filtered_readings = [
-            r for r in historical_readings 
-            if r.timestamp >= start_time
-        ]
-    elif period == 'week':
-        start_time = now - timedelta(days=7)
-        filtered_readings = [
-            r for r in historical_readings 
-            if r.timestamp >= start_time
-        ]
-    elif period == 'month':
-        start_time = now - timedelta(days=30)
-        filtered_readings = [
-            r for r in historical_readings 
-            if r.timestamp >= start_time
-        ]
-    else:  # 'all'
-        filtered_readings = historical_readings
-    
-    # Add current reading
-    current_reading = data_generator.generate_current_reading()
-    filtered_readings.append(current_reading)
-    
-    # Calculate metrics
-    metrics = calculator.calculate_dashboard_metrics(filtered_readings)
+    # Add current reading (the demo home is simulated live) and calculate metrics
+    current_reading = data_generator.generate_current_reading() if household is demo_household else None
+    metrics, readings_count = dashboard_metrics(period, current_reading, household)
     
     return jsonify({
         'success': True,
         'period': period,
         'metrics': metrics.to_dict(),
-        'readings_count': len(filtered_readings)
+        'readings_count': readings_count
     })
 
 
 @app.route('/api/energy-balance', methods=['GET'])
+@response_cache.cached(ttl=config.CACHE_TTL_ENERGY_BALANCE, vary=('Accept',))
 def get_energy_balance():
     """
     Get energy balance data for charts
     
     Returns aggregated data for the Energy Balance bar chart
     
+    Send Accept: application/vnd.rolsa.columnar to get the buckets as a
+    columnar binary frame instead of JSON ('period' plus one column per field)
+    
     Test with: http://localhost:5000/api/energy-balance?period=day&days=7
     
     Query Parameters:
         period: 'hour', 'day', 'week' (default: 'day')
-        days: number of days to include (default: 7)
+        days: number of days to include, 1 to CHART_MAX_DAYS (default: 7)
+        max_points: most buckets to return - longer ranges are downsampled
+                    keeping the chart's shape (default: 500)
+        household: a user's public_id (default: the demo home)
+        float32: 'true' to send binary values as float32 (default: float64)
     """
     period = request.args.get('period', 'day')
-    days = int(request.args.get('days', 7))
+    household = selected_household()
+    
+    if period not in PERIOD_UNITS:
+        return jsonify({
+            'success': False,
+            'error': 'Invalid period',
+            'message': f"period must be one of: {', '.join(PERIOD_UNITS)}"
+        }), 400
+    
+    days = selected_count('days', 7, 1, config.CHART_MAX_DAYS)
+    if days is None:
+        return invalid_count('days', 1, config.CHART_MAX_DAYS)
+    
+    max_points = selected_max_points()
+    if max_points is None:
+        return jsonify({
+            'success': False,
+            'error': 'Invalid max_points',
+            'message': f"max_points must be a whole number of at least {MIN_POINTS}"
+        }), 400
     
     # Get readings for the specified time range
     now = datetime.now()
     start_time = now - timedelta(days=days)
     
-    filtered_readings = [
-        r for r in historical_readings 
-        if r.timestamp >= start_time
-    ]
-    
-    # Aggregate by period
-    aggregated_data = calculator.aggregate_by_period(filtered_readings, period)
+    # Aggregate by period (answered from the matching rollup tier)
+    starts, totals = household.rollups.bucket_totals(period, start_time)
+    if wants_columnar():
+        return chart_frame(starts, totals, max_points)
+    aggregated_data, total_points = chart_data(starts, totals, max_points)
     
     return jsonify({
         'success': True,
         'period': period,
         'days': days,
+        'total_points': total_points,
         'data': aggregated_data
     })
 
 
 @app.route('/api/consumption-breakdown', methods=['GET'])
+@response_cache.cached(ttl=config.CACHE_TTL_BREAKDOWN)
 def get_consumption_breakdown():
     """
     Get consumption breakdown by category
@@ -195,6 +432,238 @@ def get_ev_charging_status():
     })
 
 
+@app.route('/api/ev-charging/schedule', methods=['GET'])
+@response_cache.cached(ttl=config.CACHE_TTL_EV_SCHEDULE)
+def get_ev_charging_schedule():
+    """
+    Plan when to charge the EV
+    
+    Uses forecast solar surplus first, then the cheapest grid slots, and
+    only charges in peak hours if there's no other way to hit the target.
+    Returns the charging sessions, where the energy comes from and the
+    projected cost (compared with charging at full power straight away).
+    
+    Test with: http://localhost:5000/api/ev-charging/schedule
+    
+    Query Parameters:
+        level: kWh in the battery now, 0 to EV_BATTERY_SIZE (default: what the car arrives home with)
+        target: kWh wanted by the deadline, 0 to EV_BATTERY_SIZE (default: a full battery)
+        hours: how many hours ahead to plan, one slot to EV_SCHEDULE_MAX_HOURS
+               (default: until EV_DEPARTURE_HOUR)
+        tariff: price grid energy on this tariff (default: DEFAULT_TARIFF)
+        household: a user's public_id (default: the demo home)
+    """
+    now = datetime.now()
+    household = selected_household()
+    tariff = selected_tariff()
+    if tariff is None:
+        return unknown_tariff()
+    
+    battery = config.EV_BATTERY_SIZE
+    level = selected_number('level', battery * EV_ARRIVAL_CHARGE, 0, battery)
+    if level is None:
+        return invalid_number('level', 0, battery)
+    target = selected_number('target', battery, 0, battery)
+    if target is None:
+        return invalid_number('target', 0, battery)
+    min_hours = ev_scheduler.slot_minutes / 60
+    hours = selected_number('hours', None, min_hours, config.EV_SCHEDULE_MAX_HOURS)
+    if hours is None and 'hours' in request.args:
+        return invalid_number('hours', min_hours, config.EV_SCHEDULE_MAX_HOURS)
+    until = now + timedelta(hours=hours) if hours is not None else next_departure(now)
+    
+    slot_starts = ev_scheduler.slots(now, until)
+    surplus = surplus_forecast(household.store, slot_starts, ev_scheduler.slot_minutes)
+    if len(slot_starts):
+        step = np.timedelta64(ev_scheduler.slot_minutes, 'm')
+        rates, _ = tariff.rates_between(slot_starts[0], slot_starts[-1] + step, step)
+    else:
+        rates = np.empty(0)
+    plan = ev_scheduler.plan(slot_starts, surplus, max(target - level, 0.0), rates)
+    
+    return jsonify({
+        'success': True,
+        'until': until.isoformat(),
+        'plan': plan.to_dict()
+    })
+
+
+@app.route('/api/forecast', methods=['GET'])
+@response_cache.cached(ttl=config.CACHE_TTL_FORECAST)
+def get_forecast():
+    """
+    Expected solar production and consumption for the coming hours
+    
+    Read straight from the household's seasonal profiles (hour-of-week
+    averages that favour recent weeks), so no model is fitted per request
+    
+    Test with: http://localhost:5000/api/forecast?hours=48
+    
+    Query Parameters:
+        hours: how many hours ahead, 1 to 72 (default: 24)
+        household: a user's public_id (default: the demo home)
+    """
+    household = selected_household()
+    
+    # Checked before anything is allocated - the profiles are projected hour by hour
+    hours = selected_count('hours', 24, 1, config.FORECAST_MAX_HOURS)
+    if hours is None:
+        return invalid_count('hours', 1, config.FORECAST_MAX_HOURS)
+    
+    hour_starts, expected = household.forecast.forecast(datetime.now(), hours)
+    times = hour_starts.astype('datetime64[s]').astype(datetime).tolist()
+    solar = np.round(expected['solar_production'], 2).tolist()
+    consumption = np.round(expected['consumption'], 2).tolist()
+    
+    return jsonify({
+        'success': True,
+        'hours': hours,
+        'forecast': [
+            {'time': time.isoformat(), 'solar_production': s, 'consumption': c}
+            for time, s, c in zip(times, solar, consumption)
+        ],
+        # Each value is the hour's average kW, so the sums are kWh
+        'totals': {
+            'solar_production': round(float(expected['solar_production'].sum()), 2),
+            'consumption': round(float(expected['consumption'].sum()), 2)
+        }
+    })
+
+
+@app.route('/api/tariff-costs', methods=['GET'])
+@response_cache.cached(ttl=config.CACHE_TTL_TARIFF)
+def get_tariff_costs():
+    """
+    What the household's energy cost on a time-of-use tariff
+    
+    Import cost, export revenue, net cost and what solar saved, priced hour
+    by hour from the hourly rollups (so a month is ~720 lookups, not
+    thousands of readings)
+    
+    Test with: http://localhost:5000/api/tariff-costs?period=month&tariff=economy7
+    
+    Query Parameters:
+        period: 'today', 'week', 'month', 'all' (default: 'month')
+        tariff: a tariff name, or 'all' to compare every tariff (default: DEFAULT_TARIFF)
+        household: a user's public_id (default: the demo home)
+    """
+    period = request.args.get('period', 'month')
+    household = selected_household()
+    
+    if period not in DASHBOARD_PERIODS:
+        return jsonify({
+            'success': False,
+            'error': 'Invalid period',
+            'message': f"period must be one of: {', '.join(DASHBOARD_PERIODS)}"
+        }), 400
+    
+    if request.args.get('tariff') == 'all':
+        tariffs = [get_tariff(name) for name in config.TARIFFS]
+    else:
+        tariff = selected_tariff()
+        if tariff is None:
+            return unknown_tariff()
+        tariffs = [tariff]
+    
+    starts, totals = household.rollups.bucket_totals('hour', period_start(period))
+    
+    return jsonify({
+        'success': True,
+        'period': period,
+        'costs': [tariff.costs(starts, totals).to_dict() for tariff in tariffs]
+    })
+
+
+@app.route('/api/battery/savings', methods=['GET'])
+@response_cache.cached(ttl=config.CACHE_TTL_BATTERY)
+def get_battery_savings():
+    """
+    What a home battery would have saved, for a range of sizes
+
+    Replays the household's last year of readings with each battery added
+    (charging from exported solar, covering imports) and prices the result
+    on the chosen tariff - one savings curve per power rating
+
+    Test with: http://localhost:5000/api/battery/savings?tariff=economy7
+
+    Query Parameters:
+        capacities: comma-separated kWh sizes (default: BATTERY_SWEEP_CAPACITIES)
+        powers: comma-separated kW ratings (default: BATTERY_SWEEP_POWERS)
+                (at most BATTERY_MAX_CONFIGS capacity x power combinations)
+        tariff: a tariff name (default: DEFAULT_TARIFF)
+        household: a user's public_id (default: the demo home)
+    """
+    household = selected_household()
+    tariff = selected_tariff()
+    if tariff is None:
+        return unknown_tariff()
+
+    capacities = selected_numbers('capacities', config.BATTERY_SWEEP_CAPACITIES)
+    powers = selected_numbers('powers', config.BATTERY_SWEEP_POWERS)
+    if not capacities or not powers or len(capacities) * len(powers) > config.BATTERY_MAX_CONFIGS:
+        return jsonify({
+            'success': False,
+            'error': 'Invalid battery sizes',
+            'message': f"capacities and powers must be comma-separated positive numbers, "
+                       f"with at most {config.BATTERY_MAX_CONFIGS} combinations"
+        }), 400
+
+    window = household.store.since(datetime.now() - timedelta(days=config.BATTERY_HISTORY_DAYS))
+    import_rates, export_rates = tariff.rates(window.timestamps)
+    simulator = BatterySimulator(window, calculator.interval_hours, import_rates, export_rates)
+
+    return jsonify({
+        'success': True,
+        'tariff': tariff.name,
+        'days': round(float(simulator.days), 1),
+        'results': [result.to_dict() for result in simulator.sweep(capacities, powers)]
+    })
+
+
+@app.route('/api/solar/sizing', methods=['GET'])
+@response_cache.cached(ttl=config.CACHE_TTL_SOLAR_SIZING)
+def get_solar_sizing():
+    """
+    What-if analysis for different sizes of solar system
+
+    Re-scales the household's last year of solar output to each candidate
+    size and recomputes imports, exports, costs, savings and CO2 for all of
+    them at once (from tables cached per household and tariff)
+
+    Test with: http://localhost:5000/api/solar/sizing?capacities=4,6,8&tariff=economy7
+
+    Query Parameters:
+        capacities: comma-separated kW sizes (default: SOLAR_SIZING_CAPACITIES)
+        installed: kW size of the system that produced the readings (default: MAX_SOLAR_CAPACITY)
+        tariff: a tariff name (default: DEFAULT_TARIFF)
+        household: a user's public_id (default: the demo home)
+    """
+    household = selected_household()
+    tariff = selected_tariff()
+    if tariff is None:
+        return unknown_tariff()
+
+    capacities = selected_numbers('capacities', config.SOLAR_SIZING_CAPACITIES)
+    installed = selected_numbers('installed', [config.MAX_SOLAR_CAPACITY])
+    if not capacities or len(capacities) > config.SOLAR_SIZING_MAX_SIZES or not installed or len(installed) != 1:
+        return jsonify({
+            'success': False,
+            'error': 'Invalid sizes',
+            'message': f"capacities must be up to {config.SOLAR_SIZING_MAX_SIZES} comma-separated "
+                       f"positive numbers, and installed a single positive number"
+        }), 400
+
+    sizing = household.sizing.get(tariff)
+
+    return jsonify({
+        'success': True,
+        'tariff': tariff.name,
+        'installed': installed[0],
+        'days': round(float(sizing.days), 1),
+        'scenarios': [scenario.to_dict() for scenario in sizing.scenarios(capacities, installed[0])]
+    })
+
+
 @app.route('/api/current-reading', methods=['GET'])
 def get_current_reading():
     """
@@ -210,56 +679,334 @@ def get_current_reading():
     })
 
 
+@app.route('/api/readings', methods=['GET'])
+@response_cache.cached(ttl=config.CACHE_TTL_READINGS, vary=('Accept',))
+def get_readings():
+    """
+    Get the raw readings for a time range
+    
+    The JSON is written straight from the stored columns, so even thousands
+    of readings don't create a Python object (or dict) each. With
+    Accept: application/vnd.rolsa.columnar the columns are sent as they
+    are in one binary frame, ready to decode without copying.
+    
+    Test with: http://localhost:5000/api/readings?hours=24
+    
+    Query Parameters:
+        hours: how many hours back to include, up to READINGS_MAX_HOURS (default: 24)
+        household: a user's public_id (default: the demo home)
+        float32: 'true' to send binary values as float32 (default: float64)
+    """
+    hours = selected_number('hours', 24, 0, config.READINGS_MAX_HOURS)
+    if not hours:
+        return jsonify({
+            'success': False,
+            'error': 'Invalid hours',
+            'message': f"hours must be a number above 0 and at most {config.READINGS_MAX_HOURS}"
+        }), 400
+    
+    readings = selected_household().store.since(datetime.now() - timedelta(hours=hours))
+    
+    if wants_columnar():
+        return columnar_response({
+            'timestamp': readings.timestamps,
+            **{field: readings.column(field) for field in READING_FIELDS}
+        })
+    
+    body = '{"success": true, "count": %d, "readings": %s}' % (len(readings), readings.to_json())
+    return Response(body, mimetype='application/json')
+
+
 @app.route('/api/insights', methods=['GET'])
+@response_cache.cached(ttl=config.CACHE_TTL_INSIGHTS)
 def get_energy_insights():
     """
     Get energy insights and recommendations
     
-    This analyses patterns and provides smart suggestions
+    This analyses patterns and provides smart suggestions - each rule in
+    services/insights.py is checked against today's running stats
     
     Test with: http://localhost:5000/api/insights
+    
+    Query Parameters:
+        household: a user's public_id (default: the demo home)
+    """
+    insights = energy_insights(selected_household())
+    
+    return jsonify({
+        'success': True,
+        'insights': insights
+    })
+
+
+@app.route('/api/dashboard/bundle', methods=['GET'])
+@response_cache.cached(ttl=config.CACHE_TTL_DASHBOARD)
+def get_dashboard_bundle():
+    """
+    Everything the dashboard needs for its first paint, in one request
+    
+    Returns the same payloads as /api/dashboard, /api/energy-balance,
+    /api/consumption-breakdown, /api/ev-charging and /api/insights, all
+    computed for the same moment so the cards and charts agree.
+    
+    Test with: http://localhost:5000/api/dashboard/bundle?period=today
+    
+    Query Parameters:
+        period: dashboard period - 'today', 'week', 'month', 'all' (default: 'today')
+        balance_period: chart buckets - 'hour', 'day', 'week' (default: 'day')
+        days: number of days in the chart, 1 to CHART_MAX_DAYS (default: 7)
+        max_points: most chart buckets to return (default: 500)
+        household: a user's public_id (default: the demo home)
     """
-    # Get today's readings
+    period = request.args.get('period', 'today')
+    balance_period = request.args.get('balance_period', 'day')
+    household = selected_household()
+    
+    if balance_period not in PERIOD_UNITS:
+        return jsonify({
+            'success': False,
+            'error': 'Invalid period',
+            'message': f"balance_period must be one of: {', '.join(PERIOD_UNITS)}"
+        }), 400
+    
+    days = selected_count('days', 7, 1, config.CHART_MAX_DAYS)
+    if days is None:
+        return invalid_count('days', 1, config.CHART_MAX_DAYS)
+    
+    max_points = selected_max_points()
+    if max_points is None:
+        return jsonify({
+            'success': False,
+            'error': 'Invalid max_points',
+            'message': f"max_points must be a whole number of at least {MIN_POINTS}"
+        }), 400
+    
     now = datetime.now()
-    start_time = now.replace(hour=0, minute=0, second=0, microsecond=0)
-    today_readings = [
-        r for r in historical_readings 
-        if r.timestamp >= start_time
-    ]
-    
-    # Calculate some insights
-    if today_readings:
-        avg_solar = sum(r.solar_production for r in today_readings) / len(today_readings)
-        avg_consumption = sum(r.consumption for r in today_readings) / len(today_readings)
-        
-        # Generate insights based on data
-        insights = []
-        
-        if avg_solar > avg_consumption:
-            insights.append({
-                'type': 'positive',
-                'title': 'Optimised Usage',
-                'message': f'Your solar panels are generating more than you consume! Average excess: {(avg_solar - avg_consumption):.2f} kW'
-            })
-        
-        if avg_consumption > config.PEAK_CONSUMPTION * 0.8:
-            insights.append({
-                'type': 'warning',
-                'title': 'High Usage',
-                'message': 'Your consumption is approaching peak capacity. Consider scheduling high-power tasks during solar peak hours.'
-            })
+    current_reading = data_generator.generate_current_reading(now) if household is demo_household else None
+    metrics, readings_count = dashboard_metrics(period, current_reading, household, now)
+    ev_status = calculator.calculate_ev_charging_status(now)
+    starts, totals = household.rollups.bucket_totals(balance_period, now - timedelta(days=days), now)
+    balance_data, total_points = chart_data(starts, totals, max_points)
+    
+    return jsonify({
+        'success': True,
+        'dashboard': {
+            'period': period,
+            'metrics': metrics.to_dict(),
+            'readings_count': readings_count
+        },
+        'energy_balance': {
+            'period': balance_period,
+            'days': days,
+            'total_points': total_points,
+            'data': balance_data
+        },
+        'breakdown': calculator.calculate_consumption_breakdown().to_dict(),
+        'ev_charging': ev_status.to_dict(),
+        'percentage': ev_status.get_percentage(),
+        'insights': energy_insights(household, now)
+    })
+
+
+@app.route('/api/stream', methods=['GET'])
+def stream_live_updates():
+    """
+    Live updates pushed to the dashboard (Server-Sent Events)
+    
+    Every few seconds (or as soon as new readings are stored) sends an
+    'update' event with the live reading, metrics for every dashboard
+    period, EV charging status and 'delta' - the change since the last update.
+    
+    Each stream keeps a request thread busy for as long as the dashboard is
+    open, so deploy with threads (e.g. gunicorn -k gthread --threads 300),
+    never sync workers. One process streams to at most LIVE_MAX_STREAMS
+    dashboards; past that we answer 503 with Retry-After, and the dashboard
+    (static/js/main.js) falls back to polling /api/dashboard and
+    /api/ev-charging every 30 seconds instead of streaming.
+    
+    Test with: curl -N http://localhost:5000/api/stream
+    """
+    try:
+        subscriber = live_feed.subscribe()
+    except LiveFeedFull:
+        response = jsonify({
+            'success': False,
+            'error': 'Too many live streams',
+            'message': 'Live updates are at capacity, poll /api/dashboard instead.'
+        })
+        response.status_code = 503
+        response.headers['Retry-After'] = str(config.LIVE_HEARTBEAT_SECONDS)
+        return response
+    
+    response = Response(
+        live_feed.stream(subscriber, heartbeat=config.LIVE_HEARTBEAT_SECONDS),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'  # Stop nginx buffering the stream
+        }
+    )
+    # Free the slot even if the client goes before the stream starts
+    response.call_on_close(lambda: live_feed.unsubscribe(subscriber))
+    return response
+
+
+@app.route('/api/readings/bulk', methods=['POST'])
+def ingest_readings():
+    """
+    Bulk-load real meter readings
+    
+    Accepts thousands of readings per request, validated and saved in batches.
+    Rollups and other derived data are updated as each batch is saved.
+    
+    Body formats (pick with Content-Type):
+        application/x-ndjson: one reading JSON object per line
+        application/vnd.rolsa.columnar: columnar binary frames
+    
+    If writes are falling behind we answer 429 with Retry-After and
+    'resume_from' - the first row that was not saved. If no row could be
+    saved at all we answer 422 with the rejections.
+    
+    Readings for a timestamp the household already has are skipped and
+    counted as 'duplicates', so re-sending a batch after a timeout is safe.
+    
+    Query Parameters:
+        household: a user's public_id - readings go to that household's
+                   partition (default: the demo home). Partitions are only made
+                   for registered users (seed_households.py), never by uploads
+    
+    Test with: curl -X POST -H 'Content-Type: application/x-ndjson' \
+        --data-binary @readings.ndjson http://localhost:5000/api/readings/bulk
+    """
+    content_type = request.mimetype
+    store = selected_household().store
+    
+    if content_type in NDJSON_MEDIA_TYPES:
+        result = ingestor.ingest_ndjson(request.stream, store)
+    elif content_type == columnar.MEDIA_TYPE:
+        try:
+            result = ingestor.ingest_frames(request.get_data(cache=False), store)
+        except columnar.FrameError as error:
+            return jsonify({
+                'success': False,
+                'error': 'Invalid frame',
+                'message': str(error)
+            }), 400
     else:
-        insights = [
-            {
-                'type': 'info',
-                'title': 'No Data',
-                'message': 'Not enough data to generate insights yet.'
-            }
-        ]
+        return jsonify({
+            'success': False,
+            'error': 'Unsupported content type',
+            'message': f"Send {NDJSON_MEDIA_TYPES[0]} or {columnar.MEDIA_TYPE}"
+        }), 415
+    
+    if result.throttled:
+        response = jsonify({
+            'success': False,
+            'error': 'Too many writes',
+            'message': 'Ingestion is falling behind, retry from resume_from later.',
+            **result.to_dict()
+        })
+        response.status_code = 429
+        response.headers['Retry-After'] = str(math.ceil(result.retry_after))
+        return response
+    
+    if not result.accepted and not result.duplicates:
+        return jsonify({
+            'success': False,
+            'error': 'No readings accepted',
+            'message': 'Every row was rejected.' if result.rejected else 'The request had no readings.',
+            **result.to_dict()
+        }), 422
     
     return jsonify({
         'success': True,
-        'insights': insights
+        **result.to_dict()
+    })
+
+
+@app.route('/api/fleet/summary', methods=['GET'])
+@response_cache.cached(ttl=config.CACHE_TTL_FLEET, scope=lambda: FLEET_CACHE_SCOPE)
+def get_fleet_summary():
+    """
+    Totals and metrics across many households (e.g. a region, or the whole fleet)
+    
+    Every household partition is summed separately across a pool of worker
+    processes, then the results are added together.
+    
+    Test with: http://localhost:5000/api/fleet/summary?period=week
+    
+    Query Parameters:
+        period: 'today', 'week', 'month', 'all' (default: 'week')
+        households: comma separated public_ids (default: every household)
+    """
+    period = request.args.get('period', 'week')
+    
+    if period not in DASHBOARD_PERIODS:
+        return jsonify({
+            'success': False,
+            'error': 'Invalid period',
+            'message': f"period must be one of: {', '.join(DASHBOARD_PERIODS)}"
+        }), 400
+    
+    totals, household_count = households.fleet_totals(selected_fleet(), start=period_start(period))
+    
+    return jsonify({
+        'success': True,
+        'period': period,
+        'household_count': household_count,
+        'totals': {field: round(value, 2) for field, value in totals.items()},
+        'metrics': calculator.metrics_from_totals(totals).to_dict()
+    })
+
+
+@app.route('/api/fleet/energy-balance', methods=['GET'])
+@response_cache.cached(ttl=config.CACHE_TTL_FLEET, vary=('Accept',), scope=lambda: FLEET_CACHE_SCOPE)
+def get_fleet_energy_balance():
+    """
+    Energy balance chart data summed across many households
+    (also available as a columnar binary frame, like /api/energy-balance)
+    
+    Test with: http://localhost:5000/api/fleet/energy-balance?period=day&days=7
+    
+    Query Parameters:
+        period: 'hour', 'day', 'week' (default: 'day')
+        days: number of days to include, 1 to CHART_MAX_DAYS (default: 7)
+        max_points: most buckets to return (default: 500)
+        households: comma separated public_ids (default: every household)
+    """
+    period = request.args.get('period', 'day')
+    
+    if period not in PERIOD_UNITS:
+        return jsonify({
+            'success': False,
+            'error': 'Invalid period',
+            'message': f"period must be one of: {', '.join(PERIOD_UNITS)}"
+        }), 400
+    
+    days = selected_count('days', 7, 1, config.CHART_MAX_DAYS)
+    if days is None:
+        return invalid_count('days', 1, config.CHART_MAX_DAYS)
+    
+    max_points = selected_max_points()
+    if max_points is None:
+        return jsonify({
+            'success': False,
+            'error': 'Invalid max_points',
+            'message': f"max_points must be a whole number of at least {MIN_POINTS}"
+        }), 400
+    
+    start_time = datetime.now() - timedelta(days=days)
+    starts, totals = households.fleet_bucket_totals(period, selected_fleet(), start=start_time)
+    if wants_columnar():
+        return chart_frame(starts, totals, max_points)
+    data, total_points = chart_data(starts, totals, max_points)
+    
+    return jsonify({
+        'success': True,
+        'period': period,
+        'days': days,
+        'total_points': total_points,
+        'data': data
     })
 
 
@@ -277,6 +1024,16 @@ def not_found(error):
     }), 404
 
 
+@app.errorhandler(HouseholdNotFound)
+def household_not_found(error):
+    """Handle unknown or malformed ?household= ids"""
+    return jsonify({
+        'success': False,
+        'error': 'Household not found',
+        'message': str(error)
+    }), 404
+
+
 @app.errorhandler(500)
 def internal_error(error):
     """Handle 500 errors"""
@@ -301,8 +1058,19 @@ if __name__ == '__main__':
     print("  - GET /api/energy-balance?period=day&days=7")
     print("  - GET /api/consumption-breakdown")
     print("  - GET /api/ev-charging")
+    print("  - GET /api/ev-charging/schedule")
     print("  - GET /api/current-reading")
+    print("  - GET /api/tariff-costs?period=month&tariff=all")
+    print("  - GET /api/forecast?hours=48")
+    print("  - GET /api/battery/savings?tariff=economy7")
+    print("  - GET /api/solar/sizing?capacities=4,6,8")
+    print("  - GET /api/readings?hours=24")
     print("  - GET /api/insights")
+    print("  - GET /api/dashboard/bundle?period=today")
+    print("  - GET /api/stream")
+    print("  - POST /api/readings/bulk")
+    print("  - GET /api/fleet/summary?period=week")
+    print("  - GET /api/fleet/energy-balance?period=day&days=7")
     print("\n🚀 Starting server on http://localhost:5000")
     print("=" * 60)
     print()
@@ -311,5 +1079,6 @@ if __name__ == '__main__':
     app.run(
         host='0.0.0.0',  # Listen on all interfaces
         port=5000,
-        debug=True  # Enable debug mode for development
+        debug=True,  # Enable debug mode for development
+        threaded=True  # Live streams each hold a connection open
     )
@@ -3,6 +3,8 @@ Configuration file for Energy Dashboard
 This contains all the business rules, rates, and constants
 """
 
+import os
+
 # === ENERGY RATES ===
 # How much you pay/save per kWh
 GRID_RATE = 0.15  # £/kWh - Cost to buy electricity from grid
@@ -37,5 +39,106 @@ PEAK_HOURS_END = 22    # 10 PM
 # But we simplify: (Solar Production × Grid Rate) = Money NOT spent on grid
 # This is the "Cost Savings" metric
 
+# === INSIGHTS ===
+INSIGHT_PEAK_SHARE_WARNING = 0.35  # Warn when more than this share of a day's usage is in peak hours
+INSIGHT_STRONG_SOLAR_SHARE = 0.8  # Celebrate when panels reach this share of MAX_SOLAR_CAPACITY
+INSIGHT_UNEVEN_USAGE_RATIO = 0.75  # Flag days where usage varies more than this × its average
+
 # === DATA GENERATION ===
 HISTORICAL_DAYS = 30  # How many days of historical data to generate
+READING_INTERVAL_MINUTES = 15  # How much time each reading covers
+# Calculation: Energy (kWh) = Power (kW) × Interval (hours)
+DATA_SEED = 42  # Random seed - the same seed always generates the same history
+
+# === PERSISTENT HISTORY ===
+# Readings are saved to disk and memory-mapped, so every worker shares one copy
+# and the history survives restarts. None = <Flask instance folder>/energy_history
+HISTORY_DIR = os.environ.get('ENERGY_HISTORY_DIR')
+
+# === BULK INGESTION ===
+INGEST_BATCH_SIZE = 5000  # Readings validated and written together
+INGEST_MAX_PENDING_BATCHES = 4  # Batches allowed to write at once before clients must back off
+INGEST_WAIT_SECONDS = 2.0  # How long a batch waits for a write slot before we push back
+INGEST_MAX_CLOCK_SKEW_MINUTES = 5  # Readings further in the future than this are rejected
+INGEST_BALANCE_TOLERANCE = 0.05  # kW - allowed error in consumption = solar + import - export
+
+# === LIVE UPDATES ===
+LIVE_UPDATE_SECONDS = 5  # How often the live feed pushes to open dashboards
+LIVE_HEARTBEAT_SECONDS = 15  # Keep-alive comments so proxies don't close idle streams
+# Every open stream holds a request thread for as long as the dashboard is open, so
+# run with threads to match (the dev server is threaded; gunicorn -k gthread --threads 300),
+# never sync workers. Beyond this many per process, /api/stream answers 503 and those
+# dashboards poll /api/dashboard instead
+LIVE_MAX_STREAMS = 256
+
+# === CHARTS ===
+CHART_MAX_POINTS = 500  # Default cap on chart points - longer series are downsampled
+CHART_MAX_DAYS = 366  # Longest chart range a request can ask for
+READINGS_MAX_HOURS = 31 * 24  # Longest range of raw readings a request can ask for
+
+# === RESPONSE CACHE ===
+# Identical API requests are answered from memory until the TTL (seconds)
+# runs out or new readings arrive, whichever comes first
+RESPONSE_CACHE_MAX_ENTRIES = 512
+CACHE_TTL_DASHBOARD = 5  # Includes the live reading, so keep this short
+CACHE_TTL_ENERGY_BALANCE = 60
+CACHE_TTL_BREAKDOWN = 300
+CACHE_TTL_INSIGHTS = 60
+CACHE_TTL_READINGS = 60
+CACHE_TTL_EV_SCHEDULE = 60
+
+# === HOUSEHOLDS ===
+# Each household (User.public_id) gets its own readings partition in this folder
+# None = <Flask instance folder>/households
+HOUSEHOLDS_DIR = os.environ.get('ENERGY_HOUSEHOLDS_DIR')
+FLEET_WORKERS = None  # Worker processes for fleet queries and battery sweeps (None = one per CPU)
+FLEET_PARALLEL_THRESHOLD = 32  # Smaller fleets are summed in-process - not worth starting workers
+CACHE_TTL_FLEET = 60
+
+# === EV CHARGING SCHEDULER ===
+EV_DEPARTURE_HOUR = 7  # 7 AM - the car must be charged by then
+EV_SLOT_MINUTES = 15  # Length of each planning slot
+EV_FORECAST_DAYS = 7  # Days of history averaged to forecast solar surplus
+EV_SCHEDULE_MAX_HOURS = 48  # Longest planning horizon /api/ev-charging/schedule accepts
+
+# === TARIFFS ===
+# Each tariff lists import and export bands: (days, start hour, end hour, £/kWh)
+# days is 'all', 'weekdays' or 'weekends'; later bands override earlier ones
+DEFAULT_TARIFF = 'flat'
+TARIFFS = {
+    'flat': {
+        'import': [('all', 0, 24, GRID_RATE)],
+        'export': [('all', 0, 24, EXPORT_RATE)],
+    },
+    'economy7': {  # Cheap nights
+        'import': [('all', 0, 24, 0.30), ('all', 0, 7, 0.13)],
+        'export': [('all', 0, 24, 0.15)],
+    },
+    'peak-saver': {  # Very cheap small hours, expensive weekday evenings, better export in the afternoon
+        'import': [('all', 0, 24, 0.25), ('all', 0, 5, 0.08), ('weekdays', PEAK_HOURS_START, PEAK_HOURS_END, 0.40)],
+        'export': [('all', 0, 24, 0.12), ('weekdays', 16, 19, 0.25)],
+    },
+}
+TARIFF_CACHE_SIZE = 64  # Rate arrays kept per tariff and date range
+CACHE_TTL_TARIFF = 60
+
+# === FORECAST ===
+FORECAST_HALF_LIFE_DAYS = 14  # Readings this old count half as much in the seasonal profiles
+FORECAST_PRIOR_READINGS = 4  # How strongly a thin hour-of-week profile leans on the hour-of-day one
+FORECAST_MAX_HOURS = 72
+CACHE_TTL_FORECAST = 300
+
+# === HOME BATTERY ===
+BATTERY_ROUND_TRIP_EFFICIENCY = 0.9  # Fraction of stored energy you get back out
+BATTERY_SWEEP_CAPACITIES = (2.5, 5, 7.5, 10, 13.5, 15, 20)  # kWh - sizes on the savings curve
+BATTERY_SWEEP_POWERS = (2.5, 3.68, 5)  # kW - inverter ratings on the savings curve
+BATTERY_HISTORY_DAYS = 365  # Most history replayed per simulation
+BATTERY_PARALLEL_THRESHOLD = 64  # Sweeps with more configurations than this use the worker pool
+BATTERY_MAX_CONFIGS = 256  # Most capacity x power combinations simulated in one request
+CACHE_TTL_BATTERY = 300
+
+# === SOLAR SIZING ===
+SOLAR_SIZING_CAPACITIES = (2, 3, 4, 5, 6, 8, 10, 12, 15)  # kW - system sizes compared by default
+SOLAR_SIZING_HISTORY_DAYS = 365  # Most history re-scaled per household
+SOLAR_SIZING_MAX_SIZES = 1000  # Most sizes scored in one request
+CACHE_TTL_SOLAR_SIZING = 300
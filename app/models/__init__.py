@@ -2,8 +2,18 @@ from app import db, login
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
+import logging
+import random
+import time
+from sqlalchemy import func, insert, update
+from sqlalchemy.exc import IntegrityError
 import uuid
 
+from app.services.energy_use import ENERGY_USE_FIELDS, METRIC_FIELDS
+from app.services.quantile_sketch import KLLSketch
+
+logger = logging.getLogger(__name__)
+
 class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
     public_id = db.Column(db.String(36), unique=True, index=True, default=lambda: str(uuid.uuid4()))
@@ -43,5 +53,214 @@ class Booking(db.Model):
     def __repr__(self):
         return f'<Booking {self.booking_number}>'
 
+# Rows written per commit by EnergyCalculation.save_many()
+ENERGY_CALCULATION_BATCH_SIZE = 500
+
+class EnergyCalculation(db.Model):
+    # One row per /energy-use submission (EnergyUse.gather_data()), so customers keep their history
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    grid_import_kwh = db.Column(db.Float, nullable=False)
+    solar_generation_kwh = db.Column(db.Float, nullable=False)
+    grid_export_kwh = db.Column(db.Float, nullable=False)
+    ev_energy_kwh = db.Column(db.Float, nullable=False)
+    odometer_reading_km = db.Column(db.Float, nullable=False)
+    total_consumption = db.Column(db.Float, nullable=False)
+    home_consumption = db.Column(db.Float, nullable=False)
+    ev_share = db.Column(db.Float, nullable=False)
+    self_consumption = db.Column(db.Float, nullable=False)
+    solar_coverage = db.Column(db.Float, nullable=False)
+    ev_efficiency = db.Column(db.Float, nullable=False)
+    co2_saved = db.Column(db.Float, nullable=False)
+    cost_savings = db.Column(db.Float, nullable=False)
+
+    # Every query below is "one user, a range of dates", which this index answers directly
+    __table_args__ = (db.Index('ix_energy_calculation_user_created', 'user_id', 'created_at'),)
+
+    user = db.relationship('User', backref=db.backref('energy_calculations', lazy='dynamic'))
+
+    @classmethod
+    def from_data(cls, user_id, data, created_at=None):
+        """A row for one gather_data() result"""
+        return cls(user_id=user_id, created_at=created_at or datetime.utcnow(),
+                   **{field: data[field] for field in ENERGY_USE_FIELDS + METRIC_FIELDS})
+
+    @classmethod
+    def save_many(cls, rows, batch_size=ENERGY_CALCULATION_BATCH_SIZE):
+        """
+        Insert many calculations (dicts with user_id, created_at and every gather_data() field),
+        batch_size rows per INSERT and commit. Returns how many rows were saved
+        """
+        saved = 0
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                saved += cls._insert(batch)
+                batch = []
+        if batch:
+            saved += cls._insert(batch)
+        return saved
+
+    @classmethod
+    def _insert(cls, batch):
+        db.session.execute(insert(cls), batch)
+        db.session.commit()
+        return len(batch)
+
+    @classmethod
+    def history(cls, user_id, start=None, end=None):
+        """A user's calculations in [start, end), newest first"""
+        query = cls.query.filter(cls.user_id == user_id)
+        if start is not None:
+            query = query.filter(cls.created_at >= start)
+        if end is not None:
+            query = query.filter(cls.created_at < end)
+        return query.order_by(cls.created_at.desc())
+
+    @classmethod
+    def latest(cls, user_id):
+        return cls.history(user_id).first()
+
+    @classmethod
+    def monthly_trend(cls, user_id, start=None, end=None):
+        """Average of every metric per calendar month in [start, end), oldest month first"""
+        month = _month_of(cls.created_at)
+        query = db.session.query(
+            month.label('month'),
+            func.count(cls.id).label('calculations'),
+            *(func.avg(getattr(cls, field)).label(field) for field in METRIC_FIELDS)
+        ).filter(cls.user_id == user_id)
+        if start is not None:
+            query = query.filter(cls.created_at >= start)
+        if end is not None:
+            query = query.filter(cls.created_at < end)
+        return [
+            {'month': row.month, 'calculations': row.calculations,
+             **{field: round(getattr(row, field), 2) for field in METRIC_FIELDS}}
+            for row in query.group_by(month).order_by(month)
+        ]
+
+    def to_dict(self):
+        return {
+            'created_at': self.created_at.isoformat(),
+            **{field: getattr(self, field) for field in ENERGY_USE_FIELDS + METRIC_FIELDS}
+        }
+
+    def __repr__(self):
+        return f'<EnergyCalculation {self.user_id} {self.created_at}>'
+
+
+# Footprints are compared per category and overall
+FOOTPRINT_BENCHMARKS = ('total', 'food', 'travel', 'home', 'stuff')
+# Don't show percentiles until this many footprints have been submitted
+FOOTPRINT_BENCHMARK_MIN_USERS = 10
+# A submission that another one got to the sketches before is re-read and re-merged,
+# after a random wait of up to FOOTPRINT_BENCHMARK_BACKOFF seconds, for this many seconds
+FOOTPRINT_BENCHMARK_TIMEOUT = 2.0
+FOOTPRINT_BENCHMARK_BACKOFF = 0.02
+
+class _SketchChanged(Exception):
+    """Another submission updated a benchmark sketch after it was read"""
+
+class FootprintBenchmark(db.Model):
+    # One quantile sketch of every footprint submitted so far, per category.
+    # Each submission updates a handful of rows, and percentiles come straight
+    # from the sketches - past submissions are never stored or scanned.
+    # `version` goes up on every update: a submission only writes a sketch if
+    # nobody else has since it was read (row locks do nothing on SQLite)
+    id = db.Column(db.Integer, primary_key=True)
+    category = db.Column(db.String(20), unique=True, nullable=False)
+    sketch = db.Column(db.JSON, nullable=False)
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    @classmethod
+    def record(cls, results):
+        """
+        Add one calculate() result to the sketches and commit. Returns, per category,
+        its percentile (share of submitted footprints below it), the median and the
+        number of footprints - None while there are fewer than FOOTPRINT_BENCHMARK_MIN_USERS.
+        If the sketches stay too busy to update, the submission is left out (and logged)
+        and compared with the footprints already stored
+        """
+        values = {'total': results['total'], **results['breakdown']}
+        # This submission as sketches of its own, merged into whatever is stored when we write
+        submitted = {}
+        for category in FOOTPRINT_BENCHMARKS:
+            submitted[category] = KLLSketch()
+            submitted[category].update(values[category])
+
+        deadline = time.monotonic() + FOOTPRINT_BENCHMARK_TIMEOUT
+        while True:
+            sketches = cls._merge(submitted)
+            if sketches is not None:
+                return cls._compare(sketches, values)
+            if time.monotonic() > deadline:
+                logger.warning("Footprint benchmarks were too busy to record a submission within %.1f seconds",
+                               FOOTPRINT_BENCHMARK_TIMEOUT)
+                stored = {row.category: KLLSketch.from_dict(row.sketch) for row in cls.query}
+                return cls._compare(stored, values)
+            time.sleep(random.uniform(0, FOOTPRINT_BENCHMARK_BACKOFF))
+
+    @classmethod
+    def _merge(cls, submitted):
+        # One attempt at folding the submitted sketches into the stored ones, all in one savepoint.
+        # Returns the merged sketches, or None if another submission changed a row first - then only
+        # the savepoint is rolled back, and whatever else the caller has in the session is kept
+        rows = {row.category: row for row in cls.query.filter(cls.category.in_(submitted))}
+        now = datetime.utcnow()
+        sketches = {}
+        try:
+            with db.session.begin_nested():
+                for category, mine in submitted.items():
+                    row = rows.get(category)
+                    sketch = KLLSketch.from_dict(row.sketch if row else None)
+                    sketch.merge(mine)
+                    sketches[category] = sketch
+                    if row is None:
+                        # Two first submissions can race here; the loser's insert breaks the unique constraint
+                        db.session.add(cls(category=category, sketch=sketch.to_dict(), version=1, updated_at=now))
+                        db.session.flush()
+                        continue
+                    changed = db.session.execute(
+                        update(cls)
+                        .where(cls.id == row.id, cls.version == row.version)
+                        .values(sketch=sketch.to_dict(), version=row.version + 1, updated_at=now)
+                        .execution_options(synchronize_session=False)
+                    )
+                    if changed.rowcount != 1:
+                        raise _SketchChanged(category)
+        except (IntegrityError, _SketchChanged):
+            return None
+        db.session.commit()
+        return sketches
+
+    @staticmethod
+    def _compare(sketches, values):
+        comparison = {}
+        for category in FOOTPRINT_BENCHMARKS:
+            sketch = sketches.get(category)
+            if sketch is None or sketch.count < FOOTPRINT_BENCHMARK_MIN_USERS:
+                comparison[category] = None
+                continue
+            comparison[category] = {
+                'percentile': round(sketch.rank(values[category]) * 100),
+                'median': round(sketch.quantile(0.5), 2),
+                'users': sketch.count,
+            }
+        return comparison
+
+    def __repr__(self):
+        return f'<FootprintBenchmark {self.category}>'
+
+
+def _month_of(column):
+    # 'YYYY-MM' for a timestamp column, in whichever SQL dialect we're running on
+    if db.engine.dialect.name == 'postgresql':
+        return func.to_char(column, 'YYYY-MM')
+    return func.strftime('%Y-%m', column)
+
 # Import other models so they are available via app.models
 from .energy_data import EnergyReading, DashboardMetrics, ConsumptionBreakdown, EVChargingStatus
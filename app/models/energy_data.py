@@ -7,11 +7,15 @@ from datetime import datetime
 from dataclasses import dataclass, asdict
 from typing import List, Dict
 
-@dataclass
+@dataclass(slots=True)
 class EnergyReading:
     """
     A single energy reading at a point in time
     Think of this like a row in a database table
+    
+    slots=True means there's no per-reading __dict__, so each one is much smaller.
+    For thousands of readings use a ReadingWindow (services/reading_store.py)
+    instead - it keeps them as columns and serialises them in bulk
     """
     timestamp: datetime  # When was this reading taken?
     solar_production: float  # kW - How much solar energy being produced
@@ -87,5 +91,80 @@ class EVChargingStatus:
     
     def get_percentage(self) -> int:
         """Calculate charge level as percentage"""
-        from config import EV_BATTERY_SIZE
+        from ..config import EV_BATTERY_SIZE
         return int((self.current_charge_level / EV_BATTERY_SIZE) * 100)
+
+
+@dataclass
+class ChargingPlan:
+    """
+    A planned EV charging session from the EV scheduler
+    Sessions are the stretches of time the charger should be on
+    """
+    energy_needed: float  # kWh - To reach the target charge
+    energy_planned: float  # kWh - What the plan delivers before the deadline
+    solar_energy: float  # kWh - Taken from forecast solar surplus
+    grid_energy: float  # kWh - Bought from the grid
+    peak_energy: float  # kWh - Bought in peak hours (only when nothing else is left)
+    projected_cost: float  # £ - Cost of the grid energy
+    cost_if_charged_now: float  # £ - Cost of plugging in and charging at full power straight away
+    sessions: List[Dict]  # start, end, energy (kWh), solar_energy (kWh)
+    
+    def to_dict(self):
+        """Convert to dictionary for JSON"""
+        return asdict(self)
+
+
+@dataclass
+class TariffCosts:
+    """
+    What a period of energy use costs on one tariff
+    """
+    tariff: str  # Tariff name (see TARIFFS in config)
+    import_cost: float  # £ - Paid for energy bought from the grid
+    export_revenue: float  # £ - Earned from energy sold back
+    net_cost: float  # £ - Import cost minus export revenue
+    cost_without_solar: float  # £ - If every kWh consumed had come from the grid
+    savings: float  # £ - What solar saved: cost without solar minus net cost
+    
+    def to_dict(self):
+        """Convert to dictionary for JSON"""
+        return asdict(self)
+
+
+@dataclass
+class BatterySimulation:
+    """
+    What one home battery would have done over a household's reading history
+    """
+    capacity: float  # kWh - Usable battery capacity
+    power: float  # kW - Maximum charge/discharge rate
+    energy_stored: float  # kWh - Solar surplus put into the battery (no longer exported)
+    energy_supplied: float  # kWh - Delivered to the home (no longer imported)
+    cycles: float  # Full charge/discharge cycles
+    savings: float  # £ - Import avoided minus export income lost, over the history
+    annual_savings: float  # £ - Savings scaled to a year
+    
+    def to_dict(self):
+        """Convert to dictionary for JSON"""
+        return asdict(self)
+
+
+@dataclass
+class SolarSizingScenario:
+    """
+    How a household's history would have looked with a different size of solar system
+    """
+    capacity: float  # kW - Candidate system size
+    solar_production: float  # kWh - Solar generated
+    grid_import: float  # kWh - Energy bought from grid
+    grid_export: float  # kWh - Energy sold back
+    self_consumption: float  # kWh - Solar used at home
+    net_cost: float  # £ - Import cost minus export income
+    savings: float  # £ - Compared with having no solar at all
+    annual_savings: float  # £ - Savings scaled to a year
+    co2_offset: float  # kg - CO2 emissions prevented
+    
+    def to_dict(self):
+        """Convert to dictionary for JSON"""
+        return asdict(self)
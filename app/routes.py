@@ -1,12 +1,15 @@
-from flask import render_template, request, flash, redirect, url_for, session
+from flask import render_template, request, flash, redirect, url_for, session, jsonify, Response
 from app import app, db
 from app.forms import EnergyUseForm, LoginForm, RegistrationForm, BookingForm, ProfileForm
 from flask_login import current_user, login_user, logout_user, login_required
-from app.models import User, Booking
+from app.models import User, Booking, EnergyCalculation, FootprintBenchmark
+from datetime import datetime
 from urllib.parse import urlparse
+import io
+import math
 import uuid
 
-from app.services.energy_use import EnergyUse
+from app.services.energy_use import EnergyUse, EnergyUseBatch, ENERGY_USE_FIELDS
 from app.services.articles import get_all_articles, get_article_by_slug, get_related_articles
 
 @app.route('/book', methods=['GET', 'POST'])
@@ -122,14 +125,61 @@ def energy_use():
         submitted_data = energy_calc.gather_data()
         session['energy_data'] = submitted_data
         
-        # Save to user profile if logged in
+        # Save to user profile (and their history) if logged in
         if current_user.is_authenticated:
             current_user.latest_energy_calculation = submitted_data
+            db.session.add(EnergyCalculation.from_data(current_user.id, submitted_data))
             db.session.commit()
             
         return render_template('energy-use.html', form=form, submitted_data=submitted_data)
     return render_template('energy-use.html', form=form)
 
+@app.route('/energy-use/history')
+@login_required
+def energy_use_history():
+    # The user's saved calculations (newest first) and their month-by-month averages.
+    # Optional ?start= and ?end= are ISO dates; ?limit= caps how many calculations are listed
+    try:
+        start = datetime.fromisoformat(request.args['start']) if 'start' in request.args else None
+        end = datetime.fromisoformat(request.args['end']) if 'end' in request.args else None
+        limit = min(int(request.args.get('limit', 100)), 1000)
+        if limit < 1:
+            raise ValueError("limit must be positive")
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Invalid range',
+                        'message': 'start and end must be ISO dates and limit a positive whole number'}), 400
+
+    calculations = EnergyCalculation.history(current_user.id, start, end).limit(limit)
+    return jsonify({
+        'success': True,
+        'calculations': [calculation.to_dict() for calculation in calculations],
+        'trend': EnergyCalculation.monthly_trend(current_user.id, start, end)
+    })
+
+@app.route('/energy-use/batch', methods=['POST'])
+@login_required
+def energy_use_batch():
+    # Many households at once: an uploaded CSV ("file"), a text/csv body, or JSON with one
+    # array per input field. Results are streamed back as CSV, one row per household.
+    try:
+        if 'file' in request.files:
+            batch = EnergyUseBatch.from_csv(io.TextIOWrapper(request.files['file'].stream, encoding='utf-8-sig'))
+        elif request.is_json:
+            data = request.get_json()
+            if not isinstance(data, dict):
+                raise ValueError("Expected a JSON object with one array per input field")
+            missing = [field for field in ENERGY_USE_FIELDS if field not in data]
+            if missing:
+                raise ValueError(f"Missing fields: {', '.join(missing)}")
+            batch = EnergyUseBatch(ids=data.get('id'), **{field: data[field] for field in ENERGY_USE_FIELDS})
+        else:
+            batch = EnergyUseBatch.from_csv(request.get_data(as_text=True).splitlines())
+    except (ValueError, TypeError) as e:
+        return jsonify({'success': False, 'error': 'Invalid energy use data', 'message': str(e)}), 400
+
+    return Response(batch.iter_csv(), mimetype='text/csv',
+                    headers={'Content-Disposition': 'attachment; filename=energy_use_results.csv'})
+
 @app.route('/dashboard')
 def dashboard():
     data = session.get('energy_data')
@@ -191,6 +241,8 @@ def carbon_footprint():
         # Calculate
         calculator = CarbonFootprintCalculator(data)
         footprint_results = calculator.calculate()
+        # How it compares with everyone who's used the calculator (this submission included)
+        benchmarks = FootprintBenchmark.record(footprint_results)
 
         submitted_data = form.data
         if 'Neither' in submitted_data.get('travel_mode', ''):
@@ -199,9 +251,100 @@ def carbon_footprint():
         submitted_data.pop('csrf_token', None)
         submitted_data.pop('submit_footprint', None)
         
-        return render_template('carbon_footprint.html', form=form, submitted_data=submitted_data, footprint_results=footprint_results)
+        return render_template('carbon_footprint.html', form=form, submitted_data=submitted_data, footprint_results=footprint_results, benchmarks=benchmarks)
     return render_template('carbon_footprint.html', form=form)
 
+# Where each CarbonFootprintForm answer goes in the calculator's input (as built above),
+# for the what-if API. house_type isn't used by the calculator, so it's left out.
+FOOTPRINT_QUESTIONS = {
+    ("food", "diet_type"): "diet",
+    ("food", "eating_out_spend_per_week"): "food_spend",
+    ("food", "waste_percentage"): "food_waste",
+    ("food", "local_sourcing"): "local_food",
+    ("travel", "general_vehicle"): "travel_mode",
+    ("travel", "specific_vehicle"): "vehicle_type",
+    ("travel", "car_hours_per_week"): "car_hours",
+    ("travel", "train_hours_per_week"): "train_hours",
+    ("travel", "bus_hours_per_week"): "bus_hours",
+    ("travel", "flights", "domestic"): "flight_domestic",
+    ("travel", "flights", "europe"): "flight_europe",
+    ("travel", "flights", "long_haul"): "flight_outside_europe",
+    ("travel", "flight_offset_percentage"): "flight_offset",
+    ("home", "bedrooms"): "bedrooms",
+    ("home", "people_count"): "occupants",
+    ("home", "heating_source"): "heating_type",
+    ("home", "green_tariff"): "green_tariff",
+    ("home", "lights_off"): "regular_turn_off",
+    ("home", "winter_temp"): "winter_temp",
+    ("home", "improvements"): "efficiency_improvements",
+    ("stuff", "purchases"): "new_household_items",
+    ("stuff", "clothes_spend"): "clothes_spend",
+    ("stuff", "pet_spend"): "pet_spend",
+    ("stuff", "beauty_spend"): "health_spend",
+    ("stuff", "contracts_spend"): "contract_spend",
+    ("stuff", "hobbies_spend"): "entertainment_spend",
+    ("stuff", "recycling"): "recycling",
+}
+# Flight counts aren't a list of choices; try every count up to this many
+MAX_WHAT_IF_FLIGHTS = 10
+MULTI_CHOICE_QUESTIONS = {("home", "improvements"), ("stuff", "purchases"), ("stuff", "recycling")}
+
+def footprint_alternatives(field):
+    """The answers the form offers for one question (without the 'Select...' placeholder)"""
+    kwargs = getattr(CarbonFootprintForm, field).kwargs
+    if 'choices' not in kwargs:
+        return list(range(MAX_WHAT_IF_FLIGHTS + 1))
+    return [value for value, _ in kwargs['choices'] if value]
+
+FOOTPRINT_ALTERNATIVES = {path: footprint_alternatives(field) for path, field in FOOTPRINT_QUESTIONS.items()}
+
+def footprint_answer_error(data):
+    """What's wrong with the first answer the form couldn't have sent, or None if they're all fine"""
+    for path, alternatives in FOOTPRINT_ALTERNATIVES.items():
+        section = data.get(path[0], {})
+        for key in path[1:-1]:
+            section = section.get(key, {})
+            if not isinstance(section, dict):
+                return f"'{key}' must be an object"
+        if path[-1] not in section:
+            continue  # Unanswered questions take the calculator's defaults
+        answer = section[path[-1]]
+        if path in MULTI_CHOICE_QUESTIONS:
+            if not isinstance(answer, list) or any(option not in alternatives for option in answer):
+                return f"'{path[-1]}' must be a list of the questionnaire's options"
+        elif 'choices' not in getattr(CarbonFootprintForm, FOOTPRINT_QUESTIONS[path]).kwargs:
+            # Counts (flights) - any whole or decimal number from 0 up
+            if isinstance(answer, bool) or not isinstance(answer, (int, float)) or not 0 <= answer < math.inf:
+                return f"'{path[-1]}' must be a number, 0 or more"
+        elif answer not in alternatives:
+            return f"'{path[-1]}' must be one of the questionnaire's answers"
+    return None
+
+@app.route('/carbon-footprint/sensitivity', methods=['POST'])
+def carbon_footprint_sensitivity():
+    # What-if: for every question, the footprint with each other answer and the change from today's.
+    # The body is the calculator's input as JSON (food/travel/home/stuff, as carbon_footprint() builds it)
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not all(isinstance(data.get(category, {}), dict) for category in ('food', 'travel', 'home', 'stuff')):
+        return jsonify({'success': False, 'error': 'Invalid footprint data',
+                        'message': 'Send the questionnaire as a JSON object with food, travel, home and stuff sections'}), 400
+
+    # Multi-choice answers are lists, even when nothing was ticked
+    for category, key in MULTI_CHOICE_QUESTIONS:
+        data.setdefault(category, {}).setdefault(key, [])
+
+    # Every answer must be one the questionnaire offers (so the calculator can score it)
+    error = footprint_answer_error(data)
+    if error is not None:
+        return jsonify({'success': False, 'error': 'Invalid footprint answer', 'message': error}), 400
+
+    calculator = CarbonFootprintCalculator(data)
+    questions = calculator.sensitivity(FOOTPRINT_ALTERNATIVES)
+    for question, field in zip(questions, FOOTPRINT_QUESTIONS.values()):
+        question['field'] = field
+
+    return jsonify({'success': True, **calculator.calculate(), 'questions': questions})
+
 
 
 @app.route('/resources/<slug>')
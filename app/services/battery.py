@@ -0,0 +1,123 @@
+"""
+Home Battery Simulator for Energy Dashboard
+Replays a household's readings with a battery added, to show what it would save
+
+At every reading the battery charges from solar surplus that would have
+been exported, and discharges to cover energy that would have been
+imported, limited by its capacity and power and losing a little energy
+on the way in and out. Time has to be stepped through in order (each
+step depends on the charge left by the last), but every step updates all
+the battery configurations at once, and big sweeps are split across the
+worker pool.
+"""
+
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from .. import config
+from ..models.energy_data import BatterySimulation
+from .reading_store import ReadingWindow
+from .workers import chunked, pool_map
+
+
+def simulate(surplus: np.ndarray, deficit: np.ndarray, capacities: np.ndarray, powers: np.ndarray,
+             interval_hours: float, import_rates: np.ndarray, export_rates: np.ndarray,
+             efficiency: float = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Step batteries through time
+    surplus, deficit: kWh exported/imported at each reading without a battery
+    capacities, powers: one entry per battery configuration (kWh, kW)
+    import_rates, export_rates: £/kWh at each reading
+    Returns (kWh taken from surplus, kWh supplied to the home, £ saved) per configuration -
+    totals are kept while stepping, so memory doesn't grow with readings x configurations
+    """
+    efficiency = config.BATTERY_ROUND_TRIP_EFFICIENCY if efficiency is None else efficiency
+    leg = efficiency ** 0.5  # Half the losses going in, half coming out
+    capacities = np.asarray(capacities, dtype=np.float64)
+    max_energy = np.asarray(powers, dtype=np.float64) * interval_hours
+
+    stored = np.zeros(len(capacities))
+    supplied = np.zeros(len(capacities))
+    savings = np.zeros(len(capacities))
+    charge = np.zeros(len(capacities))
+    energy = np.empty(len(capacities))
+    step = np.empty(len(capacities))
+
+    # Readings with neither surplus nor demand on the grid leave the battery alone
+    for t in np.flatnonzero((surplus > 0) | (deficit > 0)).tolist():
+        if surplus[t] > 0:
+            np.subtract(capacities, charge, out=energy)
+            energy /= leg
+            np.minimum(energy, max_energy, out=energy)
+            np.minimum(energy, surplus[t], out=energy)
+            stored += energy
+            np.multiply(energy, export_rates[t], out=step)  # Export income given up
+            savings -= step
+            np.multiply(energy, leg, out=step)
+            charge += step
+        if deficit[t] > 0:
+            np.multiply(charge, leg, out=energy)
+            np.minimum(energy, max_energy, out=energy)
+            np.minimum(energy, deficit[t], out=energy)
+            supplied += energy
+            np.multiply(energy, import_rates[t], out=step)  # Import cost avoided
+            savings += step
+            np.divide(energy, leg, out=step)
+            charge -= step
+    return stored, supplied, savings
+
+
+class BatterySimulator:
+    """Savings estimates for one household's history, for any number of battery configurations"""
+
+    def __init__(self, readings: ReadingWindow, interval_hours: float, import_rates: np.ndarray,
+                 export_rates: np.ndarray, efficiency: float = None):
+        self.surplus = readings.grid_export * interval_hours
+        self.deficit = readings.grid_import * interval_hours
+        self.interval_hours = interval_hours
+        self.import_rates = import_rates
+        self.export_rates = export_rates
+        self.efficiency = config.BATTERY_ROUND_TRIP_EFFICIENCY if efficiency is None else efficiency
+        span = (readings.timestamps[-1] - readings.timestamps[0]) if len(readings) else np.timedelta64(0)
+        self.days = max(span / np.timedelta64(1, 'D') + interval_hours / 24, interval_hours / 24)
+
+    def sweep(self, capacities: Sequence[float], powers: Sequence[float]) -> List[BatterySimulation]:
+        """Simulate every capacity x power combination - a savings curve per power rating"""
+        grid = [(float(capacity), float(power)) for power in powers for capacity in capacities]
+        return self.run(grid)
+
+    def run(self, batteries: List[Tuple[float, float]]) -> List[BatterySimulation]:
+        """Simulate (capacity, power) pairs, across the worker pool if there are many"""
+        if len(batteries) <= config.BATTERY_PARALLEL_THRESHOLD:
+            return self._run(batteries)
+        # Every chunk steps through the whole history, so one chunk per worker
+        chunks = chunked(batteries, chunks_per_worker=1)
+        results = pool_map(_run_chunk, [self] * len(chunks), chunks)
+        return [result for chunk in results for result in chunk]
+
+    def _run(self, batteries: List[Tuple[float, float]]) -> List[BatterySimulation]:
+        if not batteries:
+            return []
+        capacities, powers = (np.array(values) for values in zip(*batteries))
+        stored_totals, supplied_totals, savings = simulate(
+            self.surplus, self.deficit, capacities, powers, self.interval_hours,
+            self.import_rates, self.export_rates, self.efficiency)
+        return [
+            BatterySimulation(
+                capacity=capacity,
+                power=power,
+                energy_stored=round(float(stored_total), 2),
+                energy_supplied=round(float(supplied_total), 2),
+                cycles=round(float(supplied_total / capacity), 1) if capacity else 0.0,
+                savings=round(float(saving), 2),
+                annual_savings=round(float(saving * 365 / self.days), 2),
+            )
+            for capacity, power, stored_total, supplied_total, saving
+            in zip(capacities.tolist(), powers.tolist(), stored_totals, supplied_totals, savings)
+        ]
+
+
+def _run_chunk(simulator: BatterySimulator, batteries):
+    """Worker task - the simulator (a few arrays) is pickled across to the worker"""
+    return simulator._run(batteries)
@@ -0,0 +1,168 @@
+"""
+Energy Calculator for Energy Dashboard
+Turns raw readings into the numbers shown on the dashboard
+
+Every calculation works on whole NumPy columns at once (sums, group-by-bucket
+reductions), so there are no per-reading Python loops even for millions of readings
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from .. import config
+from ..models.energy_data import DashboardMetrics, ConsumptionBreakdown, EVChargingStatus
+from .reading_store import READING_FIELDS, as_window
+
+# Periods we can group readings by, and the NumPy unit for each bucket
+PERIOD_UNITS = {
+    'hour': 'h',
+    'day': 'D',
+    'week': 'D',  # Weeks are built from days so that they start on a Monday
+}
+
+# Typical household split, used until we meter circuits individually
+DEFAULT_BREAKDOWN = {
+    'ev_charging': 30.0,
+    'hvac': 35.0,
+    'appliances': 25.0,
+    'lighting': 10.0,
+}
+
+HOURS_PER_WEEK = 7 * 24
+
+# The simulated EV arrives home with this fraction of its battery left
+EV_ARRIVAL_CHARGE = 0.2
+
+
+def bucket_starts(timestamps: np.ndarray, period: str) -> np.ndarray:
+    """
+    Round every timestamp down to the start of its hour/day/week
+    Returns datetime64 values, one per timestamp
+    """
+    if period not in PERIOD_UNITS:
+        raise ValueError(f"Unknown period '{period}', expected one of {', '.join(PERIOD_UNITS)}")
+    buckets = timestamps.astype(f'datetime64[{PERIOD_UNITS[period]}]')
+    if period == 'week':
+        # 1970-01-01 was a Thursday, so shift by 3 days to make Monday day 0
+        days = buckets.astype(np.int64)
+        buckets = (days - (days + 3) % 7).astype('datetime64[D]')
+    return buckets
+
+
+def hour_of_week(timestamps: np.ndarray) -> np.ndarray:
+    """0 for Monday 00:00-01:00 up to 167 for Sunday 23:00-24:00"""
+    hours = timestamps.astype('datetime64[h]').astype(np.int64)
+    return (hours + 3 * 24) % HOURS_PER_WEEK  # 1970-01-01 was a Thursday
+
+
+class EnergyCalculator:
+    """
+    All the dashboard maths in one place
+    Methods accept a ReadingWindow, a ReadingStore or a plain list of EnergyReadings
+    """
+
+    def __init__(self, interval_minutes: float = None):
+        # Readings are power (kW) samples; each one stands for this much time
+        if interval_minutes is None:
+            interval_minutes = config.READING_INTERVAL_MINUTES
+        self.interval_hours = interval_minutes / 60.0
+
+    # === TOTALS ===
+
+    def energy_totals(self, readings) -> Dict[str, float]:
+        """Total energy (kWh) for each reading field"""
+        window = as_window(readings)
+        return {
+            field: float(np.sum(getattr(window, field))) * self.interval_hours
+            for field in READING_FIELDS
+        }
+
+    def calculate_dashboard_metrics(self, readings) -> DashboardMetrics:
+        """Calculate the four dashboard cards (plus grid totals) for some readings"""
+        return self.metrics_from_totals(self.energy_totals(readings))
+
+    def metrics_from_totals(self, totals: Dict[str, float]) -> DashboardMetrics:
+        """Turn energy totals (kWh per field) into dashboard metrics"""
+        solar = totals['solar_production']
+        return DashboardMetrics(
+            total_consumption=round(totals['consumption'], 2),
+            solar_production=round(solar, 2),
+            # Every kWh of solar is a kWh we didn't buy from the grid
+            cost_savings=round(solar * config.GRID_RATE, 2),
+            co2_offset=round(solar * config.CO2_OFFSET_FACTOR, 2),
+            grid_import=round(totals['grid_import'], 2),
+            grid_export=round(totals['grid_export'], 2),
+        )
+
+    # === GROUPING ===
+
+    def bucket_totals(self, readings, period: str = 'day') -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Sum energy (kWh) per hour/day/week bucket
+        Returns (bucket start times, {field: totals per bucket})
+
+        Readings are sorted, so each bucket is one contiguous run; we find where
+        the runs start and reduce every column with a single np.add.reduceat.
+        """
+        window = as_window(readings)
+        buckets = bucket_starts(window.timestamps, period)
+        if not len(buckets):
+            return buckets, {field: np.empty(0) for field in READING_FIELDS}
+
+        run_starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        totals = {
+            field: np.add.reduceat(getattr(window, field), run_starts) * self.interval_hours
+            for field in READING_FIELDS
+        }
+        return buckets[run_starts], totals
+
+    def aggregate_by_period(self, readings, period: str = 'day') -> List[dict]:
+        """
+        Group readings into hour/day/week buckets for the Energy Balance chart
+        Each bucket reports total kWh per field
+        """
+        starts, totals = self.bucket_totals(readings, period)
+        return self.buckets_to_dicts(starts, totals)
+
+    @staticmethod
+    def buckets_to_dicts(starts: np.ndarray, totals: Dict[str, np.ndarray]) -> List[dict]:
+        """Convert bucket arrays into the JSON rows the chart expects"""
+        periods = starts.astype('datetime64[s]').astype(datetime).tolist()
+        rounded = [np.round(totals[field], 2).tolist() for field in READING_FIELDS]
+        return [
+            {'period': period.isoformat(), **dict(zip(READING_FIELDS, values))}
+            for period, *values in zip(periods, *rounded)
+        ]
+
+    # === STATIC ESTIMATES ===
+
+    def calculate_consumption_breakdown(self) -> ConsumptionBreakdown:
+        """Percentage split of household consumption by category"""
+        breakdown = ConsumptionBreakdown(**DEFAULT_BREAKDOWN)
+        breakdown.validate()
+        return breakdown
+
+    def calculate_ev_charging_status(self, now: datetime = None) -> EVChargingStatus:
+        """
+        Simulated EV charging session
+        The car plugs in when the evening peak starts and charges at full power
+        """
+        now = now or datetime.now()
+        plug_in = now.replace(hour=config.PEAK_HOURS_START, minute=0, second=0, microsecond=0)
+        if plug_in > now:
+            plug_in -= timedelta(days=1)
+        hours_charging = (now - plug_in).total_seconds() / 3600
+
+        target = float(config.EV_BATTERY_SIZE)
+        level = min(target, target * EV_ARRIVAL_CHARGE + config.EV_CHARGING_POWER * hours_charging)
+        remaining = target - level
+
+        return EVChargingStatus(
+            current_charge_level=round(level, 2),
+            target_charge=target,
+            charging_power=config.EV_CHARGING_POWER if remaining > 0 else 0.0,
+            time_to_complete=round(remaining / config.EV_CHARGING_POWER, 2),
+            cost_estimate=round(remaining * config.GRID_RATE, 2),
+        )
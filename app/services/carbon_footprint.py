@@ -1,4 +1,16 @@
 import json
+from functools import lru_cache
+from itertools import repeat
+
+import numpy as np
+
+# Answer combinations remembered per footprint category
+CATEGORY_CACHE_SIZE = 4096
+
+
+class FootprintInputError(ValueError):
+    """Raised when questionnaire answers are not in a shape that can be scored"""
+
 
 class CarbonFootprintCalculator:
 
@@ -149,13 +161,27 @@ class CarbonFootprintCalculator:
         }
     }
 
-    def __init__(self, data: dict):
+    # The tables above compiled into arrays for calculate_many() (built below the class)
+    _TABLES = None
+
+    def __init__(self, data: dict, cached: bool = True):
         self._data = data
         self._results = {}
+        # One-off calculators (the what-ifs in sensitivity()) skip the category caches
+        self._cached = cached
         self._validate_inputs()
 
     def _validate_inputs(self):
         """Ensures people_count and bedrooms are converted to floats to prevent TypeError."""
+        # Sections (and the flight counts) must be dicts, or there is nothing to look answers up in
+        if not isinstance(self._data, dict):
+            raise FootprintInputError("Footprint data must be a dict")
+        for category in _CATEGORIES:
+            if not isinstance(self._data.get(category, {}), dict):
+                raise FootprintInputError(f"'{category}' answers must be a dict")
+        if not isinstance(self._data.get("travel", {}).get("flights", {}), dict):
+            raise FootprintInputError("'flights' must be a dict of trip counts")
+
         # Validate Home Inputs
         home_inputs = self._data.get("home", {})
         
@@ -197,29 +223,196 @@ class CarbonFootprintCalculator:
         }
         return self._results
 
-    def _get_mapped_value(self, category: str, key: str, default=0.0):
+    def sensitivity(self, questions: dict) -> list:
+        """
+        What-if: how the total changes with each alternative answer to each question.
+        `questions` maps where an answer lives in the input data, e.g. ("food", "diet_type")
+        or ("travel", "flights", "domestic"), to the answers to try. Multi-choice answers
+        (lists) try each option the other way round (ticked if it isn't, unticked if it is).
+        Only the question's own category is recalculated; the other three are reused.
+        """
+        base = {category: getattr(self, method)() for category, method in _CATEGORY_METHODS.items()}
+        base_total = round(sum(base.values()), 2)
+
+        results = []
+        for path, answers in questions.items():
+            category = path[0]
+            current = _answer_at(self._data, path)
+            alternatives = []
+            for answer in answers:
+                if isinstance(current, list):
+                    ticked = answer not in current
+                    new_answer = [option for option in current if option != answer] + ([answer] if ticked else [])
+                    # Keep ticked boxes in the order they're offered, as the form sends them
+                    new_answer.sort(key=lambda option: answers.index(option) if option in answers else len(answers))
+                elif answer == current:
+                    continue
+                else:
+                    new_answer = answer
+
+                what_if = CarbonFootprintCalculator(_with_answer(self._data, path, new_answer), cached=False)
+                changed = getattr(what_if, _CATEGORY_METHODS[category])()
+                total = round(sum(changed if name == category else value for name, value in base.items()), 2)
+                alternative = {"answer": answer, "total": total, "change": round(total - base_total, 2)}
+                if isinstance(current, list):
+                    alternative["ticked"] = ticked
+                alternatives.append(alternative)
+
+            results.append({"category": category, "question": path[-1], "current": current,
+                            "alternatives": alternatives})
+        return results
+
+    @classmethod
+    def calculate_many(cls, questionnaires) -> list:
+        """
+        calculate() for many questionnaires at once - same results, one dict each.
+        The maths runs once over whole arrays (see score_many); only the final
+        rounding is per questionnaire, so it matches calculate() exactly.
+        """
+        scores = cls.score_many(questionnaires)
+        # Same rounding as calculate(): each category to 4 places, then to 2 for display
+        categories = [_round(scores[category], 4) for category in _CATEGORIES]
+        totals = _round(categories[0] + categories[1] + categories[2] + categories[3], 2)
+        breakdowns = zip(*(_round(values, 2).tolist() for values in categories))
+        return [
+            {"breakdown": dict(zip(_CATEGORIES, breakdown)), "total": total}
+            for breakdown, total in zip(breakdowns, totals.tolist())
+        ]
+
+    @classmethod
+    def score_many(cls, questionnaires) -> dict:
+        """Unrounded kg CO2e/year per category (and in total) for each questionnaire, as arrays"""
+        return cls.score_columns(cls._TABLES.encode(questionnaires))
+
+    @classmethod
+    def score_columns(cls, columns: dict) -> dict:
+        """score_many() for answers already encoded by _TABLES.encode()"""
+        tables = cls._TABLES
+        factors = cls._EMISSION_FACTORS
+
+        # Food (same steps as _calculate_food)
+        food_factors = factors["food"]
+        diet = columns["diet"]
+        food = tables.diet.values[diet] * 365
+        food = food + tables.spend.values[columns["eating_out"]] * 52 * food_factors["spend_factor"]
+        annual_waste_kg = ((tables.waste.values[columns["waste"]] / 100.0) * food_factors["avg_waste_per_person"]
+                           * tables.waste_scale[diet])
+        food = food + annual_waste_kg * food_factors["waste_landfill_factor"]
+        food = food * (1.0 - tables.local_sourcing.values[columns["local_sourcing"]])
+
+        # Travel (same steps as _calculate_travel)
+        travel_factors = factors["travel"]
+        mode = columns["vehicle_mode"]
+        distance_km = tables.time.values[columns["car_hours"]] * tables.mode_speed[mode] * 52
+        travel = np.where(mode == _NO_VEHICLE, 0.0, distance_km * tables.vehicle.values[columns["vehicle"]])
+        travel = travel + (tables.time.values[columns["train_hours"]] * travel_factors["speeds"]["Train"] * 52
+                           * travel_factors["vehicle_per_km"]["Train"])
+        travel = travel + (tables.time.values[columns["bus_hours"]] * travel_factors["speeds"]["Bus"] * 52
+                           * travel_factors["vehicle_per_km"]["Bus"])
+        flight_emissions = (
+            (columns["domestic"] * tables.flight_km["Domestic"] * travel_factors["flights"]["Domestic"]["factor"]) +
+            (columns["europe"] * tables.flight_km["Europe"] * travel_factors["flights"]["Europe"]["factor"]) +
+            (columns["long_haul"] * tables.flight_km["LongHaul"] * travel_factors["flights"]["LongHaul"]["factor"])
+        ) * _RF_MULTIPLIER
+        travel = travel + flight_emissions * (1.0 - (tables.offset.values[columns["offset"]] / 100.0))
+
+        # Home (same steps as _calculate_home)
+        bedrooms = tables.bedrooms.values[columns["bedrooms"]]
+        adjusted_heating_kwh = ((7000 + (2000 * bedrooms)) * (1.0 + tables.temperature.values[columns["temperature"]])
+                                * (1.0 - tables.improvements[columns["improvements"]]))
+        heating_emissions = adjusted_heating_kwh * tables.heating.values[columns["heating"]]
+        elec_usage = (1500 + (500 * bedrooms)) * np.where(columns["lights_off"], 0.95, 1.0)
+        total_home_emissions = heating_emissions + elec_usage * tables.tariff_electricity[columns["tariff"]]
+        home = (total_home_emissions * 0.4) + ((total_home_emissions * 0.6) / tables.people.values[columns["people"]])
+
+        # Stuff (same steps as _calculate_stuff)
+        spend_factors = factors["stuff"]["spend_factors"]
+        stuff = tables.purchases[columns["purchases"]]
+        stuff = stuff + tables.spend.values[columns["clothes"]] * 12 * spend_factors["clothes"]
+        stuff = stuff + tables.spend.values[columns["pets"]] * 12 * spend_factors["pets"]
+        stuff = stuff + tables.spend.values[columns["beauty"]] * 12 * spend_factors["health_beauty"]
+        stuff = stuff + tables.spend.values[columns["hobbies"]] * 12 * spend_factors["entertainment"]
+        stuff = stuff + np.where(columns["contracts"], factors["stuff"]["services_annual"], 0)
+        stuff = stuff * (1.0 - np.minimum(columns["recycled"] * 0.01, 0.05))
+
+        return {"food": food, "travel": travel, "home": home, "stuff": stuff,
+                "total": food + travel + home + stuff}
+
+    @classmethod
+    def _get_mapped_value(cls, category: str, key: str, default=0.0):
         """Helper to get numerical value from string inputs."""
-        return self._INPUT_MAPPINGS.get(category, {}).get(key, default)
+        return cls._INPUT_MAPPINGS.get(category, {}).get(key, default)
+
+    # Every answer is a fixed choice (flight counts are small whole numbers), so
+    # each category's result is memoized per answer combination and most
+    # submissions are just four cache hits. Multi-choice answers are keyed as
+    # frozensets, so neither the order boxes are ticked in nor ticking one twice
+    # makes a new key, and their values are added up in factor-table order, as
+    # calculate_many() adds them.
+
+    @classmethod
+    def clear_cache(cls):
+        """Forget every remembered category result"""
+        for category in _CATEGORIES:
+            getattr(cls, f"_cached_{category}_emissions").cache_clear()
+
+    def _score(self, category: str, *answers) -> float:
+        """The category's emissions for these answers - through its cache, unless this calculator is a one-off"""
+        answers = tuple(_frozen(answer) for answer in answers)
+        try:
+            hash(answers)
+        except TypeError:
+            raise FootprintInputError(f"Unreadable answers: {answers!r}") from None
+        if not self._cached:
+            return getattr(self, f"_{category}_emissions")(*answers)
+        return getattr(self, f"_cached_{category}_emissions")(*answers)
+
+    @classmethod
+    @lru_cache(maxsize=CATEGORY_CACHE_SIZE)
+    def _cached_food_emissions(cls, *answers) -> float:
+        return cls._food_emissions(*answers)
+
+    @classmethod
+    @lru_cache(maxsize=CATEGORY_CACHE_SIZE)
+    def _cached_travel_emissions(cls, *answers) -> float:
+        return cls._travel_emissions(*answers)
+
+    @classmethod
+    @lru_cache(maxsize=CATEGORY_CACHE_SIZE)
+    def _cached_home_emissions(cls, *answers) -> float:
+        return cls._home_emissions(*answers)
+
+    @classmethod
+    @lru_cache(maxsize=CATEGORY_CACHE_SIZE)
+    def _cached_stuff_emissions(cls, *answers) -> float:
+        return cls._stuff_emissions(*answers)
 
     def _calculate_food(self) -> float:
-        emissions = 0.0
-        factors = self._EMISSION_FACTORS["food"]
         inputs = self._data.get("food", {})
+        return self._score(
+            "food",
+            inputs.get("diet_type", ""),
+            inputs.get("eating_out_spend_per_week", "£0"),
+            inputs.get("waste_percentage", "10% - 30%"),
+            inputs.get("local_sourcing", "I don't worry about where my food comes from")
+        )
+
+    @classmethod
+    def _food_emissions(cls, diet_type, spend_str, waste_str, sourcing) -> float:
+        emissions = 0.0
+        factors = cls._EMISSION_FACTORS["food"]
 
         # 1. Diet
-        diet_type = inputs.get("diet_type", "")
         # Default to vegetarian if missing for safety, but typically should match
         daily_factor = factors["diet"].get(diet_type, factors["diet"]["Meat in some meals"])
         emissions += daily_factor * 365
 
         # 2. Eating out
-        spend_str = inputs.get("eating_out_spend_per_week", "£0")
-        spend_val = self._get_mapped_value("spend_ranges", spend_str)
+        spend_val = cls._get_mapped_value("spend_ranges", spend_str)
         emissions += spend_val * 52 * factors["spend_factor"]
 
         # 3. Waste
-        waste_str = inputs.get("waste_percentage", "10% - 30%")
-        waste_pct = self._get_mapped_value("waste_ranges", waste_str)
+        waste_pct = cls._get_mapped_value("waste_ranges", waste_str)
         
         # Dynamic Waste Scaling
         waste_scale = 1.0
@@ -232,29 +425,43 @@ class CarbonFootprintCalculator:
         emissions += annual_waste_kg * factors["waste_landfill_factor"]
 
         # 4. Local sourcing
-        sourcing = inputs.get("local_sourcing", "I don't worry about where my food comes from")
         reduction_pct = factors["local_sourcing_reduction"].get(sourcing, 0.0)
         emissions = emissions * (1.0 - reduction_pct)
 
         return round(emissions, 4)
 
     def _calculate_travel(self) -> float:
-        emissions = 0.0
-        factors = self._EMISSION_FACTORS["travel"]
         inputs = self._data.get("travel", {})
+        flights = inputs.get("flights", {})
+        return self._score(
+            "travel",
+            inputs.get("general_vehicle", "Car"),
+            inputs.get("specific_vehicle", "Medium petrol or diesel car"),
+            inputs.get("car_hours_per_week", "Under 2 hours"),
+            inputs.get("train_hours_per_week", "I don't travel by train"),
+            inputs.get("bus_hours_per_week", "I don't travel by bus"),
+            _trips(flights.get("domestic", 0)),
+            _trips(flights.get("europe", 0)),
+            _trips(flights.get("long_haul", 0)),
+            inputs.get("flight_offset_percentage", "None of them")
+        )
+
+    @classmethod
+    def _travel_emissions(cls, general_vehicle, specific_vehicle, car_hours_str, train_str, bus_str,
+                          domestic, europe, long_haul, offset_str) -> float:
+        emissions = 0.0
+        factors = cls._EMISSION_FACTORS["travel"]
 
         # 1. Car/Motorbike
-        general_vehicle = inputs.get("general_vehicle", "Car")
         if "Neither" in general_vehicle:
             vehicle_factor = 0.0
             hours_str = "Under 2 hours"
         else:
-            specific_vehicle = inputs.get("specific_vehicle", "Medium petrol or diesel car")
             vehicle_factor = factors["vehicle_per_km"].get(specific_vehicle, 0.275)
-            hours_str = inputs.get("car_hours_per_week", "Under 2 hours")
+            hours_str = car_hours_str
 
         if vehicle_factor > 0:
-            hours = self._get_mapped_value("time_ranges", hours_str)
+            hours = cls._get_mapped_value("time_ranges", hours_str)
             
             # Dynamic Speed
             if "Motorbike" in general_vehicle:
@@ -266,24 +473,21 @@ class CarbonFootprintCalculator:
             emissions += distance_km * vehicle_factor
 
         # 2. Train
-        train_str = inputs.get("train_hours_per_week", "I don't travel by train")
-        train_hours = self._get_mapped_value("time_ranges", train_str)
+        train_hours = cls._get_mapped_value("time_ranges", train_str)
         if train_hours > 0:
              train_km = train_hours * factors["speeds"]["Train"] * 52
              emissions += train_km * factors["vehicle_per_km"]["Train"]
 
         # 3. Bus
-        bus_str = inputs.get("bus_hours_per_week", "I don't travel by bus")
-        bus_hours = self._get_mapped_value("time_ranges", bus_str)
+        bus_hours = cls._get_mapped_value("time_ranges", bus_str)
         if bus_hours > 0:
             bus_km = bus_hours * factors["speeds"]["Bus"] * 52
             emissions += bus_km * factors["vehicle_per_km"]["Bus"]
 
         # 4. Flights
-        flights = inputs.get("flights", {})
-        dom_trips = float(flights.get("domestic", 0))
-        eur_trips = float(flights.get("europe", 0))
-        long_trips = float(flights.get("long_haul", 0))
+        dom_trips = float(domestic)
+        eur_trips = float(europe)
+        long_trips = float(long_haul)
 
         # Aviation Logic: RF multiplier (1.9x) + Distance Uplift (1.1x)
         rf_multiplier = 1.9
@@ -299,8 +503,7 @@ class CarbonFootprintCalculator:
         flight_emissions *= rf_multiplier
 
         # 5. Offset
-        offset_str = inputs.get("flight_offset_percentage", "None of them")
-        offset_pct = self._get_mapped_value("offset_percentage", offset_str)
+        offset_pct = cls._get_mapped_value("offset_percentage", offset_str)
         
         # Add net emissions
         emissions += flight_emissions * (1.0 - (offset_pct / 100.0))
@@ -308,32 +511,40 @@ class CarbonFootprintCalculator:
         return round(emissions, 4)
 
     def _calculate_home(self) -> float:
-        emissions = 0.0
-        factors = self._EMISSION_FACTORS["home"]
         inputs = self._data.get("home", {})
+        return self._score(
+            "home",
+            inputs.get("people_count", "1"),
+            inputs.get("bedrooms", "1"),
+            inputs.get("heating_source", "Gas"),
+            inputs.get("winter_temp", "18° - 21°C"),
+            _ticked(inputs.get("improvements", [])),
+            inputs.get("green_tariff", "No"),
+            inputs.get("lights_off", "No")
+        )
+
+    @classmethod
+    def _home_emissions(cls, people_str, bedrooms_str, heat_source, temp_str, improvements, green_tariff, lights) -> float:
+        emissions = 0.0
+        factors = cls._EMISSION_FACTORS["home"]
 
         # People & Bedrooms
-        people_str = inputs.get("people_count", "1")
-        people = self._get_mapped_value("people_count", people_str, default=1)
-        
-        bedrooms_str = inputs.get("bedrooms", "1")
-        bedrooms = self._get_mapped_value("house_size", bedrooms_str, default=1)
+        people = cls._get_mapped_value("people_count", people_str, default=1)
+        bedrooms = cls._get_mapped_value("house_size", bedrooms_str, default=1)
 
         # Dynamic Baselines
         base_gas = 7000 + (2000 * bedrooms)
         base_elec = 1500 + (500 * bedrooms)
 
         # 1. Heating
-        heat_source = inputs.get("heating_source", "Gas")
         heat_factor = factors["heating_factor"].get(heat_source, 0.20)
         
-        temp_str = inputs.get("winter_temp", "18° - 21°C")
         temp_adj = factors["temp_adjustment"].get(temp_str, 0.0)
         
-        improvements = inputs.get("improvements", [])
         imp_reduction_sum = 0.0
-        for imp in improvements:
-            imp_reduction_sum += factors["improvements_reduction"].get(imp, 0.0)
+        for imp, reduction in factors["improvements_reduction"].items():
+            if imp in improvements:
+                imp_reduction_sum += reduction
         
         imp_reduction_sum = min(imp_reduction_sum, 0.8)
 
@@ -341,7 +552,6 @@ class CarbonFootprintCalculator:
         heating_emissions = adjusted_heating_kwh * heat_factor
 
         # 2. Electricity
-        green_tariff = inputs.get("green_tariff", "No")
         elec_factor = factors["electricity_factor"]
         
         if "100%" in green_tariff:
@@ -349,7 +559,6 @@ class CarbonFootprintCalculator:
         elif "less than 100%" in green_tariff:
             elec_factor *= 0.5
         
-        lights = inputs.get("lights_off", "No")
         elec_usage = base_elec * (0.95 if lights == "Yes" else 1.0)
         elec_emissions = elec_usage * elec_factor
 
@@ -362,39 +571,265 @@ class CarbonFootprintCalculator:
         return round(emissions, 4)
 
     def _calculate_stuff(self) -> float:
-        emissions = 0.0
-        factors = self._EMISSION_FACTORS["stuff"]
         inputs = self._data.get("stuff", {})
+        return self._score(
+            "stuff",
+            _ticked(inputs.get("purchases", [])),
+            inputs.get("clothes_spend", "£0"),
+            inputs.get("pet_spend", "£0"),
+            inputs.get("beauty_spend", "£0"),
+            inputs.get("hobbies_spend", "£0"),
+            inputs.get("contracts_spend", "£0"),
+            len(_ticked(inputs.get("recycling", [])))
+        )
+
+    @classmethod
+    def _stuff_emissions(cls, purchases, clothes, pets, beauty, hobbies, contracts_str, recycled_count) -> float:
+        emissions = 0.0
+        factors = cls._EMISSION_FACTORS["stuff"]
 
         # 1. New items
-        purchases = inputs.get("purchases", [])
-        for item in purchases:
-            emissions += factors["items_annualised"].get(item, 0)
+        for item, annualised in factors["items_annualised"].items():
+            if item in purchases:
+                emissions += annualised
 
         # 2. Monthly Spends
-        def get_spend(key):
-            s = inputs.get(key, "£0")
-            return self._get_mapped_value("spend_ranges", s)
+        def get_spend(s):
+            return cls._get_mapped_value("spend_ranges", s)
 
-        emissions += get_spend("clothes_spend") * 12 * factors["spend_factors"]["clothes"]
-        emissions += get_spend("pet_spend") * 12 * factors["spend_factors"]["pets"]
-        emissions += get_spend("beauty_spend") * 12 * factors["spend_factors"]["health_beauty"]
-        emissions += get_spend("hobbies_spend") * 12 * factors["spend_factors"]["entertainment"]
+        emissions += get_spend(clothes) * 12 * factors["spend_factors"]["clothes"]
+        emissions += get_spend(pets) * 12 * factors["spend_factors"]["pets"]
+        emissions += get_spend(beauty) * 12 * factors["spend_factors"]["health_beauty"]
+        emissions += get_spend(hobbies) * 12 * factors["spend_factors"]["entertainment"]
 
         # 3. Services
-        contracts_str = inputs.get("contracts_spend", "£0")
         if contracts_str != "£0":
              emissions += factors["services_annual"]
 
-        # 4. Recycling
-        recycled_items = inputs.get("recycling", [])
-        if recycled_items:
-            reduction_pct = min(len(recycled_items) * 0.01, 0.05)
+        # 4. Recycling (only how many kinds are recycled matters)
+        if recycled_count:
+            reduction_pct = min(recycled_count * 0.01, 0.05)
             emissions = emissions * (1.0 - reduction_pct)
 
         return round(emissions, 4)
 
 
+_CATEGORIES = ("food", "travel", "home", "stuff")
+
+
+def _frozen(answer):
+    """An answer as a hashable cache key (lists become tuples, dicts sorted tuples of items)"""
+    if isinstance(answer, (list, tuple)):
+        return tuple(_frozen(item) for item in answer)
+    if isinstance(answer, dict):
+        return tuple(sorted((key, _frozen(value)) for key, value in answer.items()))
+    return answer
+
+
+def _trips(count) -> float:
+    """A flight count as a number"""
+    try:
+        return float(count)
+    except (TypeError, ValueError):
+        raise FootprintInputError(f"Flight counts must be numbers, not {count!r}") from None
+
+
+def _ticked(answer) -> frozenset:
+    """The ticked boxes of a multi-choice answer, as a set (empty for None)"""
+    if answer is None:
+        return frozenset()
+    if not isinstance(answer, (list, tuple)):
+        raise FootprintInputError(f"Multi-choice answers must be lists, not {answer!r}")
+    try:
+        return frozenset(_frozen(item) for item in answer)
+    except TypeError:
+        raise FootprintInputError(f"Unreadable multi-choice answer: {answer!r}") from None
+
+
+# Vehicle modes (general_vehicle), decided the same way as _calculate_travel
+_CAR, _MOTORBIKE, _NO_VEHICLE = 0, 1, 2
+
+# Green tariffs, tested in the same order as _calculate_home (note "less than
+# 100%" answers contain "100%" too, so they count as fully green there as well)
+_STANDARD_TARIFF, _GREEN_TARIFF, _PART_GREEN_TARIFF = 0, 1, 2
+
+# Aviation: radiative forcing multiplier and distance uplift, as in _calculate_travel
+_RF_MULTIPLIER = 1.9
+_DISTANCE_UPLIFT = 1.1
+
+
+class _ChoiceTable:
+    """Integer codes for one question's answers, and the number each code stands for"""
+
+    def __init__(self, mapping: dict, unknown: float = 0.0):
+        self.codes = {answer: code for code, answer in enumerate(mapping)}
+        self.unknown_code = len(mapping)  # Answers we don't recognise
+        self.values = np.array(list(mapping.values()) + [unknown], dtype=np.float64)
+
+
+def _subset_sums(values) -> tuple:
+    """
+    Bit codes for multi-choice answers (bit i = item i was ticked), and the sum
+    of the ticked items' values for every possible combination
+    """
+    bits = {item: 1 << i for i, item in enumerate(values)}
+    sums = np.zeros(1 << len(values))
+    for mask in range(len(sums)):
+        for item, bit in bits.items():
+            if mask & bit:
+                sums[mask] += values[item]
+    return bits, sums
+
+
+@lru_cache(maxsize=256)
+def _vehicle_mode(general_vehicle: str) -> int:
+    if "Neither" in general_vehicle:
+        return _NO_VEHICLE
+    return _MOTORBIKE if "Motorbike" in general_vehicle else _CAR
+
+
+@lru_cache(maxsize=256)
+def _tariff_type(green_tariff: str) -> int:
+    if "100%" in green_tariff:
+        return _GREEN_TARIFF
+    elif "less than 100%" in green_tariff:
+        return _PART_GREEN_TARIFF
+    return _STANDARD_TARIFF
+
+
+class _CompiledTables:
+    """Everything calculate_many() needs from the factor and mapping dicts"""
+
+    def __init__(self, factors: dict, mappings: dict):
+        food, travel, home, stuff = (factors[category] for category in _CATEGORIES)
+
+        self.diet = _ChoiceTable(food["diet"], unknown=food["diet"]["Meat in some meals"])
+        self.waste_scale = np.array(
+            [1.2 if diet == "Meat in every meal" else 0.8 if diet in ["Vegetarian", "Vegan"] else 1.0
+             for diet in food["diet"]] + [1.0])
+        self.local_sourcing = _ChoiceTable(food["local_sourcing_reduction"])
+        self.spend = _ChoiceTable(mappings["spend_ranges"])
+        self.waste = _ChoiceTable(mappings["waste_ranges"])
+
+        self.vehicle = _ChoiceTable(travel["vehicle_per_km"], unknown=0.275)
+        self.mode_speed = np.array([travel["speeds"]["Car"], travel["speeds"]["Motorbike"], 0.0])
+        self.time = _ChoiceTable(mappings["time_ranges"])
+        self.offset = _ChoiceTable(mappings["offset_percentage"])
+        self.flight_km = {name: flight["distance"] * _DISTANCE_UPLIFT for name, flight in travel["flights"].items()}
+
+        self.people = _ChoiceTable(mappings["people_count"], unknown=1)
+        self.bedrooms = _ChoiceTable(mappings["house_size"], unknown=1)
+        self.heating = _ChoiceTable(home["heating_factor"], unknown=0.20)
+        self.temperature = _ChoiceTable(home["temp_adjustment"])
+        self.improvement_bits, improvements = _subset_sums(home["improvements_reduction"])
+        self.improvements = np.minimum(improvements, 0.8)
+        electricity = home["electricity_factor"]
+        self.tariff_electricity = np.array([electricity, 0.0, electricity * 0.5])
+
+        self.purchase_bits, self.purchases = _subset_sums(stuff["items_annualised"])
+
+    def encode(self, questionnaires) -> dict:
+        """
+        Turn every answer in the questionnaires (the same dicts calculate() takes)
+        into a code or number - one array per answer, a column at a time
+        """
+        food = [data.get("food", {}) for data in questionnaires]
+        travel = [data.get("travel", {}) for data in questionnaires]
+        home = [data.get("home", {}) for data in questionnaires]
+        stuff = [data.get("stuff", {}) for data in questionnaires]
+        flights = [answers.get("flights", {}) for answers in travel]
+
+        def codes(table, sections, key, default):
+            answers = [section.get(key, default) for section in sections]
+            return np.fromiter(map(table.codes.get, answers, repeat(table.unknown_code)), np.intp, len(answers))
+
+        def numbers(sections, key):
+            return np.array([_trips(answers.get(key, 0)) for answers in sections])
+
+        def ticked(bits, sections, key):
+            # Bit code of the ticked items we know about
+            get = bits.get
+            return np.array([sum(get(item, 0) for item in _ticked(answers.get(key, []))) for answers in sections],
+                            dtype=np.intp)
+
+        return {
+            "diet": codes(self.diet, food, "diet_type", ""),
+            "eating_out": codes(self.spend, food, "eating_out_spend_per_week", "£0"),
+            "waste": codes(self.waste, food, "waste_percentage", "10% - 30%"),
+            "local_sourcing": codes(self.local_sourcing, food, "local_sourcing",
+                                    "I don't worry about where my food comes from"),
+            "vehicle_mode": np.array([_vehicle_mode(answers.get("general_vehicle", "Car")) for answers in travel],
+                                     dtype=np.intp),
+            "vehicle": codes(self.vehicle, travel, "specific_vehicle", "Medium petrol or diesel car"),
+            "car_hours": codes(self.time, travel, "car_hours_per_week", "Under 2 hours"),
+            "train_hours": codes(self.time, travel, "train_hours_per_week", "I don't travel by train"),
+            "bus_hours": codes(self.time, travel, "bus_hours_per_week", "I don't travel by bus"),
+            "domestic": numbers(flights, "domestic"),
+            "europe": numbers(flights, "europe"),
+            "long_haul": numbers(flights, "long_haul"),
+            "offset": codes(self.offset, travel, "flight_offset_percentage", "None of them"),
+            "people": codes(self.people, home, "people_count", "1"),
+            "bedrooms": codes(self.bedrooms, home, "bedrooms", "1"),
+            "heating": codes(self.heating, home, "heating_source", "Gas"),
+            "temperature": codes(self.temperature, home, "winter_temp", "18° - 21°C"),
+            "improvements": ticked(self.improvement_bits, home, "improvements"),
+            "tariff": np.array([_tariff_type(answers.get("green_tariff", "No")) for answers in home], dtype=np.intp),
+            "lights_off": np.array([answers.get("lights_off", "No") == "Yes" for answers in home], dtype=bool),
+            "purchases": ticked(self.purchase_bits, stuff, "purchases"),
+            "clothes": codes(self.spend, stuff, "clothes_spend", "£0"),
+            "pets": codes(self.spend, stuff, "pet_spend", "£0"),
+            "beauty": codes(self.spend, stuff, "beauty_spend", "£0"),
+            "hobbies": codes(self.spend, stuff, "hobbies_spend", "£0"),
+            "contracts": np.array([answers.get("contracts_spend", "£0") != "£0" for answers in stuff], dtype=bool),
+            "recycled": np.array([len(_ticked(answers.get("recycling", []))) for answers in stuff], dtype=np.float64),
+        }
+
+
+def _round(values: np.ndarray, digits: int) -> np.ndarray:
+    """
+    round(value, digits) for a whole array, with exactly Python's results.
+    Scaling and rounding in numpy only disagrees with round() within a hair of
+    a half-way point, so just those few values are rounded one by one.
+    """
+    scale = 10.0 ** digits
+    scaled = values * scale
+    rounded = np.rint(scaled) / scale
+    near_half = np.abs(np.abs(scaled - np.trunc(scaled)) - 0.5) < 1e-6
+    for i in np.flatnonzero(near_half).tolist():
+        rounded[i] = round(float(values[i]), digits)
+    return rounded
+
+
+# === WHAT-IF ===
+
+# The method that scores each category
+_CATEGORY_METHODS = {category: f"_calculate_{category}" for category in _CATEGORIES}
+
+
+def _answer_at(data: dict, path: tuple):
+    """The answer at `path` in the input data (None if it wasn't given)"""
+    for key in path:
+        if not isinstance(data, dict):
+            return None
+        data = data.get(key)
+    return data
+
+
+def _with_answer(data: dict, path: tuple, answer) -> dict:
+    """A copy of the input data with the answer at `path` replaced (only the dicts on the path are copied)"""
+    data = dict(data)
+    if len(path) == 1:
+        data[path[0]] = answer
+    else:
+        data[path[0]] = _with_answer(data.get(path[0]) or {}, path[1:], answer)
+    return data
+
+
+CarbonFootprintCalculator._TABLES = _CompiledTables(
+    CarbonFootprintCalculator._EMISSION_FACTORS, CarbonFootprintCalculator._INPUT_MAPPINGS
+)
+
+
 class MockDataProvider:
     """Provides mock data using strict string inputs matching the questionnaire."""
     
@@ -0,0 +1,153 @@
+"""
+Data Generator for Energy Dashboard
+Simulates realistic solar production and household consumption
+
+Whole date ranges (and whole batches of households) are generated in one
+vectorized pass from a seeded random number generator, so the same seed
+always produces the same history and years of data take seconds
+"""
+
+from datetime import datetime, timedelta
+from typing import Iterator, List, Tuple
+
+import numpy as np
+
+from .. import config
+from ..models.energy_data import EnergyReading
+from .reading_store import ReadingWindow, TIMESTAMP_DTYPE
+
+# === SIMULATION SHAPE ===
+SOLAR_NOON = 13.0  # Hour of peak sun (UK clocks spend most of the year on BST)
+DAYLIGHT_HOURS_SUMMER = 16.5  # Hours of daylight on the longest day
+DAYLIGHT_HOURS_WINTER = 8.0  # Hours of daylight on the shortest day
+WINTER_SOLAR_FACTOR = 0.25  # Winter peak output as a fraction of summer peak
+MIDSUMMER_DAY = 172  # Day of the year with the longest daylight
+
+MORNING_HOURS = (7, 9)  # Breakfast, showers, kettles
+MORNING_LOAD = 0.4  # Fraction of the base-to-peak range used in the morning
+DAYTIME_LOAD = 0.15  # ...during the day on weekdays (house mostly empty)
+WEEKEND_DAYTIME_LOAD = 0.35  # ...during the day at weekends
+
+# How different one simulated household is from another
+HOUSEHOLD_SOLAR_SCALE = (0.5, 1.0)  # Fraction of MAX_SOLAR_CAPACITY installed
+HOUSEHOLD_CONSUMPTION_SCALE = (0.7, 1.4)
+
+
+class EnergyDataGenerator:
+    """
+    Generates synthetic energy readings that follow the solar curve,
+    the household's base/peak consumption and the evening peak window
+    """
+
+    def __init__(self, seed: int = None, interval_minutes: float = None):
+        self.rng = np.random.default_rng(seed)
+        if interval_minutes is None:
+            interval_minutes = config.READING_INTERVAL_MINUTES
+        self.interval = timedelta(minutes=interval_minutes)
+
+    # === PUBLIC API ===
+
+    def generate_historical_data(self, days: int = config.HISTORICAL_DAYS, end: datetime = None) -> ReadingWindow:
+        """
+        Generate `days` of readings for one household, ending now (or at `end`)
+        Returns a columnar ReadingWindow (iterate it for EnergyReading objects)
+        """
+        end = end or datetime.now()
+        return self.generate_range(end - timedelta(days=days), end)
+
+    def generate_range(self, start: datetime, end: datetime = None) -> ReadingWindow:
+        """Generate readings for one household from `start` up to now (or `end`)"""
+        timestamps = self._timestamps(start, end or datetime.now())
+        columns = self._simulate(timestamps, np.ones((1, 1)), np.ones((1, 1)))
+        return ReadingWindow(timestamps, *(values[0] for values in columns))
+
+    def generate_current_reading(self, now: datetime = None) -> EnergyReading:
+        """Generate the live reading for right now"""
+        now = now or datetime.now()
+        timestamps = np.array([now], dtype=TIMESTAMP_DTYPE)
+        columns = self._simulate(timestamps, np.ones((1, 1)), np.ones((1, 1)))
+        return EnergyReading(now, *(float(values[0, 0]) for values in columns))
+
+    def iter_fleet(self, household_count: int, days: int = config.HISTORICAL_DAYS,
+                   end: datetime = None, batch_size: int = 64) -> Iterator[Tuple[int, ReadingWindow]]:
+        """
+        Generate history for many households, yielding (index, window) pairs
+        Households are simulated `batch_size` at a time as 2D arrays, which keeps
+        memory bounded for multi-year, many-household load tests
+        """
+        end = end or datetime.now()
+        timestamps = self._timestamps(end - timedelta(days=days), end)
+        for first in range(0, household_count, batch_size):
+            count = min(batch_size, household_count - first)
+            solar_scale = self.rng.uniform(*HOUSEHOLD_SOLAR_SCALE, size=(count, 1))
+            consumption_scale = self.rng.uniform(*HOUSEHOLD_CONSUMPTION_SCALE, size=(count, 1))
+            columns = self._simulate(timestamps, solar_scale, consumption_scale)
+            for row in range(count):
+                yield first + row, ReadingWindow(timestamps, *(values[row] for values in columns))
+
+    def generate_fleet(self, household_count: int, days: int = config.HISTORICAL_DAYS,
+                       end: datetime = None) -> List[ReadingWindow]:
+        """Generate history for many households at once (one window each)"""
+        return [window for _, window in self.iter_fleet(household_count, days, end)]
+
+    # === SIMULATION ===
+
+    def _timestamps(self, start: datetime, end: datetime) -> np.ndarray:
+        """Reading times in [start, end), on the interval grid counted from midnight"""
+        step = np.timedelta64(self.interval, 'us')
+        first = np.datetime64(start, 'us')
+        offset = (first - first.astype('datetime64[D]')) % step
+        if offset:
+            first += step - offset  # Round up onto the grid
+        return np.arange(first, np.datetime64(end, 'us'), step, dtype=TIMESTAMP_DTYPE)
+
+    def _simulate(self, timestamps: np.ndarray, solar_scale: np.ndarray,
+                  consumption_scale: np.ndarray) -> Tuple[np.ndarray, ...]:
+        """
+        Simulate every household (rows) at every timestamp (columns)
+        Returns (solar_production, consumption, grid_import, grid_export) as 2D arrays in kW
+        """
+        households = solar_scale.shape[0]
+        count = len(timestamps)
+
+        days = timestamps.astype('datetime64[D]')
+        hour = (timestamps - days).astype('timedelta64[us]').astype(np.int64) / 3.6e9
+        day_of_year = (days - days.astype('datetime64[Y]')).astype(np.int64)
+        weekday = (days.astype(np.int64) + 3) % 7  # Monday = 0
+        # Index each reading by its day so we can draw one random value per day
+        day_index = (days - days[0]).astype(np.int64) if count else np.empty(0, dtype=np.int64)
+        day_count = int(day_index[-1]) + 1 if count else 0
+
+        # --- Solar: a sine-shaped day whose length and height follow the seasons ---
+        season = np.cos(2 * np.pi * (day_of_year - MIDSUMMER_DAY) / 365.25)  # 1 in June, -1 in December
+        daylight = DAYLIGHT_HOURS_WINTER + (DAYLIGHT_HOURS_SUMMER - DAYLIGHT_HOURS_WINTER) * (season + 1) / 2
+        sunrise = SOLAR_NOON - daylight / 2
+        sun = np.clip(np.sin(np.pi * (hour - sunrise) / daylight), 0, None)
+        seasonal_peak = WINTER_SOLAR_FACTOR + (1 - WINTER_SOLAR_FACTOR) * (season + 1) / 2
+
+        cloud = self.rng.uniform(0.3, 1.0, size=(households, day_count))[:, day_index]
+        flicker = self.rng.uniform(0.85, 1.0, size=(households, count))
+        solar = config.MAX_SOLAR_CAPACITY * solar_scale * sun * seasonal_peak * cloud * flicker
+        np.clip(solar, 0, config.MAX_SOLAR_CAPACITY, out=solar)
+
+        # --- Consumption: always-on base plus morning, daytime and evening peaks ---
+        peak = (hour >= config.PEAK_HOURS_START) & (hour < config.PEAK_HOURS_END)
+        morning = (hour >= MORNING_HOURS[0]) & (hour < MORNING_HOURS[1])
+        daytime = (hour >= MORNING_HOURS[1]) & (hour < config.PEAK_HOURS_START)
+        load = np.zeros(count)
+        load[morning] = MORNING_LOAD
+        load[daytime] = np.where(weekday[daytime] >= 5, WEEKEND_DAYTIME_LOAD, DAYTIME_LOAD)
+
+        activity = np.broadcast_to(load, (households, count)).copy()
+        activity[:, peak] = self.rng.uniform(0.7, 1.0, size=(households, int(peak.sum())))
+        activity += self.rng.normal(0, 0.05, size=(households, count))
+
+        span = config.PEAK_CONSUMPTION - config.BASE_CONSUMPTION
+        consumption = (config.BASE_CONSUMPTION + span * activity) * consumption_scale
+        np.clip(consumption, config.BASE_CONSUMPTION * 0.8, config.PEAK_CONSUMPTION * consumption_scale, out=consumption)
+
+        # --- Grid: whatever solar doesn't cover is imported, any excess exported ---
+        balance = consumption - solar
+        grid_import = np.clip(balance, 0, None)
+        grid_export = np.clip(-balance, 0, None)
+        return solar, consumption, grid_import, grid_export
@@ -0,0 +1,67 @@
+"""
+Chart Downsampling for Energy Dashboard
+Cuts long series down to the number of points a chart can actually draw
+
+Uses Largest-Triangle-Three-Buckets (LTTB): the series is split into equal
+buckets and from each one we keep the point that forms the biggest triangle
+with its neighbours, so peaks, dips and the overall shape survive while the
+response stays a fixed size however long the range is.
+"""
+
+from typing import Dict, Sequence, Tuple
+
+import numpy as np
+
+# The series drawn on the Energy Balance chart
+CHART_FIELDS = ('consumption', 'solar_production')
+
+# Fewer points than this can't show much shape (and each field needs at least 3)
+MIN_POINTS = 10
+
+
+def lttb(x: np.ndarray, y: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Indices of the (at most) `max_points` points that best keep the shape of y(x)
+    The first and last points are always kept
+    """
+    count = len(x)
+    if max_points >= count or max_points < 3:
+        return np.arange(count)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # Everything between the first and last point is split into max_points - 2 buckets
+    edges = np.linspace(1, count - 1, max_points - 1).astype(np.int64)
+    sizes = np.diff(edges)
+    average_x = np.add.reduceat(x[1:-1], edges[:-1] - 1) / sizes
+    average_y = np.add.reduceat(y[1:-1], edges[:-1] - 1) / sizes
+
+    selected = np.empty(max_points, dtype=np.int64)
+    selected[0], selected[-1] = 0, count - 1
+    previous = 0
+    for bucket in range(max_points - 2):
+        lo, hi = edges[bucket], edges[bucket + 1]
+        # Third corner: the next bucket's average point (or the last point)
+        if bucket + 1 < max_points - 2:
+            next_x, next_y = average_x[bucket + 1], average_y[bucket + 1]
+        else:
+            next_x, next_y = x[-1], y[-1]
+        areas = np.abs((x[previous] - next_x) * (y[lo:hi] - y[previous])
+                       - (x[previous] - x[lo:hi]) * (next_y - y[previous]))
+        previous = lo + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+    return selected
+
+
+def downsample_buckets(starts: np.ndarray, totals: Dict[str, np.ndarray], max_points: int,
+                       fields: Sequence[str] = CHART_FIELDS) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """
+    Keep at most `max_points` buckets, chosen so every charted series keeps its shape
+    Each field gets an equal share of the budget and the chosen buckets are combined
+    """
+    if len(starts) <= max_points:
+        return starts, totals
+    x = starts.astype('datetime64[us]').astype(np.int64).astype(np.float64)
+    budget = max_points // len(fields)
+    keep = np.unique(np.concatenate([lttb(x, totals[field], budget) for field in fields]))
+    return starts[keep], {field: values[keep] for field, values in totals.items()}
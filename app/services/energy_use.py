@@ -1,15 +1,27 @@
 # Energy use algorithm
 
+import csv
+import io
+
+import numpy as np
+
 GRID_EMISSION_FACTOR = 0.14
+# Solar savings are priced at this flat rate. Pass a tariff to price them at its average
+# import rate instead (the inputs are totals with no timestamps, so time-of-use bands can't apply)
 ELECTRICITY_UNIT_RATE = 0.28
 
+
+def _unit_rate(tariff):
+    return tariff.average_import_rate if tariff is not None else ELECTRICITY_UNIT_RATE
+
 class EnergyUse:
-    def __init__(self, grid_import_kwh, solar_generation_kwh, grid_export_kwh, ev_energy_kwh, odometer_reading_km):
+    def __init__(self, grid_import_kwh, solar_generation_kwh, grid_export_kwh, ev_energy_kwh, odometer_reading_km, tariff=None):
         self.grid_import_kwh = grid_import_kwh
         self.solar_generation_kwh = solar_generation_kwh
         self.grid_export_kwh = grid_export_kwh
         self.ev_energy_kwh = ev_energy_kwh
         self.odometer_reading_km = odometer_reading_km
+        self.unit_rate = _unit_rate(tariff)
 
     def total_consumption(self):
         return self.grid_import_kwh + (self.solar_generation_kwh - self.grid_export_kwh)
@@ -43,7 +55,7 @@ class EnergyUse:
         return self.solar_generation_kwh * GRID_EMISSION_FACTOR
 
     def cost_savings(self):
-        return self.solar_generation_kwh * ELECTRICITY_UNIT_RATE
+        return self.solar_generation_kwh * self.unit_rate
 
     def gather_data(self):
         return {
@@ -61,4 +73,113 @@ class EnergyUse:
             "ev_efficiency": round(self.ev_efficiency(), 2),
             "co2_saved": round(self.co2_saved(), 2),
             "cost_savings": round(self.cost_savings(), 2)
-        }
\ No newline at end of file
+        }
+
+# Batch version: the same metrics for many households at once, one array per input
+ENERGY_USE_FIELDS = ("grid_import_kwh", "solar_generation_kwh", "grid_export_kwh", "ev_energy_kwh", "odometer_reading_km")
+METRIC_FIELDS = ("total_consumption", "home_consumption", "ev_share", "self_consumption",
+                 "solar_coverage", "ev_efficiency", "co2_saved", "cost_savings")
+CSV_CHUNK_ROWS = 5000
+
+
+def _ratio(numerator, denominator, scale):
+    # Element-wise numerator / denominator * scale, with 0.0 wherever the denominator is 0
+    return np.divide(numerator * scale, denominator, out=np.zeros(len(denominator)), where=denominator != 0)
+
+
+def _round(values, digits):
+    # round(value, digits) for every element, giving exactly what EnergyUse.gather_data gives.
+    # np.rint on the scaled values only disagrees with round() when a value sits on a half-way
+    # point, so those few are redone with round() itself
+    scale = 10.0 ** digits
+    scaled = values * scale
+    rounded = np.rint(scaled) / scale
+    ties = np.flatnonzero(np.abs(np.abs(scaled - np.trunc(scaled)) - 0.5) < 1e-6)
+    rounded[ties] = [round(value, digits) for value in values[ties].tolist()]
+    return rounded
+
+
+def _csv_value(value):
+    # Quote a value for CSV output if it needs it
+    value = str(value)
+    if any(character in value for character in ',"\r\n'):
+        return '"' + value.replace('"', '""') + '"'
+    return value
+
+
+class EnergyUseBatch:
+    def __init__(self, grid_import_kwh, solar_generation_kwh, grid_export_kwh, ev_energy_kwh, odometer_reading_km, ids=None,
+                 tariff=None):
+        self.grid_import_kwh = np.asarray(grid_import_kwh, dtype=np.float64)
+        self.solar_generation_kwh = np.asarray(solar_generation_kwh, dtype=np.float64)
+        self.grid_export_kwh = np.asarray(grid_export_kwh, dtype=np.float64)
+        self.ev_energy_kwh = np.asarray(ev_energy_kwh, dtype=np.float64)
+        self.odometer_reading_km = np.asarray(odometer_reading_km, dtype=np.float64)
+        self.ids = ids
+        self.unit_rate = _unit_rate(tariff)
+        lengths = {len(self.grid_import_kwh), len(self.solar_generation_kwh), len(self.grid_export_kwh),
+                   len(self.ev_energy_kwh), len(self.odometer_reading_km)}
+        if len(lengths) != 1 or (ids is not None and len(ids) not in lengths):
+            raise ValueError("Every column needs one value per household")
+
+    @classmethod
+    def from_csv(cls, lines, tariff=None):
+        # A header row naming the five inputs (in any order, plus an optional "id"), then one row per household
+        rows = list(csv.reader(lines))
+        if not rows:
+            raise ValueError("The CSV file is empty")
+        header = [name.strip() for name in rows[0]]
+        missing = [field for field in ENERGY_USE_FIELDS if field not in header]
+        if missing:
+            raise ValueError(f"Missing columns: {', '.join(missing)}")
+        rows = [row for row in rows[1:] if row]
+        if any(len(row) != len(header) for row in rows):
+            raise ValueError(f"Every row needs {len(header)} values")
+        table = np.array(rows, dtype=str).reshape(-1, len(header))
+        columns = {}
+        for field in ENERGY_USE_FIELDS:
+            try:
+                columns[field] = table[:, header.index(field)].astype(np.float64)
+            except ValueError:
+                raise ValueError(f"Column {field} has a value that isn't a number") from None
+        ids = table[:, header.index("id")] if "id" in header else None
+        return cls(ids=ids, tariff=tariff, **columns)
+
+    def __len__(self):
+        return len(self.grid_import_kwh)
+
+    def total_consumption(self):
+        return self.grid_import_kwh + (self.solar_generation_kwh - self.grid_export_kwh)
+
+    def gather_data(self):
+        # Computes total_consumption() once and reuses it for the metrics that depend on it
+        total = self.total_consumption()
+        metrics = {
+            "total_consumption": total,
+            "home_consumption": total - self.ev_energy_kwh,
+            "ev_share": _ratio(self.ev_energy_kwh, total, 100),
+            "self_consumption": _ratio(self.solar_generation_kwh - self.grid_export_kwh, self.solar_generation_kwh, 100),
+            "solar_coverage": _ratio(self.solar_generation_kwh, total, 100),
+            "ev_efficiency": _ratio(self.ev_energy_kwh, self.odometer_reading_km, 1000),
+            "co2_saved": self.solar_generation_kwh * GRID_EMISSION_FACTOR,
+            "cost_savings": self.solar_generation_kwh * self.unit_rate,
+        }
+        data = {field: getattr(self, field) for field in ENERGY_USE_FIELDS}
+        data.update((field, _round(values, 2)) for field, values in metrics.items())
+        return data
+
+    def iter_csv(self, chunk_rows=CSV_CHUNK_ROWS):
+        # Yields the results as CSV text a chunk of rows at a time, so big batches can be streamed
+        data = self.gather_data()
+        fields = ENERGY_USE_FIELDS + METRIC_FIELDS
+        header = fields if self.ids is None else ("id",) + fields
+        yield ",".join(header) + "\n"
+        formats = ["%.10g"] * len(ENERGY_USE_FIELDS) + ["%.2f"] * len(METRIC_FIELDS)
+        for start in range(0, len(self), chunk_rows):
+            stop = start + chunk_rows
+            text = io.StringIO()
+            np.savetxt(text, np.column_stack([data[field][start:stop] for field in fields]), fmt=formats, delimiter=",")
+            lines = text.getvalue().splitlines(keepends=True)
+            if self.ids is not None:
+                lines = [f"{_csv_value(identifier)},{line}" for identifier, line in zip(self.ids[start:stop], lines)]
+            yield "".join(lines)
@@ -0,0 +1,155 @@
+"""
+EV Charging Scheduler for Energy Dashboard
+Plans when to charge the car so it's ready by morning for as little as possible
+
+The horizon is split into fixed slots. Forecast solar surplus is used
+first (it would otherwise be exported), then the remaining energy is
+bought in the cheapest slots, with peak hours used only as a last resort.
+Every step is a sort or a cumulative sum over whole arrays, and
+plan_many() plans a whole fleet of households in one pass.
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from .. import config
+from ..models.energy_data import ChargingPlan
+from .reading_store import ReadingStore, TIMESTAMP_DTYPE, to_datetime64
+
+
+def next_departure(now: datetime = None) -> datetime:
+    """The next time the car leaves (EV_DEPARTURE_HOUR today or tomorrow)"""
+    now = now or datetime.now()
+    departure = now.replace(hour=config.EV_DEPARTURE_HOUR, minute=0, second=0, microsecond=0)
+    return departure if departure > now else departure + timedelta(days=1)
+
+
+def is_peak(slot_starts: np.ndarray) -> np.ndarray:
+    """Which slots start inside PEAK_HOURS_START-PEAK_HOURS_END"""
+    hours = (slot_starts - slot_starts.astype('datetime64[D]')).astype('timedelta64[h]').astype(int)
+    return (hours >= config.PEAK_HOURS_START) & (hours < config.PEAK_HOURS_END)
+
+
+def surplus_forecast(store: ReadingStore, slot_starts: np.ndarray, slot_minutes: int,
+                     days: int = None) -> np.ndarray:
+    """
+    Expected solar surplus (kW) in each slot: the average grid export at the
+    same time of day over the last `days` days of readings
+    """
+    days = days or config.EV_FORECAST_DAYS
+    slots_per_day = 24 * 60 // slot_minutes
+    if not len(slot_starts):
+        return np.zeros(0)
+    history = store.range(slot_starts[0] - np.timedelta64(days, 'D'), slot_starts[0])
+    if not len(history):
+        return np.zeros(len(slot_starts))
+
+    def slot_of_day(timestamps):
+        minutes = (timestamps - timestamps.astype('datetime64[D]')).astype('timedelta64[m]').astype(int)
+        return minutes // slot_minutes
+
+    past = slot_of_day(history.timestamps)
+    totals = np.bincount(past, weights=history.grid_export, minlength=slots_per_day)
+    counts = np.bincount(past, minlength=slots_per_day)
+    profile = np.divide(totals, counts, out=np.zeros(slots_per_day), where=counts > 0)
+    return profile[slot_of_day(slot_starts)]
+
+
+class EVScheduler:
+    """Greedy charging planner over fixed time slots"""
+
+    def __init__(self, charging_power: float = None, slot_minutes: int = None):
+        self.charging_power = charging_power or config.EV_CHARGING_POWER
+        self.slot_minutes = slot_minutes or config.EV_SLOT_MINUTES
+        self.slot_hours = self.slot_minutes / 60
+
+    def slots(self, start: datetime, end: datetime) -> np.ndarray:
+        """Slot start times covering [start, end), aligned to the slot length"""
+        step = np.timedelta64(self.slot_minutes, 'm')
+        first = to_datetime64(start).astype('datetime64[m]')
+        first -= (first - first.astype('datetime64[D]')) % step
+        return np.arange(first, to_datetime64(end), step).astype(TIMESTAMP_DTYPE)
+
+    # === PLANNING ===
+
+    def plan_many(self, slot_starts: np.ndarray, surplus: np.ndarray, energy_needed: np.ndarray,
+                  rates: np.ndarray = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Plan every household at once
+        surplus: (households, slots) forecast solar surplus in kW
+        energy_needed: (households,) kWh to add before the last slot ends
+        rates: (slots,) grid price in £/kWh (default: GRID_RATE everywhere)
+        Returns (solar kWh, grid kWh) per household per slot
+        """
+        surplus = np.atleast_2d(np.asarray(surplus, dtype=np.float64))
+        need = np.asarray(energy_needed, dtype=np.float64).reshape(-1, 1)
+        rates = np.full(len(slot_starts), config.GRID_RATE) if rates is None else np.asarray(rates)
+
+        slot_energy = self.charging_power * self.slot_hours
+        solar_capacity = np.clip(surplus, 0, self.charging_power) * self.slot_hours
+
+        # 1. Solar surplus first, earliest slots first
+        solar = _fill(solar_capacity, need)
+        need = need - solar.sum(axis=1, keepdims=True)
+
+        # 2. The rest from the grid: off-peak before peak, cheapest first, then earliest
+        order = np.lexsort((np.arange(len(slot_starts)), rates, is_peak(slot_starts)))
+        grid = np.empty_like(solar)
+        grid[:, order] = _fill((slot_energy - solar_capacity)[:, order], need)
+        return solar, grid
+
+    def plan(self, slot_starts: np.ndarray, surplus: np.ndarray, energy_needed: float,
+             rates: np.ndarray = None) -> ChargingPlan:
+        """Plan one household's charging and summarise it as a ChargingPlan"""
+        if not len(slot_starts):
+            # No time left to charge in
+            return ChargingPlan(energy_needed=round(float(energy_needed), 2), energy_planned=0.0,
+                                solar_energy=0.0, grid_energy=0.0, peak_energy=0.0,
+                                projected_cost=0.0, cost_if_charged_now=0.0, sessions=[])
+        rates = np.full(len(slot_starts), config.GRID_RATE) if rates is None else np.asarray(rates)
+        solar, grid = (values[0] for values in self.plan_many(slot_starts, surplus, [energy_needed], rates))
+        peak = is_peak(slot_starts)
+
+        # For comparison: full power from the first slot until the battery is full
+        now_energy = _fill(np.full((1, len(slot_starts)), self.charging_power * self.slot_hours),
+                           np.array([[energy_needed]]))[0]
+        now_solar = np.minimum(now_energy, np.clip(surplus, 0, self.charging_power) * self.slot_hours)
+
+        return ChargingPlan(
+            energy_needed=round(float(energy_needed), 2),
+            energy_planned=round(float(solar.sum() + grid.sum()), 2),
+            solar_energy=round(float(solar.sum()), 2),
+            grid_energy=round(float(grid.sum()), 2),
+            peak_energy=round(float(grid[peak].sum()), 2),
+            projected_cost=round(float(grid @ rates), 2),
+            cost_if_charged_now=round(float((now_energy - now_solar) @ rates), 2),
+            sessions=self._sessions(slot_starts, solar, grid),
+        )
+
+    def _sessions(self, slot_starts: np.ndarray, solar: np.ndarray, grid: np.ndarray) -> List[Dict]:
+        """Merge back-to-back charging slots into sessions"""
+        energy = solar + grid
+        charging = energy > 1e-9
+        if not charging.any():
+            return []
+        edges = np.diff(np.r_[0, charging.astype(np.int8), 0])
+        firsts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+        step = np.timedelta64(self.slot_minutes, 'm')
+        starts = slot_starts[firsts].astype(datetime).tolist()
+        stops = (slot_starts[ends - 1] + step).astype(datetime).tolist()
+        # Each sum runs to the next session's start; the idle slots in between add nothing
+        energies = np.add.reduceat(energy, firsts)
+        solars = np.add.reduceat(solar, firsts)
+        return [
+            {'start': start.isoformat(), 'end': stop.isoformat(),
+             'energy': round(float(total), 2), 'solar_energy': round(float(from_solar), 2)}
+            for start, stop, total, from_solar in zip(starts, stops, energies, solars)
+        ]
+
+
+def _fill(capacity: np.ndarray, need: np.ndarray) -> np.ndarray:
+    """Take energy from each slot in order until `need` is met (row by row)"""
+    before = np.cumsum(capacity, axis=1) - capacity
+    return np.clip(need - before, 0, capacity)
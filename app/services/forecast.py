@@ -0,0 +1,110 @@
+"""
+Forecasts for Energy Dashboard
+Expected solar production and consumption for the next few days
+
+Each household keeps seasonal profiles - the average kW for every hour of
+the week, and for every hour of the day - updated as readings arrive.
+Older readings fade out exponentially (FORECAST_HALF_LIFE_DAYS), so the
+profiles follow the seasons. A forecast is just a lookup per hour, with
+the hour-of-week profile blended towards the hour-of-day one while it is
+still based on only a few readings.
+"""
+
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from .. import config
+from .calculator import HOURS_PER_WEEK, hour_of_week
+from .reading_store import ReadingStore, ReadingWindow, TIMESTAMP_DTYPE, to_datetime64
+
+# The fields we forecast
+FORECAST_FIELDS = ('solar_production', 'consumption')
+
+# Weights are 2 ** (age in half lives); rebase before they get anywhere near overflowing
+_MAX_EXPONENT = 512
+
+
+class SeasonalProfiles:
+    """
+    Exponentially weighted hour-of-week and hour-of-day averages
+
+    Instead of decaying every old reading, new readings get a weight that
+    grows with time (2 ** (time since reference / half life)) - the ratios
+    come out the same, and late readings simply get the weight of their own time
+    """
+
+    def __init__(self, half_life_days: float = None, prior_readings: float = None):
+        half_life_days = half_life_days or config.FORECAST_HALF_LIFE_DAYS
+        self.half_life_us = half_life_days * 24 * 3600 * 1e6
+        self.prior_readings = config.FORECAST_PRIOR_READINGS if prior_readings is None else prior_readings
+        self._reset()
+
+    def _reset(self):
+        self._reference: Optional[np.datetime64] = None
+        self._latest_exponent = 0.0
+        self._week_weights = np.zeros(HOURS_PER_WEEK)
+        self._day_weights = np.zeros(24)
+        self._week_sums = {field: np.zeros(HOURS_PER_WEEK) for field in FORECAST_FIELDS}
+        self._day_sums = {field: np.zeros(24) for field in FORECAST_FIELDS}
+
+    def attach(self, store: ReadingStore):
+        """Build profiles from everything already in `store`, then follow new readings"""
+        self.add(store.all())
+        store.subscribe(self.add)
+
+    def add(self, window: ReadingWindow, reset: bool = False):
+        """Fold a batch of readings into the profiles (or start over on a reset)"""
+        if reset:
+            self._reset()
+        if not len(window):
+            return
+        if self._reference is None:
+            self._reference = window.timestamps.min()
+
+        exponents = (window.timestamps - self._reference).astype(np.int64) / self.half_life_us
+        if exponents.max() > _MAX_EXPONENT:
+            self._rebase(window.timestamps.max())
+            exponents = (window.timestamps - self._reference).astype(np.int64) / self.half_life_us
+        self._latest_exponent = max(self._latest_exponent, float(exponents.max()))
+        weights = np.exp2(exponents)
+
+        week_slots = hour_of_week(window.timestamps)
+        day_slots = week_slots % 24
+        self._week_weights += np.bincount(week_slots, weights=weights, minlength=HOURS_PER_WEEK)
+        self._day_weights += np.bincount(day_slots, weights=weights, minlength=24)
+        for field in FORECAST_FIELDS:
+            weighted = weights * window.column(field)
+            self._week_sums[field] += np.bincount(week_slots, weights=weighted, minlength=HOURS_PER_WEEK)
+            self._day_sums[field] += np.bincount(day_slots, weights=weighted, minlength=24)
+
+    def _rebase(self, latest: np.datetime64):
+        """Move the reference time up to `latest`, scaling existing weights down to match"""
+        shift = (latest - self._reference).astype(np.int64) / self.half_life_us
+        scale = np.exp2(-shift)
+        self._reference = latest
+        self._latest_exponent -= shift
+        self._week_weights *= scale
+        self._day_weights *= scale
+        for field in FORECAST_FIELDS:
+            self._week_sums[field] *= scale
+            self._day_sums[field] *= scale
+
+    # === FORECASTING ===
+
+    def profile(self, field: str) -> np.ndarray:
+        """Expected kW for every hour of the week (Monday 00:00 first)"""
+        day_profile = np.divide(self._day_sums[field], self._day_weights,
+                                out=np.zeros(24), where=self._day_weights > 0)
+        # The prior is worth `prior_readings` readings taken at the newest reading's time
+        prior = self.prior_readings * np.exp2(self._latest_exponent)
+        return ((self._week_sums[field] + prior * np.tile(day_profile, 7))
+                / (self._week_weights + prior))
+
+    def forecast(self, start: datetime, hours: int) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """Hour start times from the hour containing `start`, and the expected kW for each"""
+        first = to_datetime64(start).astype('datetime64[h]')
+        hour_starts = (first + np.arange(hours)).astype(TIMESTAMP_DTYPE)
+        slots = hour_of_week(hour_starts)
+        return hour_starts, {field: self.profile(field)[slots] for field in FORECAST_FIELDS}
@@ -0,0 +1,199 @@
+"""
+Household Partitions for Energy Dashboard
+Every home's readings live in their own partition, named by the owner's User.public_id
+
+Each partition is an independent memory-mapped store with its own rollups.
+Questions about the whole fleet (fleet-wide solar, totals for a group of
+homes) fan out across a process pool: each worker maps the partitions it is
+given, reduces them, and only the small per-household results come back.
+"""
+
+import os
+import threading
+import uuid
+from datetime import datetime
+from functools import partial
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .. import config
+from .calculator import EnergyCalculator
+from .forecast import SeasonalProfiles
+from .insights import InsightsEngine
+from .reading_store import READING_FIELDS, MappedReadingStore, ReadingStore, TIMESTAMP_DTYPE
+from .rollups import RollupTiers
+from .solar_sizing import SolarSizingCache
+from .workers import chunked, pool_map
+
+
+def normalise_household_id(public_id: str) -> str:
+    """
+    Household ids are User.public_id values (UUIDs)
+    Raises ValueError for anything else, so ids are always safe to use as directory names
+    """
+    return str(uuid.UUID(str(public_id)))
+
+
+def merge_buckets(parts) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """Add up several (bucket starts, totals) results, lining buckets up by start time"""
+    parts = [part for part in parts if len(part[0])]
+    if not parts:
+        return np.empty(0, dtype=TIMESTAMP_DTYPE), {field: np.empty(0) for field in READING_FIELDS}
+    starts, positions = np.unique(np.concatenate([part[0] for part in parts]), return_inverse=True)
+    totals = {}
+    for field in READING_FIELDS:
+        totals[field] = np.zeros(len(starts))
+        np.add.at(totals[field], positions, np.concatenate([part[1][field] for part in parts]))
+    return starts, totals
+
+
+class HouseholdNotFound(LookupError):
+    """Raised when a household id is malformed or has no readings partition"""
+
+
+class Household:
+    """
+    One home's readings plus everything derived from them: rollups, insight
+    stats, forecast profiles and solar sizing tables, all kept up to date as
+    readings are added
+    """
+
+    def __init__(self, public_id: Optional[str], store: ReadingStore, calculator: EnergyCalculator = None):
+        self.public_id = public_id
+        self.store = store
+        self.rollups = RollupTiers(calculator)
+        self.rollups.attach(store)
+        self.insights = InsightsEngine()
+        self.insights.attach(store)
+        self.forecast = SeasonalProfiles()
+        self.forecast.attach(store)
+        self.sizing = SolarSizingCache(calculator)
+        self.sizing.attach(store)
+
+
+class HouseholdRegistry:
+    """
+    Opens household partitions on demand and keeps them open
+    Listeners added with subscribe() hear about new readings in every partition
+    """
+
+    def __init__(self, root: str, calculator: EnergyCalculator = None):
+        self.root = root
+        self.calculator = calculator or EnergyCalculator()
+        self._households: Dict[str, Household] = {}
+        self._listeners = []
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def path_for(self, public_id: str) -> str:
+        return os.path.join(self.root, normalise_household_id(public_id))
+
+    def ids(self) -> List[str]:
+        """Every household with a partition on disk"""
+        ids = []
+        for name in sorted(os.listdir(self.root)):
+            try:
+                ids.append(normalise_household_id(name))
+            except ValueError:
+                continue
+        return ids
+
+    def exists(self, public_id: str) -> bool:
+        return os.path.isdir(self.path_for(public_id))
+
+    def get(self, public_id: str, create: bool = False) -> Household:
+        """
+        The partition for `public_id` (refreshed with other workers' writes)
+        Raises HouseholdNotFound if it doesn't exist, unless `create` is set
+        """
+        public_id = self._normalise(public_id)
+        household = self._households.get(public_id)
+        if household is None:
+            if not create and not self.exists(public_id):
+                raise HouseholdNotFound(f"No readings stored for household {public_id}")
+            with self._lock:
+                household = self._households.get(public_id)
+                if household is None:
+                    store = MappedReadingStore.open(self.path_for(public_id))
+                    household = Household(public_id, store, self.calculator)
+                    for listener in self._listeners:
+                        household.store.subscribe(partial(listener, public_id))
+                    self._households[public_id] = household
+        household.store.refresh()
+        return household
+
+    def subscribe(self, listener):
+        """
+        Call `listener(public_id, window, reset)` whenever readings are added to
+        a partition (open now or opened later); see ReadingStore.subscribe
+        """
+        with self._lock:
+            self._listeners.append(listener)
+            for public_id, household in self._households.items():
+                household.store.subscribe(partial(listener, public_id))
+
+    # === FLEET-WIDE QUERIES ===
+
+    def fleet_totals(self, public_ids: Iterable[str] = None, start: datetime = None,
+                     end: datetime = None) -> Tuple[Dict[str, float], int]:
+        """
+        Total kWh per field across many households
+        Returns (totals, number of households included)
+        """
+        paths = self._paths(public_ids)
+        totals = {field: 0.0 for field in READING_FIELDS}
+        for chunk_totals in self._fan_out(_chunk_totals, paths, start, end):
+            for field in READING_FIELDS:
+                totals[field] += chunk_totals[field]
+        return totals, len(paths)
+
+    def fleet_bucket_totals(self, period: str, public_ids: Iterable[str] = None, start: datetime = None,
+                            end: datetime = None) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """Hour/day/week totals summed across many households"""
+        return merge_buckets(self._fan_out(_chunk_bucket_totals, self._paths(public_ids), start, end, period))
+
+    @staticmethod
+    def _normalise(public_id: str) -> str:
+        try:
+            return normalise_household_id(public_id)
+        except ValueError:
+            raise HouseholdNotFound(f"'{public_id}' is not a valid household id")
+
+    def _paths(self, public_ids) -> List[str]:
+        """Partition paths for the given households (all of them if None); unknown ones are skipped"""
+        ids = self.ids() if public_ids is None else [self._normalise(i) for i in public_ids]
+        return [self.path_for(i) for i in ids if self.exists(i)]
+
+    def _fan_out(self, task, paths: List[str], *args):
+        """
+        Run `task(paths_chunk, *args)` over every household
+        Small fleets run in this process; big ones are split across the process pool
+        """
+        if len(paths) < config.FLEET_PARALLEL_THRESHOLD:
+            if paths:
+                yield task(paths, *args)
+            return
+        chunks = chunked(paths)
+        yield from pool_map(task, chunks, *([arg] * len(chunks) for arg in args))
+
+
+# === WORKER TASKS ===
+# These run in pool processes, so they only take picklable arguments (paths)
+# and map each partition themselves - the readings are never copied between processes
+
+def _chunk_totals(paths: List[str], start, end) -> Dict[str, float]:
+    calculator = EnergyCalculator()
+    totals = {field: 0.0 for field in READING_FIELDS}
+    for path in paths:
+        household_totals = calculator.energy_totals(MappedReadingStore.open(path).range(start, end))
+        for field in READING_FIELDS:
+            totals[field] += household_totals[field]
+    return totals
+
+
+def _chunk_bucket_totals(paths: List[str], start, end, period: str):
+    calculator = EnergyCalculator()
+    return merge_buckets(
+        calculator.bucket_totals(MappedReadingStore.open(path).range(start, end), period) for path in paths
+    )
@@ -0,0 +1,225 @@
+"""
+Reading Ingestion for Energy Dashboard
+Takes thousands of meter readings per request (NDJSON or columnar binary frames),
+validates them a batch at a time and appends each batch to the store in one write
+
+Writes are limited by a small pool of slots: if the store can't keep up, new
+batches wait briefly for a slot and then give up with a backpressure error,
+so a flood of meter data slows clients down instead of piling up in memory
+"""
+
+import json
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+from .. import config
+from . import columnar
+from .reading_store import READING_FIELDS, ReadingStore, TIMESTAMP_DTYPE
+
+NDJSON_MEDIA_TYPES = ('application/x-ndjson', 'application/ndjson', 'application/jsonl')
+
+# How many rejected rows we describe in a response (the rest are only counted)
+MAX_REPORTED_ERRORS = 20
+
+
+class IngestBackpressure(Exception):
+    """Raised when writes are falling behind and the client should retry later"""
+
+    def __init__(self, retry_after: float, resume_from: int):
+        super().__init__(f"Ingestion is busy, retry in {retry_after:g}s")
+        self.retry_after = retry_after
+        self.resume_from = resume_from  # First row that was not stored
+
+
+class IngestResult:
+    """Running totals for one ingestion request"""
+
+    def __init__(self):
+        self.processed = 0  # Rows fully handled (accepted, rejected or already stored)
+        self.accepted = 0
+        self.rejected = 0
+        self.duplicates = 0  # Valid rows for a timestamp that was already stored (e.g. a retried batch)
+        self.batches = 0
+        self.errors: List[dict] = []
+        # Set when we stopped early because writes fell behind
+        self.retry_after = None
+        self.resume_from = None
+
+    def reject(self, rows, message: str):
+        """Record rejected rows (only the first few are described)"""
+        rows = np.atleast_1d(rows)
+        self.rejected += len(rows)
+        room = MAX_REPORTED_ERRORS - len(self.errors)
+        self.errors.extend({'row': int(row), 'error': message} for row in rows[:max(room, 0)])
+
+    @property
+    def throttled(self) -> bool:
+        return self.retry_after is not None
+
+    def to_dict(self):
+        """Convert to dictionary for JSON responses"""
+        data = {
+            'processed': self.processed,
+            'accepted': self.accepted,
+            'rejected': self.rejected,
+            'duplicates': self.duplicates,
+            'batches': self.batches,
+            'errors': self.errors,
+        }
+        if self.throttled:
+            data['resume_from'] = self.resume_from
+        return data
+
+
+class ReadingIngestor:
+    """
+    Parses, validates and stores bulk readings in fixed-size batches
+    Readings for a timestamp that's already stored are skipped, so a client can
+    safely re-send a batch it never got an answer for
+    """
+
+    def __init__(self, batch_size: int = None, max_pending: int = None, wait_seconds: float = None):
+        self.batch_size = batch_size or config.INGEST_BATCH_SIZE
+        self.wait_seconds = config.INGEST_WAIT_SECONDS if wait_seconds is None else wait_seconds
+        self._slots = threading.BoundedSemaphore(max_pending or config.INGEST_MAX_PENDING_BATCHES)
+
+    # === FORMATS ===
+
+    def ingest_ndjson(self, lines: Iterable[bytes], store: ReadingStore) -> IngestResult:
+        """
+        One JSON object per line, e.g.
+        {"timestamp": "2025-01-01T12:00:00", "solar_production": 3.2, "consumption": 1.1,
+         "grid_import": 0.0, "grid_export": 2.1}
+        """
+        result = IngestResult()
+        try:
+            self._ingest_lines(lines, store, result)
+        except IngestBackpressure as busy:
+            result.retry_after, result.resume_from = busy.retry_after, busy.resume_from
+        return result
+
+    def _ingest_lines(self, lines, store, result):
+        # Unreadable lines wait with the batch they fall in, so they're only
+        # counted once that batch is stored (not again when a client retries it)
+        batch_rows, batch_values, batch_times, unreadable = [], [], [], []
+        for row, line in enumerate(lines):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+                values = [float(record[field]) for field in READING_FIELDS]
+                timestamp = np.datetime64(record['timestamp'], 'us')
+            except (ValueError, TypeError, KeyError) as error:
+                unreadable.append((row, f"Unreadable reading: {error}"))
+                continue
+            batch_rows.append(row)
+            batch_values.append(values)
+            batch_times.append(timestamp)
+
+            if len(batch_rows) >= self.batch_size:
+                self._commit(store, batch_rows, batch_times, batch_values, result, unreadable)
+                batch_rows, batch_values, batch_times, unreadable = [], [], [], []
+
+        if batch_rows or unreadable:
+            self._commit(store, batch_rows, batch_times, batch_values, result, unreadable)
+
+    def ingest_frames(self, buffer, store: ReadingStore) -> IngestResult:
+        """
+        Columnar binary frames (see services.columnar) with 'timestamp' plus
+        one column per reading field - each frame is split into batches
+        Raises columnar.FrameError if the buffer isn't valid frames
+        """
+        result = IngestResult()
+        try:
+            self._ingest_frames(buffer, store, result)
+        except IngestBackpressure as busy:
+            result.retry_after, result.resume_from = busy.retry_after, busy.resume_from
+        return result
+
+    def _ingest_frames(self, buffer, store, result):
+        first_row = 0
+        for frame in columnar.decode_frames(buffer):
+            missing = [name for name in ('timestamp',) + READING_FIELDS if name not in frame]
+            if missing:
+                raise columnar.FrameError(f"Frame is missing columns: {', '.join(missing)}")
+            # The client picks each column's type - only convert the ones that mean what we need
+            if frame['timestamp'].dtype.kind != 'M':
+                raise columnar.FrameError("Column 'timestamp' must hold datetimes")
+            not_numbers = [field for field in READING_FIELDS if frame[field].dtype.kind not in 'fiu']
+            if not_numbers:
+                raise columnar.FrameError(f"Columns must hold numbers: {', '.join(not_numbers)}")
+            rows = len(frame['timestamp'])
+            for start in range(0, rows, self.batch_size):
+                stop = min(start + self.batch_size, rows)
+                self._store_batch(
+                    store,
+                    np.arange(first_row + start, first_row + stop),
+                    frame['timestamp'][start:stop].astype(TIMESTAMP_DTYPE),
+                    {field: frame[field][start:stop].astype(np.float64) for field in READING_FIELDS},
+                    result,
+                )
+            first_row += rows
+
+    # === VALIDATION & WRITING ===
+
+    def _commit(self, store, rows, timestamps, values, result, unreadable=()):
+        values = np.array(values, dtype=np.float64).reshape(-1, len(READING_FIELDS))
+        columns = {field: values[:, i] for i, field in enumerate(READING_FIELDS)}
+        self._store_batch(store, np.array(rows, dtype=np.int64), np.array(timestamps, dtype=TIMESTAMP_DTYPE),
+                          columns, result, unreadable)
+
+    def validate(self, timestamps: np.ndarray, columns: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """
+        Check a whole batch at once
+        Returns {reason: boolean mask of rows failing it}
+        """
+        latest = np.datetime64(datetime.now() + timedelta(minutes=config.INGEST_MAX_CLOCK_SKEW_MINUTES), 'us')
+        values = np.column_stack([columns[field] for field in READING_FIELDS])
+        balance = columns['consumption'] - columns['solar_production'] - columns['grid_import'] + columns['grid_export']
+        tolerance = np.maximum(config.INGEST_BALANCE_TOLERANCE, 0.05 * np.abs(columns['consumption']))
+        return {
+            'Missing timestamp': np.isnat(timestamps),
+            'Timestamp is in the future': timestamps > latest,
+            'Values must be finite numbers': ~np.isfinite(values).all(axis=1),
+            'Values must not be negative': (values < 0).any(axis=1),
+            'Readings do not balance (consumption = solar + import - export)': np.abs(balance) > tolerance,
+        }
+
+    def _store_batch(self, store, rows, timestamps, columns, result, unreadable=()):
+        """
+        Validate one batch and append the good rows with a single store write
+        `unreadable` is (row, message) for lines in this batch that couldn't be parsed
+        """
+        failures = self.validate(timestamps, columns)
+        bad = np.zeros(len(timestamps), dtype=bool)
+        for mask in failures.values():
+            bad |= mask
+        good = ~bad
+
+        if good.any():
+            if not self._slots.acquire(timeout=self.wait_seconds):
+                # Nothing from this batch has been counted yet, so a retry from resume_from starts clean
+                first_row = min([int(rows[0])] + [row for row, _ in unreadable[:1]])
+                raise IngestBackpressure(retry_after=max(self.wait_seconds, 1.0), resume_from=first_row)
+            try:
+                added = store.extend_arrays(timestamps[good], skip_existing=True,
+                                            **{field: values[good] for field, values in columns.items()})
+            finally:
+                self._slots.release()
+            result.accepted += added
+            result.duplicates += int(good.sum()) - added
+            result.batches += 1
+
+        # The batch is settled - now count what was rejected
+        for row, message in unreadable:
+            result.reject(row, message)
+        counted = np.zeros(len(timestamps), dtype=bool)
+        for reason, mask in failures.items():
+            if mask.any():
+                result.reject(rows[mask & ~counted], reason)
+                counted |= mask
+        result.processed += len(rows) + len(unreadable)
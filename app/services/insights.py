@@ -0,0 +1,226 @@
+"""
+Insights Engine for Energy Dashboard
+Turns running daily statistics into suggestions for the dashboard
+
+Per-day statistics (mean, variance, min/max and the share of usage in peak
+hours) are updated as readings arrive, so producing insights only means
+checking each rule against numbers that are already worked out - however
+many readings there are. Rules are small functions registered with a
+decorator, so adding a new one doesn't touch the endpoint.
+"""
+
+from datetime import date, datetime
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from .. import config
+from .reading_store import READING_FIELDS, ReadingStore, ReadingWindow
+
+
+class RunningStats:
+    """Count, mean, variance, min and max of one field, merged a batch at a time"""
+
+    __slots__ = ('count', 'mean', 'm2', 'minimum', 'maximum')
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # Sum of squared differences from the mean
+        self.minimum = float('inf')
+        self.maximum = float('-inf')
+
+    def merge(self, count: int, mean: float, m2: float, minimum: float, maximum: float):
+        """Combine with the stats of another batch (Chan et al.'s parallel update)"""
+        if not count:
+            return
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+        self.minimum = min(self.minimum, minimum)
+        self.maximum = max(self.maximum, maximum)
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / self.count if self.count else 0.0
+
+    @property
+    def std(self) -> float:
+        return self.variance ** 0.5
+
+
+class DayStats:
+    """Running statistics for one day of readings (values are kW)"""
+
+    def __init__(self, day: date):
+        self.day = day
+        self.fields = {field: RunningStats() for field in READING_FIELDS}
+        self.peak_consumption = 0.0  # Sum of consumption during peak hours
+
+    @property
+    def count(self) -> int:
+        return self.fields['consumption'].count
+
+    def mean(self, field: str) -> float:
+        return self.fields[field].mean
+
+    def std(self, field: str) -> float:
+        return self.fields[field].std
+
+    def minimum(self, field: str) -> float:
+        return self.fields[field].minimum
+
+    def maximum(self, field: str) -> float:
+        return self.fields[field].maximum
+
+    @property
+    def peak_share(self) -> float:
+        """Fraction of the day's consumption that happened in peak hours"""
+        total = self.fields['consumption'].mean * self.count
+        return self.peak_consumption / total if total > 0 else 0.0
+
+
+# === RULES ===
+
+class InsightRule:
+    """One suggestion: `check(today)` returns the message, or None if it doesn't apply"""
+
+    __slots__ = ('name', 'type', 'title', 'check')
+
+    def __init__(self, name: str, type: str, title: str, check: Callable[[DayStats], Optional[str]]):
+        self.name = name
+        self.type = type
+        self.title = title
+        self.check = check
+
+    def evaluate(self, today: DayStats) -> Optional[dict]:
+        message = self.check(today)
+        if message is None:
+            return None
+        return {'type': self.type, 'title': self.title, 'message': message}
+
+
+class InsightRules:
+    """An ordered set of rules, registered with the @rules.rule(...) decorator"""
+
+    def __init__(self):
+        self._rules: List[InsightRule] = []
+
+    def __iter__(self):
+        return iter(self._rules)
+
+    def __len__(self):
+        return len(self._rules)
+
+    def rule(self, type: str, title: str):
+        def register(check):
+            self._rules.append(InsightRule(check.__name__, type, title, check))
+            return check
+        return register
+
+    def evaluate(self, today: DayStats) -> List[dict]:
+        return [insight for insight in (rule.evaluate(today) for rule in self._rules) if insight]
+
+
+DEFAULT_RULES = InsightRules()
+
+
+@DEFAULT_RULES.rule('positive', 'Optimised Usage')
+def solar_surplus(today):
+    excess = today.mean('solar_production') - today.mean('consumption')
+    if excess > 0:
+        return f'Your solar panels are generating more than you consume! Average excess: {excess:.2f} kW'
+
+
+@DEFAULT_RULES.rule('warning', 'High Usage')
+def high_usage(today):
+    if today.mean('consumption') > config.PEAK_CONSUMPTION * 0.8:
+        return 'Your consumption is approaching peak capacity. Consider scheduling high-power tasks during solar peak hours.'
+
+
+@DEFAULT_RULES.rule('warning', 'Peak-Time Usage')
+def peak_time_usage(today):
+    if today.peak_share > config.INSIGHT_PEAK_SHARE_WARNING:
+        return (f"{today.peak_share:.0%} of today's usage was between {config.PEAK_HOURS_START}:00 and "
+                f"{config.PEAK_HOURS_END}:00. Running appliances earlier, while the panels are producing, cuts grid imports.")
+
+
+@DEFAULT_RULES.rule('positive', 'Strong Solar')
+def strong_solar(today):
+    best = today.maximum('solar_production')
+    if best >= config.MAX_SOLAR_CAPACITY * config.INSIGHT_STRONG_SOLAR_SHARE:
+        return f'Your panels reached {best:.1f} kW today - {best / config.MAX_SOLAR_CAPACITY:.0%} of their capacity.'
+
+
+@DEFAULT_RULES.rule('info', 'Uneven Usage')
+def uneven_usage(today):
+    mean, spread = today.mean('consumption'), today.std('consumption')
+    if mean > 0 and spread > mean * config.INSIGHT_UNEVEN_USAGE_RATIO:
+        return (f"Usage swung between {today.minimum('consumption'):.1f} and {today.maximum('consumption'):.1f} kW today. "
+                f"Spreading heavy loads out keeps demand (and grid imports) lower.")
+
+
+# === ENGINE ===
+
+class InsightsEngine:
+    """Keeps DayStats in step with a ReadingStore and evaluates rules against them"""
+
+    def __init__(self, rules: InsightRules = None):
+        self.rules = rules or DEFAULT_RULES
+        self.days: Dict[date, DayStats] = {}
+
+    def attach(self, store: ReadingStore):
+        """Work out stats for everything already in `store`, then follow new readings"""
+        self.add(store.all())
+        store.subscribe(self.add)
+
+    def add(self, window: ReadingWindow, reset: bool = False):
+        """Fold a batch of readings into the per-day stats (or start over on a reset)"""
+        if reset:
+            self.days = {}
+        if not len(window):
+            return
+
+        days = window.timestamps.astype('datetime64[D]')
+        order = np.argsort(days, kind='stable')
+        days = days[order]
+        firsts = np.flatnonzero(np.r_[True, days[1:] != days[:-1]])
+        counts = np.diff(np.r_[firsts, len(days)])
+        group = np.repeat(np.arange(len(firsts)), counts)
+
+        # Per-day batch stats for every field at once
+        batch = {}
+        for field in READING_FIELDS:
+            values = window.column(field)[order]
+            means = np.add.reduceat(values, firsts) / counts
+            m2 = np.add.reduceat((values - means[group]) ** 2, firsts)
+            batch[field] = (means, m2, np.minimum.reduceat(values, firsts), np.maximum.reduceat(values, firsts))
+
+        hours = (window.timestamps[order] - days).astype('timedelta64[h]').astype(int)
+        in_peak = (hours >= config.PEAK_HOURS_START) & (hours < config.PEAK_HOURS_END)
+        peak = np.add.reduceat(np.where(in_peak, window.consumption[order], 0.0), firsts)
+
+        for i, day in enumerate(days[firsts].tolist()):
+            stats = self.days.get(day)
+            if stats is None:
+                stats = self.days[day] = DayStats(day)
+            for field, (means, m2, minimum, maximum) in batch.items():
+                stats.fields[field].merge(int(counts[i]), float(means[i]), float(m2[i]),
+                                          float(minimum[i]), float(maximum[i]))
+            stats.peak_consumption += float(peak[i])
+
+    def day(self, day: date) -> Optional[DayStats]:
+        return self.days.get(day)
+
+    def evaluate(self, now: datetime = None) -> List[dict]:
+        """Insights for today (one check per rule - no readings are scanned)"""
+        today = self.day((now or datetime.now()).date())
+        if today is None or not today.count:
+            return [{
+                'type': 'info',
+                'title': 'No Data',
+                'message': 'Not enough data to generate insights yet.'
+            }]
+        return self.rules.evaluate(today)
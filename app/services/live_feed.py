@@ -0,0 +1,141 @@
+"""
+Live Feed for Energy Dashboard
+Pushes live readings and metric updates to every open dashboard
+(Server-Sent Events) from one shared producer thread
+
+However many dashboards are connected, the producer computes each update
+once and every client just receives a copy, so server work no longer grows
+with the number of open browser tabs
+"""
+
+import json
+import logging
+import queue
+import threading
+from typing import Callable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _delta(old, new):
+    """Numeric difference between two nested dicts (keys that aren't numbers are skipped)"""
+    if isinstance(new, dict) and isinstance(old, dict):
+        changes = {key: _delta(old.get(key), value) for key, value in new.items()}
+        return {key: value for key, value in changes.items() if value is not None}
+    if isinstance(new, (int, float)) and isinstance(old, (int, float)) and not isinstance(new, bool):
+        return round(new - old, 4)
+    return None
+
+
+class LiveFeedFull(Exception):
+    """Raised when the feed already has as many subscribers as it allows"""
+
+
+def format_event(event: str, data: dict) -> str:
+    """Encode one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+class LiveFeed:
+    """
+    Broadcasts the result of `produce()` every `interval` seconds
+
+    Each subscriber gets a small queue; if a slow client falls behind, its
+    oldest updates are dropped (the next one carries full values anyway).
+    The producer thread only runs while someone is listening, and at most
+    `max_subscribers` can listen at once (None = no limit).
+    """
+
+    def __init__(self, produce: Callable[[], dict], interval: float, queue_size: int = 8,
+                 max_subscribers: Optional[int] = None):
+        self.produce = produce
+        self.interval = interval
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self.latest: Optional[dict] = None
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # === SUBSCRIBERS ===
+
+    def subscribe(self) -> queue.Queue:
+        """
+        Register a new listener (starting the producer if needed)
+        Raises LiveFeedFull if there are already max_subscribers
+        """
+        subscriber = queue.Queue(maxsize=self.queue_size)
+        with self._lock:
+            if self.max_subscribers is not None and len(self._subscribers) >= self.max_subscribers:
+                raise LiveFeedFull(f"Already streaming to {len(self._subscribers)} clients")
+            self._subscribers.add(subscriber)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='live-feed', daemon=True)
+                self._thread.start()
+        return subscriber
+
+    def unsubscribe(self, subscriber: queue.Queue):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def poke(self, *args):
+        """Ask for an update straight away (e.g. when new readings are stored)"""
+        self._wake.set()
+
+    # === BROADCASTING ===
+
+    def publish(self, payload: dict):
+        """Send an update to everyone, with deltas against the previous update"""
+        update = dict(payload)
+        if self.latest is not None:
+            update['delta'] = _delta(self.latest, payload)
+        self.latest = payload
+        message = format_event('update', update)
+
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            while True:
+                try:
+                    subscriber.put_nowait(message)
+                    break
+                except queue.Full:
+                    try:
+                        subscriber.get_nowait()  # Drop the oldest update
+                    except queue.Empty:
+                        pass
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._subscribers:
+                    self._thread = None
+                    return
+            try:
+                self.publish(self.produce())
+            except Exception:  # Keep the feed alive for everyone else
+                logger.exception("Live feed update failed")
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def stream(self, subscriber: queue.Queue, heartbeat: float = 15.0) -> Iterator[str]:
+        """
+        Server-Sent Events for one client (from subscribe()): the latest update straight
+        away, then every new one, with comment heartbeats to keep proxies from timing out
+        """
+        try:
+            yield f"retry: {int(self.interval * 1000)}\n\n"
+            if self.latest is not None:
+                yield format_event('update', self.latest)
+            while True:
+                try:
+                    yield subscriber.get(timeout=heartbeat)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+        finally:
+            self.unsubscribe(subscriber)
@@ -0,0 +1,120 @@
+"""
+Quantile Sketches
+Approximate percentiles over every value ever added, in a small fixed amount of space
+
+A KLL sketch keeps values in levels. Each level holds a sample in which
+every value stands for 2 ** level of the originals; when the sketch
+gets too big, the lowest full level is sorted and every other value (odd or
+even at random) moves up a level. The ranks this answers are within about
+1.7 / k of the truth (k = 200: under 1%) however many values went in, two
+sketches merge into one describing both, and the whole thing is a plain
+dict of lists for storing as JSON.
+"""
+
+import random
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from typing import Dict, List, Optional
+
+# Size of the top level - accuracy is about 1.7 / k, space about 3k values
+DEFAULT_K = 200
+# Each level down is this much smaller than the one above (but at least MIN_LEVEL_CAPACITY)
+LEVEL_SHRINK = 2 / 3
+MIN_LEVEL_CAPACITY = 8
+
+
+class KLLSketch:
+    """A mergeable quantile sketch of a stream of numbers"""
+
+    def __init__(self, k: int = DEFAULT_K, seed: Optional[int] = None):
+        self.k = k
+        self.count = 0
+        self.levels: List[List[float]] = [[]]
+        self._random = random.Random(seed)
+        self._cdf = None
+
+    # === ADDING ===
+
+    def update(self, value: float):
+        """Add one value"""
+        self.levels[0].append(float(value))
+        self.count += 1
+        self._cdf = None
+        self._compress()
+
+    def merge(self, other: 'KLLSketch'):
+        """Fold another sketch (of the same k) into this one"""
+        while len(self.levels) < len(other.levels):
+            self.levels.append([])
+        for level, values in enumerate(other.levels):
+            self.levels[level].extend(values)
+        self.count += other.count
+        self._cdf = None
+        self._compress()
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(MIN_LEVEL_CAPACITY, int(self.k * LEVEL_SHRINK ** depth))
+
+    def _size(self) -> int:
+        return sum(len(values) for values in self.levels)
+
+    def _max_size(self) -> int:
+        return sum(self._capacity(level) for level in range(len(self.levels)))
+
+    def _compress(self):
+        # Promote half of the lowest full level until the sketch fits again
+        while self._size() >= self._max_size():
+            for level, values in enumerate(self.levels):
+                if len(values) >= self._capacity(level):
+                    break
+            if level + 1 == len(self.levels):
+                self.levels.append([])
+            values.sort()
+            # An odd value out stays behind, the rest are halved
+            keep = [values.pop()] if len(values) % 2 else []
+            self.levels[level + 1].extend(values[self._random.getrandbits(1)::2])
+            self.levels[level] = keep
+
+    # === QUERIES ===
+
+    def _sorted(self):
+        """(sorted values, cumulative weights) - built once per change, so queries are a binary search"""
+        if self._cdf is None:
+            weighted = sorted((value, 1 << level) for level, values in enumerate(self.levels) for value in values)
+            self._cdf = ([value for value, _ in weighted], list(accumulate(weight for _, weight in weighted)))
+        return self._cdf
+
+    def rank(self, value: float) -> float:
+        """Share of the values below `value` (ties count half), from 0 to 1"""
+        values, weights = self._sorted()
+        if not values:
+            return 0.0
+        below = bisect_left(values, value)
+        up_to = bisect_right(values, value)
+        below_weight = weights[below - 1] if below else 0
+        up_to_weight = weights[up_to - 1] if up_to else 0
+        return (below_weight + up_to_weight) / 2 / weights[-1]
+
+    def quantile(self, q: float) -> Optional[float]:
+        """The value at share `q` (0 to 1) of the way through, or None if the sketch is empty"""
+        values, weights = self._sorted()
+        if not values:
+            return None
+        index = bisect_left(weights, q * weights[-1])
+        return values[min(index, len(values) - 1)]
+
+    # === STORAGE ===
+
+    def to_dict(self) -> Dict:
+        return {'k': self.k, 'count': self.count, 'levels': self.levels}
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict], k: int = DEFAULT_K) -> 'KLLSketch':
+        """A sketch from to_dict() output (an empty one for None)"""
+        if not data:
+            return cls(k)
+        sketch = cls(data.get('k', k))
+        sketch.count = data['count']
+        sketch.levels = [list(values) for values in data['levels']] or [[]]
+        return sketch
@@ -0,0 +1,606 @@
+"""
+Reading Store for Energy Dashboard
+Keeps energy readings as sorted, column-oriented NumPy arrays so that
+time range queries are a binary search instead of a full scan
+"""
+
+import json
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Iterable, List, Optional
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows - the dev server is a single process, so no locking needed
+    fcntl = None
+
+from ..models.energy_data import EnergyReading
+
+# The value columns every reading carries (in EnergyReading field order)
+READING_FIELDS = ('solar_production', 'consumption', 'grid_import', 'grid_export')
+
+# Timestamps are stored as naive datetime64 values with microsecond precision,
+# which round-trips exactly with the naive datetimes used across the app
+TIMESTAMP_DTYPE = 'datetime64[us]'
+
+
+def to_datetime64(value) -> np.datetime64:
+    """Convert a datetime (or anything NumPy understands) to our timestamp type"""
+    return np.datetime64(value, 'us')
+
+
+# One reading as JSON - %r of a float is its shortest exact form, just like json.dumps
+_READING_JSON = '{"timestamp":"%s",' + ','.join(f'"{field}":%r' for field in READING_FIELDS) + '}'
+
+
+class ReadingWindow:
+    """
+    A read-only, columnar slice of readings
+    The arrays are views into the store, so creating a window costs nothing
+    """
+
+    __slots__ = ('timestamps',) + READING_FIELDS
+
+    def __init__(self, timestamps, solar_production, consumption, grid_import, grid_export):
+        self.timestamps = timestamps
+        self.solar_production = solar_production
+        self.consumption = consumption
+        self.grid_import = grid_import
+        self.grid_export = grid_export
+
+    @classmethod
+    def from_readings(cls, readings: Iterable[EnergyReading]) -> 'ReadingWindow':
+        """Build a window from EnergyReading objects (e.g. a plain list)"""
+        readings = list(readings)
+        columns = {
+            field: np.fromiter((getattr(r, field) for r in readings), dtype=np.float64, count=len(readings))
+            for field in READING_FIELDS
+        }
+        timestamps = np.array([r.timestamp for r in readings], dtype=TIMESTAMP_DTYPE)
+        order = np.argsort(timestamps, kind='stable')
+        if len(order) and np.any(order != np.arange(len(order))):
+            timestamps = timestamps[order]
+            columns = {field: values[order] for field, values in columns.items()}
+        return cls(timestamps, **columns)
+
+    @classmethod
+    def empty(cls) -> 'ReadingWindow':
+        """A window with no readings in it"""
+        return cls(np.empty(0, dtype=TIMESTAMP_DTYPE), *(np.empty(0) for _ in READING_FIELDS))
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def __iter__(self):
+        return iter(self.to_readings())
+
+    def column(self, field: str) -> np.ndarray:
+        """Get one value column by name"""
+        if field not in READING_FIELDS:
+            raise KeyError(field)
+        return getattr(self, field)
+
+    def with_readings(self, readings: Iterable[EnergyReading]) -> 'ReadingWindow':
+        """A new window with some extra readings (e.g. the live one) added on the end"""
+        extra = ReadingWindow.from_readings(readings)
+        if not len(extra):
+            return self
+        return ReadingWindow(
+            np.concatenate([self.timestamps, extra.timestamps]),
+            *(np.concatenate([getattr(self, field), getattr(extra, field)]) for field in READING_FIELDS)
+        )
+
+    def to_json(self) -> str:
+        """
+        The window as a JSON array of reading objects (same shape as EnergyReading.to_dict())
+        Built a column at a time - no EnergyReading objects or dicts are created
+        """
+        if not len(self):
+            return '[]'
+        # isoformat() only shows microseconds when there are some
+        timestamps = np.datetime_as_string(self.timestamps, unit='s')
+        fractional = self.timestamps.astype(np.int64) % 1_000_000 != 0
+        if fractional.any():
+            timestamps = np.where(fractional, np.datetime_as_string(self.timestamps, unit='us'), timestamps)
+        columns = [np.round(getattr(self, field), 2).tolist() for field in READING_FIELDS]
+        return '[' + ','.join(map(_READING_JSON.__mod__, zip(timestamps.tolist(), *columns))) + ']'
+
+    def to_readings(self) -> List[EnergyReading]:
+        """Materialise the window back into EnergyReading objects"""
+        return [
+            EnergyReading(timestamp, *values)
+            for timestamp, *values in zip(
+                self.timestamps.astype(datetime).tolist(),
+                *(getattr(self, field).tolist() for field in READING_FIELDS)
+            )
+        ]
+
+
+def as_window(readings) -> ReadingWindow:
+    """Accept a window, a whole store or any iterable of EnergyReadings"""
+    if isinstance(readings, ReadingWindow):
+        return readings
+    if isinstance(readings, ReadingStore):
+        return readings.all()
+    return ReadingWindow.from_readings(readings)
+
+
+class ReadingStore:
+    """
+    An append-friendly store of readings kept sorted by timestamp
+
+    Each field lives in its own NumPy array (struct-of-arrays). Arrays grow by
+    doubling, so appending in time order is amortised O(1), and range queries
+    use binary search, so they cost O(log n) plus the size of the result.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        capacity = max(int(capacity), 1)
+        self._size = 0
+        self._timestamps = np.empty(capacity, dtype=TIMESTAMP_DTYPE)
+        self._columns = {field: np.empty(capacity, dtype=np.float64) for field in READING_FIELDS}
+        self._listeners = []
+
+    @classmethod
+    def from_readings(cls, readings: Iterable[EnergyReading]) -> 'ReadingStore':
+        """Build a store from EnergyReading objects"""
+        store = cls()
+        store.extend(readings)
+        return store
+
+    # === SIZE & RAW ACCESS ===
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        """All timestamps, oldest first (a view, do not modify)"""
+        return self._timestamps[:self._size]
+
+    def column(self, field: str) -> np.ndarray:
+        """All values for one field, in timestamp order (a view, do not modify)"""
+        return self._columns[field][:self._size]
+
+    @property
+    def first_timestamp(self) -> Optional[datetime]:
+        timestamps = self.timestamps
+        return timestamps[0].item() if len(timestamps) else None
+
+    @property
+    def last_timestamp(self) -> Optional[datetime]:
+        timestamps = self.timestamps
+        return timestamps[-1].item() if len(timestamps) else None
+
+    # === WRITING ===
+
+    def append(self, reading: EnergyReading):
+        """Add a single reading"""
+        self.extend([reading])
+
+    def extend(self, readings: Iterable[EnergyReading]):
+        """Add many readings at once"""
+        window = readings if isinstance(readings, ReadingWindow) else ReadingWindow.from_readings(readings)
+        self.extend_arrays(window.timestamps, **{field: getattr(window, field) for field in READING_FIELDS})
+
+    def extend_arrays(self, timestamps, solar_production, consumption, grid_import, grid_export,
+                      skip_existing: bool = False) -> int:
+        """
+        Add many readings given as arrays (the fast path - no Python objects)
+        Batches that arrive in time order are a plain copy onto the end;
+        anything older than the newest stored reading is merged into place.
+        With skip_existing, readings for a timestamp that's already stored (or
+        repeated in the batch) are dropped, so re-sending a batch is harmless.
+        Returns how many readings were added.
+        """
+        timestamps = np.asarray(timestamps, dtype=TIMESTAMP_DTYPE)
+        columns = {
+            'solar_production': np.asarray(solar_production, dtype=np.float64),
+            'consumption': np.asarray(consumption, dtype=np.float64),
+            'grid_import': np.asarray(grid_import, dtype=np.float64),
+            'grid_export': np.asarray(grid_export, dtype=np.float64),
+        }
+        count = len(timestamps)
+        if any(len(values) != count for values in columns.values()):
+            raise ValueError("All reading columns must have the same length")
+        if count == 0:
+            return 0
+
+        # Make sure the batch itself is sorted
+        if count > 1 and np.any(timestamps[1:] < timestamps[:-1]):
+            order = np.argsort(timestamps, kind='stable')
+            timestamps = timestamps[order]
+            columns = {field: values[order] for field, values in columns.items()}
+
+        if skip_existing:
+            timestamps, columns = self._without_existing(timestamps, columns)
+            count = len(timestamps)
+            if count == 0:
+                return 0
+
+        self._reserve(self._size + count)
+        start, end = self._size, self._size + count
+
+        if self._size == 0 or timestamps[0] >= self._timestamps[self._size - 1]:
+            # Common case: new readings are newer than everything we have
+            self._timestamps[start:end] = timestamps
+            for field, values in columns.items():
+                self._columns[field][start:end] = values
+        else:
+            # Late readings: merge them in, keeping equal timestamps stable.
+            # This writes fresh arrays so windows handed out earlier never change.
+            positions = np.searchsorted(self.timestamps, timestamps, side='right')
+            capacity = len(self._timestamps)
+            merged = np.empty(capacity, dtype=TIMESTAMP_DTYPE)
+            merged[:end] = np.insert(self.timestamps, positions, timestamps)
+            self._timestamps = merged
+            for field, values in columns.items():
+                merged = np.empty(capacity, dtype=np.float64)
+                merged[:end] = np.insert(self.column(field), positions, values)
+                self._columns[field] = merged
+
+        self._size = end
+        self._notify(ReadingWindow(timestamps, **columns))
+        return count
+
+    def _without_existing(self, timestamps, columns):
+        """A sorted batch without the readings whose timestamp is stored already (or earlier in the batch)"""
+        stored = self.timestamps
+        new = np.r_[True, timestamps[1:] != timestamps[:-1]]
+        if len(stored):
+            positions = np.minimum(np.searchsorted(stored, timestamps), len(stored) - 1)
+            new &= stored[positions] != timestamps
+        if new.all():
+            return timestamps, columns
+        return timestamps[new], {field: values[new] for field, values in columns.items()}
+
+    def subscribe(self, listener):
+        """
+        Call `listener(window, reset)` with every batch of newly added readings
+        This is how derived data (rollups etc.) stays up to date incrementally.
+        When `reset` is True the store was rebuilt: anything derived so far is
+        stale and `window` holds the complete history to start again from.
+        """
+        self._listeners.append(listener)
+
+    def _notify(self, window: ReadingWindow, reset: bool = False):
+        for listener in self._listeners:
+            listener(window, reset)
+
+    def _reserve(self, capacity: int):
+        """Grow the backing arrays (by doubling) so they can hold `capacity` readings"""
+        if capacity <= len(self._timestamps):
+            return
+        new_capacity = max(capacity, 2 * len(self._timestamps))
+        timestamps = np.empty(new_capacity, dtype=TIMESTAMP_DTYPE)
+        timestamps[:self._size] = self.timestamps
+        self._timestamps = timestamps
+        for field in READING_FIELDS:
+            values = np.empty(new_capacity, dtype=np.float64)
+            values[:self._size] = self.column(field)
+            self._columns[field] = values
+
+    # === QUERYING ===
+
+    def range(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> ReadingWindow:
+        """
+        Get readings with start <= timestamp < end
+        Either bound can be None to leave that side open
+        """
+        timestamps, columns = self._arrays()
+        lo, hi = self._bounds(timestamps, start, end)
+        return ReadingWindow(timestamps[lo:hi], *(columns[field][lo:hi] for field in READING_FIELDS))
+
+    def since(self, start: Optional[datetime]) -> ReadingWindow:
+        """Get every reading at or after `start`"""
+        return self.range(start, None)
+
+    def all(self) -> ReadingWindow:
+        """Get every reading in the store"""
+        return self.range()
+
+    def count(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> int:
+        """Count readings in a time range without touching the values"""
+        lo, hi = self._bounds(self.timestamps, start, end)
+        return hi - lo
+
+    def _arrays(self):
+        """(timestamps, {field: values}) for every reading, all the same length (views, do not modify)"""
+        return self.timestamps, {field: self.column(field) for field in READING_FIELDS}
+
+    @staticmethod
+    def _bounds(timestamps, start, end):
+        """Binary search for the index range of `timestamps` covering [start, end)"""
+        lo = 0 if start is None else int(np.searchsorted(timestamps, to_datetime64(start), side='left'))
+        hi = len(timestamps) if end is None else int(np.searchsorted(timestamps, to_datetime64(end), side='left'))
+        return lo, max(lo, hi)
+
+
+class MappedReadingStore(ReadingStore):
+    """
+    A ReadingStore persisted to disk and opened memory-mapped
+
+    Each column is a raw little-endian file in `path`, described by meta.json.
+    Workers map the files read-only, so the OS page cache shares one copy of
+    the history between every process, startup is just an mmap, and the data
+    survives restarts. Appends go straight to the files under an exclusive
+    lock; other processes pick them up on their next refresh().
+
+    Late readings are merged into a copy of the files (a new generation), so
+    mappings other processes hold never change under them. The copy records
+    where the late readings went, so listeners - here and in every process
+    that refreshes straight from the previous generation - are only handed
+    the new readings, never the whole history again.
+
+    The mapped columns are swapped in as one tuple, so readers in other
+    threads always see columns of the same length from the same files, and
+    listeners are only ever called while holding the thread lock.
+    """
+
+    FORMAT = 'rolsa-readings'
+    VERSION = 1
+    DTYPES = dict([('timestamps', '<M8[us]')] + [(field, '<f8') for field in READING_FIELDS])
+
+    def __init__(self, path: str):
+        super().__init__(capacity=1)
+        self.path = path
+        self._generation = 0
+        self._meta_stamp = None
+        self._thread_lock = threading.RLock()
+        self._lock_file = None
+        os.makedirs(path, exist_ok=True)
+        self._load()
+
+    @classmethod
+    def open(cls, path: str) -> 'MappedReadingStore':
+        """Open (or create) the history stored in directory `path`"""
+        return cls(path)
+
+    # === FILES ===
+
+    @property
+    def _meta_path(self):
+        return os.path.join(self.path, 'meta.json')
+
+    def _column_path(self, name: str, generation: int) -> str:
+        return os.path.join(self.path, f'{name}.{generation}.bin')
+
+    def _inserted_path(self, generation: int) -> str:
+        """Where the late readings merged into `generation` ended up (row numbers)"""
+        return os.path.join(self.path, f'inserted.{generation}.bin')
+
+    def _read_meta(self) -> dict:
+        try:
+            with open(self._meta_path) as f:
+                meta = json.load(f)
+        except FileNotFoundError:
+            return {'format': self.FORMAT, 'version': self.VERSION, 'generation': 0, 'count': 0}
+        if meta.get('format') != self.FORMAT or meta.get('version') != self.VERSION:
+            raise ValueError(f"{self.path} is not a version {self.VERSION} reading history")
+        return meta
+
+    def _write_meta(self, generation: int, count: int, merge: dict = None):
+        """Publish a new row count - written last, and atomically, so readers never see torn data"""
+        meta = {
+            'format': self.FORMAT,
+            'version': self.VERSION,
+            'generation': generation,
+            'count': count,
+            'columns': self.DTYPES,
+        }
+        if merge:
+            meta['merge'] = merge
+        temp_path = self._meta_path + '.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(meta, f)
+        os.replace(temp_path, self._meta_path)
+
+    def _stamp(self):
+        try:
+            stat = os.stat(self._meta_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def _map(self, name: str, generation: int, count: int) -> np.ndarray:
+        dtype = np.dtype(self.DTYPES[name])
+        if count == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(self._column_path(name, generation), dtype=dtype, mode='r', shape=(count,))
+
+    def _load(self) -> dict:
+        """(Re)map the columns described by meta.json"""
+        with self._thread_lock:
+            self._meta_stamp = self._stamp()
+            meta = self._read_meta()
+            generation, count = meta['generation'], meta['count']
+            timestamps = self._map('timestamps', generation, count)
+            columns = {field: self._map(field, generation, count) for field in READING_FIELDS}
+            self._mapped = (timestamps, columns)
+            self._timestamps, self._columns = timestamps, columns
+            self._generation = generation
+            self._size = count
+            return meta
+
+    @contextmanager
+    def locked(self):
+        """
+        Hold the history's exclusive write lock
+        The file lock excludes other processes, the RLock other threads; nesting is fine
+        """
+        with self._thread_lock:
+            if self._lock_file is not None:
+                yield
+                return
+            with open(os.path.join(self.path, 'lock'), 'a') as lock_file:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                self._lock_file = lock_file
+                try:
+                    yield
+                finally:
+                    self._lock_file = None
+                    if fcntl:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    # === READING ===
+    # Everything is read through one reference to the current mapping
+
+    def __len__(self):
+        return len(self._mapped[0])
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        return self._mapped[0]
+
+    def column(self, field: str) -> np.ndarray:
+        return self._mapped[1][field]
+
+    def _arrays(self):
+        return self._mapped
+
+    def refresh(self) -> bool:
+        """
+        Pick up readings written by other processes (a cheap stat when nothing changed)
+        Returns True if the store changed
+        """
+        if self._stamp() == self._meta_stamp:
+            return False
+        with self._thread_lock:
+            if self._stamp() == self._meta_stamp:
+                return False  # Another thread got here first
+            old_generation, old_size = self._generation, self._size
+            meta = self._load()
+            if self._generation != old_generation:
+                added = self._added_since(meta, old_generation, old_size)
+                if added is None:
+                    self._notify(self.all(), reset=True)
+                elif len(added):
+                    timestamps, columns = self._mapped
+                    self._notify(ReadingWindow(timestamps[added], *(columns[field][added] for field in READING_FIELDS)))
+            elif self._size > old_size:
+                self._notify(ReadingWindow(
+                    self.timestamps[old_size:],
+                    *(self.column(field)[old_size:] for field in READING_FIELDS)
+                ))
+            return True
+
+    def _added_since(self, meta: dict, old_generation: int, old_size: int) -> Optional[np.ndarray]:
+        """
+        Row numbers (in the current generation) of every reading that wasn't in the first
+        `old_size` rows of `old_generation` - None if this generation wasn't merged
+        straight from that one, and the history has to be read from scratch
+        """
+        merge = meta.get('merge')
+        if not merge or merge['parent'] != old_generation or merge['parent_count'] < old_size:
+            return None
+        try:
+            inserted = np.fromfile(self._inserted_path(self._generation), dtype='<i8')
+        except FileNotFoundError:
+            return None
+        # The parent's rows are the ones that weren't inserted, still in order
+        kept = np.ones(merge['count'], dtype=bool)
+        kept[inserted] = False
+        added = np.ones(self._size, dtype=bool)
+        added[np.flatnonzero(kept)[:old_size]] = False
+        return np.flatnonzero(added)
+
+    # === WRITING ===
+
+    def extend_arrays(self, timestamps, solar_production, consumption, grid_import, grid_export,
+                      skip_existing: bool = False) -> int:
+        """
+        Append readings to the files (late readings are merged into a copy of them)
+        With skip_existing, timestamps already stored are dropped under the write lock,
+        so two processes storing the same batch only add it once. Returns how many were added.
+        """
+        timestamps = np.asarray(timestamps, dtype=TIMESTAMP_DTYPE)
+        columns = {
+            'solar_production': np.asarray(solar_production, dtype=np.float64),
+            'consumption': np.asarray(consumption, dtype=np.float64),
+            'grid_import': np.asarray(grid_import, dtype=np.float64),
+            'grid_export': np.asarray(grid_export, dtype=np.float64),
+        }
+        count = len(timestamps)
+        if any(len(values) != count for values in columns.values()):
+            raise ValueError("All reading columns must have the same length")
+        if count == 0:
+            return 0
+        if count > 1 and np.any(timestamps[1:] < timestamps[:-1]):
+            order = np.argsort(timestamps, kind='stable')
+            timestamps = timestamps[order]
+            columns = {field: values[order] for field, values in columns.items()}
+
+        # The thread lock is held through the listeners too, so they never update their
+        # state from two threads at once; other processes only wait for the file writes
+        with self._thread_lock:
+            with self.locked():
+                self.refresh()
+                if skip_existing:
+                    timestamps, columns = self._without_existing(timestamps, columns)
+                    if not len(timestamps):
+                        return 0
+                if self._size == 0 or timestamps[0] >= self.timestamps[-1]:
+                    self._append_files(timestamps, columns)
+                else:
+                    self._rewrite_files(timestamps, columns)
+                self._load()
+
+            # Late or not, listeners only need the new readings (they merge them into place)
+            self._notify(ReadingWindow(timestamps, **columns))
+            return len(timestamps)
+
+    def _append_files(self, timestamps, columns):
+        generation, size = self._generation, self._size
+        for name, values in [('timestamps', timestamps)] + list(columns.items()):
+            dtype = np.dtype(self.DTYPES[name])
+            with open(self._column_path(name, generation), 'ab') as f:
+                f.truncate(size * dtype.itemsize)  # Drop anything left by an interrupted write
+                f.write(np.ascontiguousarray(values, dtype=dtype).tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+        # Appends keep the generation's merge record, so laggards can still catch up from its parent
+        self._write_meta(generation, size + len(timestamps), merge=self._read_meta().get('merge'))
+
+    def _rewrite_files(self, timestamps, columns):
+        """Late readings: write a merged copy as a new generation, then switch over"""
+        old_generation, generation = self._generation, self._generation + 1
+        positions = np.searchsorted(self.timestamps, timestamps, side='right')
+        merged = {'timestamps': np.insert(self.timestamps, positions, timestamps)}
+        for field, values in columns.items():
+            merged[field] = np.insert(self.column(field), positions, values)
+        # Row numbers the late readings ended up at, for other processes' listeners
+        inserted = positions + np.arange(len(positions))
+
+        files = [(self._column_path(name, generation), np.ascontiguousarray(values, dtype=self.DTYPES[name]))
+                 for name, values in merged.items()]
+        files.append((self._inserted_path(generation), inserted.astype('<i8')))
+        for path, values in files:
+            with open(path, 'wb') as f:
+                f.write(values.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+        count = len(merged['timestamps'])
+        self._write_meta(generation, count, merge={'parent': old_generation, 'parent_count': self._size, 'count': count})
+
+        # Processes still mapping the old files keep them alive until they refresh
+        for path in [self._column_path(name, old_generation) for name in self.DTYPES] + [self._inserted_path(old_generation)]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def top_up(self, generate: Callable[[Optional[datetime]], Optional[ReadingWindow]]):
+        """
+        Under the write lock, call `generate(last_timestamp)` and append what it returns
+        Used at startup so exactly one process creates (or extends) the history
+        """
+        with self.locked():
+            self.refresh()
+            window = generate(self.last_timestamp)
+            if window is not None and len(window):
+                self.extend(window)
@@ -0,0 +1,138 @@
+"""
+Response Cache for Energy Dashboard
+Remembers API responses so identical requests don't recompute the same result
+
+Entries are keyed by endpoint and query arguments, expire after a TTL and are
+evicted least-recently-used once the cache is full. Each entry also belongs to
+a scope (the household whose readings it was computed from), so new readings
+for one home only drop that home's entries. Responses carry an ETag, so a browser that
+already has the latest copy gets an empty 304 Not Modified instead.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import Response, request
+
+
+class CacheEntry:
+    """One cached response body"""
+
+    __slots__ = ('body', 'mimetype', 'headers', 'etag', 'expires')
+
+    def __init__(self, body: bytes, mimetype: str, ttl: float, headers: dict = None):
+        self.body = body
+        self.mimetype = mimetype
+        self.headers = headers or {}  # Extra headers the view set (e.g. X-Total-Points)
+        self.etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+        self.expires = time.monotonic() + ttl
+
+    @property
+    def fresh(self) -> bool:
+        return time.monotonic() < self.expires
+
+
+class ResponseCache:
+    """A thread-safe, size-bounded LRU cache of API responses"""
+
+    def __init__(self, max_entries: int = 512, scope=None):
+        self.max_entries = max_entries
+        self.scope = scope or (lambda: None)  # Which scope the current request's response belongs to
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0  # Bumped when everything is invalidated
+        self._scope_generations = {}  # Bumped when one scope is invalidated
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """The fresh entry for `key`, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if not entry.fresh:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def generation(self, scope):
+        """Changes whenever `scope` is invalidated (entries are keyed by (scope, ...))"""
+        return self._generation, self._scope_generations.get(scope, 0)
+
+    def put(self, key, entry: CacheEntry, generation):
+        """Store an entry - unless the data changed while it was being computed"""
+        with self._lock:
+            if generation != self.generation(key[0]):
+                return
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *scopes):
+        """Drop the entries in the given scopes (everything if no scopes are given)"""
+        with self._lock:
+            if not scopes:
+                self._generation += 1
+                self._entries.clear()
+                return
+            for scope in scopes:
+                self._scope_generations[scope] = self._scope_generations.get(scope, 0) + 1
+            for key in [key for key in self._entries if key[0] in scopes]:
+                del self._entries[key]
+
+    def cached(self, ttl: float, vary: tuple = (), scope=None):
+        """
+        Decorator for Flask views: serve repeat requests from the cache
+        Only successful (200) responses are stored
+        `vary` lists request headers that change the response (e.g. 'Accept')
+        `scope` overrides the cache's scope function for this view
+        """
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                key = (
+                    (scope or self.scope)(),
+                    request.endpoint,
+                    tuple(sorted(request.args.items(multi=True))),
+                    tuple(request.headers.get(header, '') for header in vary)
+                )
+                entry = self.get(key)
+                if entry is None:
+                    self.misses += 1
+                    generation = self.generation(key[0])
+                    response = view(*args, **kwargs)
+                    if not isinstance(response, Response) or response.status_code != 200:
+                        return response
+                    extra = {name: value for name, value in response.headers.items()
+                             if name not in ('Content-Type', 'Content-Length')}
+                    entry = CacheEntry(response.get_data(), response.mimetype, ttl, extra)
+                    self.put(key, entry, generation)
+                else:
+                    self.hits += 1
+                response = self._respond(entry)
+                if vary:
+                    response.vary.update(vary)
+                return response
+            return wrapper
+        return decorator
+
+    @staticmethod
+    def _respond(entry: CacheEntry) -> Response:
+        """Full response, or 304 if the client already has this version"""
+        remaining = max(int(entry.expires - time.monotonic()), 0)
+        if request.if_none_match.contains(entry.etag):
+            response = Response(status=304)
+        else:
+            response = Response(entry.body, mimetype=entry.mimetype, headers=entry.headers)
+        response.set_etag(entry.etag)
+        response.headers['Cache-Control'] = f'private, max-age={remaining}'
+        return response
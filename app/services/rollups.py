@@ -0,0 +1,210 @@
+"""
+Rollup Tiers for Energy Dashboard
+Pre-aggregated hourly, daily and weekly energy totals
+
+The tiers subscribe to a ReadingStore and are updated incrementally as
+readings are appended, so long-range queries add up a few hundred buckets
+instead of hundreds of thousands of raw readings
+"""
+
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from .calculator import EnergyCalculator, bucket_starts
+from .reading_store import READING_FIELDS, ReadingStore, ReadingWindow, TIMESTAMP_DTYPE, to_datetime64
+
+# Coarsest first - queries use the biggest buckets that fit, then refine the edges
+ROLLUP_PERIODS = ('week', 'day', 'hour')
+
+BUCKET_LENGTHS = {
+    'hour': np.timedelta64(1, 'h'),
+    'day': np.timedelta64(1, 'D'),
+    'week': np.timedelta64(7, 'D'),
+}
+
+
+class RollupTier:
+    """
+    Energy totals (kWh) per bucket for one period
+    Buckets are kept sorted in growable arrays, just like the reading store
+    """
+
+    def __init__(self, period: str, capacity: int = 64):
+        self.period = period
+        self.length = BUCKET_LENGTHS[period].astype('timedelta64[us]')
+        self._size = 0
+        self._starts = np.empty(capacity, dtype=TIMESTAMP_DTYPE)
+        self._totals = {field: np.empty(capacity) for field in READING_FIELDS}
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def starts(self) -> np.ndarray:
+        return self._starts[:self._size]
+
+    def floor(self, timestamp) -> np.datetime64:
+        """Start of the bucket containing `timestamp`"""
+        return bucket_starts(np.array([to_datetime64(timestamp)]), self.period)[0].astype(TIMESTAMP_DTYPE)
+
+    def ceil(self, timestamp) -> np.datetime64:
+        """Start of the first bucket at or after `timestamp`"""
+        timestamp = to_datetime64(timestamp)
+        floor = self.floor(timestamp)
+        return floor if floor == timestamp else floor + self.length
+
+    # === UPDATING ===
+
+    def add(self, starts: np.ndarray, totals: Dict[str, np.ndarray]):
+        """Add per-bucket totals for a batch of new readings"""
+        if not len(starts):
+            return
+        starts = starts.astype(TIMESTAMP_DTYPE)
+        last = self._starts[self._size - 1] if self._size else None
+
+        if last is not None and starts[0] < last:
+            self._merge(starts, totals)
+            return
+
+        offset = 0
+        if last is not None and starts[0] == last:
+            # The batch continues the newest bucket
+            for field in READING_FIELDS:
+                self._totals[field][self._size - 1] += totals[field][0]
+            offset = 1
+
+        count = len(starts) - offset
+        self._reserve(self._size + count)
+        self._starts[self._size:self._size + count] = starts[offset:]
+        for field in READING_FIELDS:
+            self._totals[field][self._size:self._size + count] = totals[field][offset:]
+        self._size += count
+
+    def _merge(self, starts: np.ndarray, totals: Dict[str, np.ndarray]):
+        """Slow path for late readings that land in older buckets"""
+        merged_starts, inverse = np.unique(np.concatenate([self.starts, starts]), return_inverse=True)
+        size = len(merged_starts)
+        capacity = max(size, len(self._starts))
+        new_starts = np.empty(capacity, dtype=TIMESTAMP_DTYPE)
+        new_starts[:size] = merged_starts
+        for field in READING_FIELDS:
+            values = np.zeros(capacity)
+            np.add.at(values, inverse, np.concatenate([self._totals[field][:self._size], totals[field]]))
+            self._totals[field] = values
+        self._starts = new_starts
+        self._size = size
+
+    def _reserve(self, capacity: int):
+        if capacity <= len(self._starts):
+            return
+        new_capacity = max(capacity, 2 * len(self._starts))
+        starts = np.empty(new_capacity, dtype=TIMESTAMP_DTYPE)
+        starts[:self._size] = self.starts
+        self._starts = starts
+        for field in READING_FIELDS:
+            values = np.empty(new_capacity)
+            values[:self._size] = self._totals[field][:self._size]
+            self._totals[field] = values
+
+    # === QUERYING ===
+
+    def range(self, start, end) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """Buckets starting in [start, end) - views, do not modify"""
+        starts = self.starts
+        lo = int(np.searchsorted(starts, to_datetime64(start), side='left'))
+        hi = max(lo, int(np.searchsorted(starts, to_datetime64(end), side='left')))
+        return starts[lo:hi], {field: self._totals[field][lo:hi] for field in READING_FIELDS}
+
+    def sum(self, start, end) -> Dict[str, float]:
+        """Total of every bucket starting in [start, end)"""
+        _, totals = self.range(start, end)
+        return {field: float(values.sum()) for field, values in totals.items()}
+
+
+class RollupTiers:
+    """
+    Hour, day and week rollups kept in step with a ReadingStore
+
+    Any [start, end) range is answered by the coarsest buckets that fit
+    entirely inside it, with the ragged edges filled in by finer tiers and
+    finally by raw readings, so results match a full scan exactly
+    """
+
+    def __init__(self, calculator: EnergyCalculator = None):
+        self.calculator = calculator or EnergyCalculator()
+        self.tiers = {period: RollupTier(period) for period in ROLLUP_PERIODS}
+        self.store: Optional[ReadingStore] = None
+
+    def attach(self, store: ReadingStore):
+        """Roll up everything already in `store`, then follow new readings"""
+        self.store = store
+        self.add(store.all())
+        store.subscribe(self.add)
+
+    def add(self, window: ReadingWindow, reset: bool = False):
+        """Fold a batch of new readings into every tier (or start over on a reset)"""
+        if reset:
+            self.tiers = {period: RollupTier(period) for period in ROLLUP_PERIODS}
+        for period, tier in self.tiers.items():
+            tier.add(*self.calculator.bucket_totals(window, period))
+
+    # === QUERYING ===
+
+    def energy_totals(self, start: datetime = None, end: datetime = None) -> Dict[str, float]:
+        """Total kWh per field for readings in [start, end) - either bound may be None"""
+        if not len(self.store):
+            return {field: 0.0 for field in READING_FIELDS}
+        start = to_datetime64(start) if start is not None else self.store.timestamps[0]
+        end = to_datetime64(end) if end is not None else self.store.timestamps[-1] + np.timedelta64(1, 'us')
+        return self._sum(0, start, end)
+
+    def _sum(self, level: int, start, end) -> Dict[str, float]:
+        if start >= end:
+            return {field: 0.0 for field in READING_FIELDS}
+        if level == len(ROLLUP_PERIODS):
+            return self.calculator.energy_totals(self.store.range(start, end))
+
+        tier = self.tiers[ROLLUP_PERIODS[level]]
+        first, last = tier.ceil(start), tier.floor(end)
+        if first >= last:
+            # No whole bucket fits - try the next tier down
+            return self._sum(level + 1, start, end)
+
+        parts = (tier.sum(first, last), self._sum(level + 1, start, first), self._sum(level + 1, last, end))
+        return {field: sum(part[field] for part in parts) for field in READING_FIELDS}
+
+    def bucket_totals(self, period: str, start: datetime = None, end: datetime = None
+                      ) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Same result as EnergyCalculator.bucket_totals over store.range(start, end),
+        but read from the `period` tier (plus exact partial first/last buckets)
+        """
+        tier = self.tiers[period]
+        if not len(self.store):
+            return np.empty(0, dtype=TIMESTAMP_DTYPE), {field: np.empty(0) for field in READING_FIELDS}
+        start = to_datetime64(start) if start is not None else self.store.timestamps[0]
+        end = to_datetime64(end) if end is not None else self.store.timestamps[-1] + np.timedelta64(1, 'us')
+
+        first, last = tier.ceil(start), tier.floor(end)
+        if first > last:
+            # The whole range sits inside a single bucket
+            first = last = end
+        starts, totals = tier.range(first, last)
+        starts, totals = [starts], {field: [values] for field, values in totals.items()}
+
+        # Partial buckets at either end (only if they actually hold readings)
+        for edge_start, edge_end, at_front in ((start, first, True), (max(last, start), end, False)):
+            if edge_start < edge_end and self.store.count(edge_start, edge_end):
+                edge = self._sum(0, edge_start, edge_end)
+                position = 0 if at_front else len(starts)
+                starts.insert(position, np.array([tier.floor(edge_start)]))
+                for field in READING_FIELDS:
+                    totals[field].insert(position, np.array([edge[field]]))
+
+        return np.concatenate(starts), {field: np.concatenate(values) for field, values in totals.items()}
+
+    def aggregate_by_period(self, period: str = 'day', start: datetime = None, end: datetime = None):
+        """Chart rows for the Energy Balance chart, answered from the rollups"""
+        return self.calculator.buckets_to_dicts(*self.bucket_totals(period, start, end))
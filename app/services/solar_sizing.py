@@ -0,0 +1,124 @@
+"""
+Solar Sizing for Energy Dashboard
+Answers "what if I had a bigger (or smaller) solar system?" from a household's own history
+
+A different system size scales every solar reading by the same factor.
+Each reading imports while the factor is below consumption / solar and
+exports above it, so after sorting readings by that break point, any
+size's imports, exports and their cost are a binary search plus a few
+prefix sums. Scoring a size grid takes the same time whether it has ten
+sizes or a million, and the sorted tables are kept per household and
+tariff until new readings arrive.
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from .. import config
+from ..models.energy_data import SolarSizingScenario
+from .calculator import EnergyCalculator
+from .reading_store import ReadingStore, ReadingWindow
+from .tariffs import Tariff
+
+
+class SolarSizing:
+    """Sorted break points and prefix sums for one window of readings on one tariff"""
+
+    def __init__(self, readings: ReadingWindow, interval_hours: float, tariff: Tariff):
+        self.tariff = tariff.name
+        consumption = readings.consumption * interval_hours
+        solar = readings.solar_production * interval_hours
+        import_rates, export_rates = tariff.rates(readings.timestamps)
+
+        # Scale factor at which each reading stops importing (never, with no sun)
+        breaks = np.divide(consumption, solar, out=np.full(len(solar), np.inf), where=solar > 0)
+        order = np.argsort(breaks, kind='stable')
+        self.breaks = breaks[order]
+
+        # Prefix sums of consumption and solar in break point order, as kWh,
+        # priced at the import rate and priced at the export rate:
+        # prefix[weighting, 0 = consumption / 1 = solar, i] sums the first i readings
+        weights = np.stack([np.ones(len(solar)), import_rates, export_rates])[:, order]
+        self.prefix = np.zeros((3, 2, len(solar) + 1))
+        np.cumsum(weights * consumption[order], axis=1, out=self.prefix[:, 0, 1:])
+        np.cumsum(weights * solar[order], axis=1, out=self.prefix[:, 1, 1:])
+
+        span = (readings.timestamps[-1] - readings.timestamps[0]) if len(readings) else np.timedelta64(0)
+        self.days = max(span / np.timedelta64(1, 'D') + interval_hours / 24, interval_hours / 24)
+
+    def totals(self, factors: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Energy (kWh) and money (£) totals with solar scaled by each factor
+        Readings before the split export (or break even), the rest import
+        """
+        factors = np.asarray(factors, dtype=np.float64)
+        split = np.searchsorted(self.breaks, factors, side='right')
+        before = self.prefix[:, :, split]
+        after = self.prefix[:, :, -1:] - before
+        # Rows: kWh, £ at the import rate, £ at the export rate
+        # (clipped because the subtractions can leave tiny negative rounding errors)
+        imported = np.maximum(after[:, 0] - factors * after[:, 1], 0)
+        exported = np.maximum(factors * before[:, 1] - before[:, 0], 0)
+        return {
+            'solar_production': factors * self.prefix[0, 1, -1],
+            'grid_import': imported[0],
+            'grid_export': exported[0],
+            'import_cost': imported[1],
+            'export_revenue': exported[2],
+            'cost_without_solar': np.full(len(factors), self.prefix[1, 0, -1]),
+        }
+
+    def scenarios(self, capacities: Sequence[float], installed: float) -> List[SolarSizingScenario]:
+        """Score each candidate system size (kW) against the `installed` one"""
+        capacities = np.asarray(capacities, dtype=np.float64)
+        totals = self.totals(capacities / installed)
+        net_cost = totals['import_cost'] - totals['export_revenue']
+        savings = totals['cost_without_solar'] - net_cost
+        co2 = totals['solar_production'] * config.CO2_OFFSET_FACTOR
+
+        columns = [
+            capacities,
+            totals['solar_production'],
+            totals['grid_import'],
+            totals['grid_export'],
+            totals['solar_production'] - totals['grid_export'],
+            net_cost,
+            savings,
+            savings * 365 / self.days,
+            co2,
+        ]
+        return [
+            SolarSizingScenario(*values)
+            for values in zip(*(np.round(column, 2).tolist() for column in columns))
+        ]
+
+
+class SolarSizingCache:
+    """
+    A household's SolarSizing tables, one per tariff, built on first use
+    and dropped whenever new readings arrive
+    """
+
+    def __init__(self, calculator: EnergyCalculator = None, history_days: int = None):
+        self.calculator = calculator or EnergyCalculator()
+        self.history_days = history_days or config.SOLAR_SIZING_HISTORY_DAYS
+        self.store: ReadingStore = None
+        self._tables: Dict[str, SolarSizing] = {}
+
+    def attach(self, store: ReadingStore):
+        self.store = store
+        store.subscribe(self._invalidate)
+
+    def _invalidate(self, window: ReadingWindow, reset: bool = False):
+        self._tables = {}
+
+    def get(self, tariff: Tariff) -> SolarSizing:
+        """The tables for `tariff` over the last history_days of readings"""
+        sizing = self._tables.get(tariff.name)
+        if sizing is None:
+            window = self.store.since(datetime.now() - timedelta(days=self.history_days))
+            sizing = SolarSizing(window, self.calculator.interval_hours, tariff)
+            self._tables[tariff.name] = sizing
+        return sizing
@@ -0,0 +1,95 @@
+"""
+Tariff Engine for Energy Dashboard
+Prices energy on time-of-use import and export tariffs
+
+Each tariff in config.TARIFFS is compiled once into two tables of 168
+rates - one per hour of the week. Pricing a batch of timestamps is then a
+single array lookup, so import cost, export revenue and savings over
+millions of readings (or a few hundred hourly rollups) are just a couple
+of dot products.
+"""
+
+import math
+from functools import lru_cache
+from typing import Dict, Tuple
+
+import numpy as np
+
+from .. import config
+from ..models.energy_data import TariffCosts
+from .calculator import HOURS_PER_WEEK, hour_of_week
+
+# Which days (Monday = 0) each band applies to
+BAND_DAYS = {
+    'all': range(7),
+    'weekdays': range(5),
+    'weekends': range(5, 7),
+}
+
+
+def compile_bands(bands) -> np.ndarray:
+    """Turn (days, start hour, end hour, rate) bands into an hour-of-week rate table"""
+    table = np.full(HOURS_PER_WEEK, np.nan)
+    for days, start, end, rate in bands:
+        if days not in BAND_DAYS:
+            raise ValueError(f"Unknown band days '{days}' - use one of: {', '.join(BAND_DAYS)}")
+        for day in BAND_DAYS[days]:
+            table[day * 24 + start:day * 24 + end] = rate
+    if np.isnan(table).any():
+        raise ValueError("Tariff bands must cover every hour of the week")
+    return table
+
+
+class Tariff:
+    """One import/export tariff, compiled into hour-of-week rate tables"""
+
+    def __init__(self, name: str, schedule: Dict):
+        self.name = name
+        self.import_rates = compile_bands(schedule['import'])
+        self.export_rates = compile_bands(schedule['export'])
+        # Rate arrays for a regular time grid, cached per date range
+        self.rates_between = lru_cache(maxsize=config.TARIFF_CACHE_SIZE)(self._rates_between)
+        # For energy we only have a total for (no timestamps): every hour of the week weighted alike
+        # (fsum, so a flat tariff's average is exactly its rate)
+        self.average_import_rate = math.fsum(self.import_rates.tolist()) / HOURS_PER_WEEK
+
+    def rates(self, timestamps: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(import, export) £/kWh at every timestamp"""
+        slots = hour_of_week(np.asarray(timestamps))
+        return self.import_rates[slots], self.export_rates[slots]
+
+    def _rates_between(self, start: np.datetime64, end: np.datetime64,
+                       step: np.timedelta64) -> Tuple[np.ndarray, np.ndarray]:
+        """(import, export) rates for every step in [start, end) - read-only, shared between callers"""
+        import_rates, export_rates = self.rates(np.arange(start, end, step))
+        import_rates.flags.writeable = export_rates.flags.writeable = False
+        return import_rates, export_rates
+
+    def costs(self, timestamps: np.ndarray, totals: Dict[str, np.ndarray]) -> TariffCosts:
+        """
+        Price energy totals (kWh per field, e.g. hourly rollup buckets or raw readings
+        already converted to kWh) that start at `timestamps`
+        """
+        import_rates, export_rates = self.rates(timestamps)
+        import_cost = float(totals['grid_import'] @ import_rates)
+        export_revenue = float(totals['grid_export'] @ export_rates)
+        cost_without_solar = float(totals['consumption'] @ import_rates)
+        net_cost = import_cost - export_revenue
+        return TariffCosts(
+            tariff=self.name,
+            import_cost=round(import_cost, 2),
+            export_revenue=round(export_revenue, 2),
+            net_cost=round(net_cost, 2),
+            cost_without_solar=round(cost_without_solar, 2),
+            savings=round(cost_without_solar - net_cost, 2),
+        )
+
+
+@lru_cache(maxsize=None)
+def get_tariff(name: str = None) -> Tariff:
+    """
+    The compiled tariff called `name` (DEFAULT_TARIFF if None)
+    Raises KeyError for unknown tariffs
+    """
+    name = name or config.DEFAULT_TARIFF
+    return Tariff(name, config.TARIFFS[name])
@@ -0,0 +1,76 @@
+"""
+Worker Processes for Energy Dashboard
+One shared process pool for heavy number crunching (fleet totals, battery sweeps)
+
+The pool is started the first time it's needed. Work is handed out in a
+few chunks per worker, which keeps every process busy without paying the
+cost of sending thousands of tiny tasks.
+
+Workers are spawned rather than forked: the pool is started from a request
+thread, and a forked child would inherit whatever locks other threads held
+at that moment, plus every open memory map. If a worker dies the pool is
+thrown away and the next call starts a fresh one, and it is shut down when
+the server exits.
+"""
+
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, List, Sequence
+
+from .. import config
+
+_pool = None
+_lock = threading.Lock()
+
+
+def worker_count() -> int:
+    return config.FLEET_WORKERS or os.cpu_count() or 1
+
+
+def process_pool() -> ProcessPoolExecutor:
+    """The shared pool (started on first use)"""
+    global _pool
+    with _lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=worker_count(),
+                                        mp_context=multiprocessing.get_context('spawn'))
+        return _pool
+
+
+def reset_pool(broken: ProcessPoolExecutor = None):
+    """Shut the pool down so the next call starts a new one (only if it is still `broken`, when given)"""
+    global _pool
+    with _lock:
+        if _pool is None or (broken is not None and _pool is not broken):
+            return
+        pool, _pool = _pool, None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def pool_map(task: Callable, *iterables) -> List:
+    """
+    process_pool().map(task, *iterables) as a list
+    If a worker dies the pool is replaced and the work is tried once more
+    """
+    iterables = [list(values) for values in iterables]
+    for attempt in range(2):
+        pool = process_pool()
+        try:
+            return list(pool.map(task, *iterables))
+        except BrokenProcessPool:
+            reset_pool(pool)
+            if attempt:
+                raise
+
+
+def chunked(items: Sequence, chunks_per_worker: int = 4) -> List[Sequence]:
+    """Split `items` into roughly `chunks_per_worker` slices per worker"""
+    size = max(1, -(-len(items) // (worker_count() * chunks_per_worker)))
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+atexit.register(reset_pool)
@@ -7,28 +7,71 @@ document.addEventListener('DOMContentLoaded', () => {
     const periodSelect = document.getElementById('periodSelect');
     const initialPeriod = periodSelect ? periodSelect.value : 'today';
 
-    fetchDashboardMetrics(initialPeriod);
-    fetchEnergyBalance('day', 7); // Balance chart defaults to last 7 days regardless of top filter
-    fetchConsumptionBreakdown();
-    fetchEVStatus();
-    fetchInsights();
+    // Everything for the first paint comes back in one request
+    fetchDashboardBundle(initialPeriod);
 
-    // Auto-refresh every 30 seconds
-    setInterval(() => {
-        const currentPeriod = document.getElementById('periodSelect') ? document.getElementById('periodSelect').value : 'today';
-        fetchDashboardMetrics(currentPeriod);
-        fetchEVStatus();
-    }, 30000);
+    // Live updates are pushed by the server; poll only if streaming isn't available
+    startLiveUpdates();
 
     // Filter listener
     if (periodSelect) {
         periodSelect.addEventListener('change', (e) => {
             const period = e.target.value;
-            fetchDashboardMetrics(period);
+            // The live feed already carries every period's metrics
+            if (latestLiveUpdate && latestLiveUpdate.metrics[period]) {
+                renderMetrics(latestLiveUpdate.metrics[period]);
+            } else {
+                fetchDashboardMetrics(period);
+            }
         });
     }
 });
 
+function currentPeriod() {
+    const periodSelect = document.getElementById('periodSelect');
+    return periodSelect ? periodSelect.value : 'today';
+}
+
+let latestLiveUpdate = null;
+let pollTimer = null;
+
+function startLiveUpdates() {
+    if (!window.EventSource) {
+        startPolling();
+        return;
+    }
+
+    const source = new EventSource('/api/stream');
+
+    source.addEventListener('update', (e) => {
+        latestLiveUpdate = JSON.parse(e.data);
+        const metrics = latestLiveUpdate.metrics[currentPeriod()];
+        if (metrics) renderMetrics(metrics);
+        renderEVStatus(latestLiveUpdate.ev_charging, latestLiveUpdate.percentage);
+
+        // Connected again - no need to poll
+        if (pollTimer) {
+            clearInterval(pollTimer);
+            pollTimer = null;
+        }
+    });
+
+    source.addEventListener('error', () => {
+        // EventSource reconnects by itself; poll in the meantime so the cards stay fresh.
+        // If the server turned us away (503 - too many streams) it won't reconnect, so just poll
+        if (source.readyState !== EventSource.OPEN) startPolling();
+    });
+}
+
+function startPolling() {
+    if (pollTimer) return;
+    // Auto-refresh every 30 seconds
+    pollTimer = setInterval(() => {
+        fetchDashboardMetrics(currentPeriod());
+        fetchEVStatus();
+    }, 30000);
+}
+
 function updateDate() {
     const now = new Date();
     const options = { weekday: 'long', year: 'numeric', month: 'long', day: 'numeric' };
@@ -36,29 +79,55 @@ function updateDate() {
     if (el) el.textContent = now.toLocaleDateString('en-US', options);
 }
 
+async function fetchDashboardBundle(period = 'today') {
+    try {
+        // Balance chart defaults to last 7 days regardless of top filter
+        const res = await fetch(`/api/dashboard/bundle?period=${period}&balance_period=day&days=7`);
+        const data = await res.json();
+
+        if (!data.success) throw new Error(data.message);
+
+        renderMetrics(data.dashboard.metrics);
+        renderBalanceChart(data.energy_balance.data, data.energy_balance.period);
+        renderDonutChart(data.breakdown);
+        renderEVStatus(data.ev_charging, data.percentage);
+        renderInsights(data.insights);
+    } catch (err) {
+        console.error('Error fetching dashboard bundle, loading cards one by one:', err);
+        fetchDashboardMetrics(period);
+        fetchEnergyBalance('day', 7);
+        fetchConsumptionBreakdown();
+        fetchEVStatus();
+        fetchInsights();
+    }
+}
+
 async function fetchDashboardMetrics(period = 'today') {
     try {
         const res = await fetch(`/api/dashboard?period=${period}`);
         const data = await res.json();
 
         if (data.success) {
-            const m = data.metrics;
-            // Update textual elements safely
-            const setSafe = (id, val) => {
-                const el = document.getElementById(id);
-                if (el) el.textContent = val;
-            };
-
-            setSafe('solarProd', `${m.solar_production.toFixed(1)} kWh`);
-            setSafe('totalCons', `${m.total_consumption.toFixed(1)} kWh`);
-            setSafe('costSave', `$${m.cost_savings.toFixed(2)}`);
-            setSafe('co2Offset', `${m.co2_offset.toFixed(1)} kg`);
+            renderMetrics(data.metrics);
         }
     } catch (err) {
         console.error('Error fetching dashboard metrics:', err);
     }
 }
 
+function renderMetrics(m) {
+    // Update textual elements safely
+    const setSafe = (id, val) => {
+        const el = document.getElementById(id);
+        if (el) el.textContent = val;
+    };
+
+    setSafe('solarProd', `${m.solar_production.toFixed(1)} kWh`);
+    setSafe('totalCons', `${m.total_consumption.toFixed(1)} kWh`);
+    setSafe('costSave', `$${m.cost_savings.toFixed(2)}`);
+    setSafe('co2Offset', `${m.co2_offset.toFixed(1)} kg`);
+}
+
 let balanceChart = null;
 
 async function fetchEnergyBalance(period = 'day', days = 7) {
@@ -238,83 +307,91 @@ async function fetchEVStatus() {
         const data = await res.json();
 
         if (data.success) {
-            const ev = data.ev_charging;
-            const pct = Math.round(data.percentage);
-
-            const batteryLevel = document.getElementById('batteryLevel');
-            if (batteryLevel) batteryLevel.style.width = `${pct}%`;
-
-            const batteryText = document.getElementById('batteryText');
-            if (batteryText) batteryText.textContent = `${pct}%`;
-
-            const evPower = document.getElementById('evPower');
-            if (evPower) evPower.textContent = `${ev.charging_power} kW`;
-
-            const evTime = document.getElementById('evTimeEstimate');
-            // Convert hours to nicely formatted string if needed, or just keep rough hours
-            const mins = Math.round(ev.time_to_complete * 60);
-            if (evTime) evTime.textContent = `Est. completion: ${mins} mins`;
-
-            const evCost = document.getElementById('evCost');
-            if (evCost) evCost.textContent = `Session cost: $${ev.cost_estimate.toFixed(2)}`;
-
-            // Toggle Status Badge
-            const badge = document.getElementById('evStatusBadge');
-            if (badge) {
-                if (pct >= 100) {
-                    badge.textContent = 'Complete';
-                    badge.style.background = '#dcfce7';
-                    badge.style.color = '#166534';
-                } else {
-                    badge.textContent = 'Active';
-                    badge.style.background = '#dcfce7'; // Keep green background as per image
-                    badge.style.color = '#166534';
-                }
-            }
+            renderEVStatus(data.ev_charging, data.percentage);
         }
     } catch (err) {
         console.error('Error fetching EV status:', err);
     }
 }
 
+function renderEVStatus(ev, percentage) {
+    const pct = Math.round(percentage);
+
+    const batteryLevel = document.getElementById('batteryLevel');
+    if (batteryLevel) batteryLevel.style.width = `${pct}%`;
+
+    const batteryText = document.getElementById('batteryText');
+    if (batteryText) batteryText.textContent = `${pct}%`;
+
+    const evPower = document.getElementById('evPower');
+    if (evPower) evPower.textContent = `${ev.charging_power} kW`;
+
+    const evTime = document.getElementById('evTimeEstimate');
+    // Convert hours to nicely formatted string if needed, or just keep rough hours
+    const mins = Math.round(ev.time_to_complete * 60);
+    if (evTime) evTime.textContent = `Est. completion: ${mins} mins`;
+
+    const evCost = document.getElementById('evCost');
+    if (evCost) evCost.textContent = `Session cost: $${ev.cost_estimate.toFixed(2)}`;
+
+    // Toggle Status Badge
+    const badge = document.getElementById('evStatusBadge');
+    if (badge) {
+        if (pct >= 100) {
+            badge.textContent = 'Complete';
+            badge.style.background = '#dcfce7';
+            badge.style.color = '#166534';
+        } else {
+            badge.textContent = 'Active';
+            badge.style.background = '#dcfce7'; // Keep green background as per image
+            badge.style.color = '#166534';
+        }
+    }
+}
+
 async function fetchInsights() {
     try {
         const res = await fetch('/api/insights');
         const data = await res.json();
 
         if (data.success) {
-            const container = document.getElementById('insightsList');
-            if (!container) return;
-
-            container.innerHTML = '';
-
-            data.insights.forEach(insight => {
-                const div = document.createElement('div');
-                div.className = `insight-item ${insight.type}`;
-
-                // Determine icon based on insight type or title
-                let iconClass = 'fa-regular fa-lightbulb';
-                if (insight.type === 'positive') iconClass = 'fa-solid fa-temperature-arrow-down';
-                if (insight.type === 'warning') iconClass = 'fa-regular fa-clock';
-
-                div.innerHTML = `
-                    <div class="insight-icon"><i class="${iconClass}"></i></div>
-                    <div class="insight-content">
-                        <h4>${insight.title}</h4>
-                        <p>${insight.message}</p>
-                    </div>
-                `;
-                container.appendChild(div);
-            });
-
-            if (data.insights.length === 0) {
-                container.innerHTML = `
-                    <div class="insight-item">
-                        <div class="insight-content"><p>No interactions required at the moment.</p></div>
-                    </div>`;
-            }
+            renderInsights(data.insights);
         }
     } catch (err) {
         console.error('Error fetching insights:', err);
     }
 }
+
+function renderInsights(insights) {
+    const container = document.getElementById('insightsList');
+    if (!container) return;
+
+    container.innerHTML = '';
+
+    insights.forEach(insight => {
+        const div = document.createElement('div');
+        div.className = `insight-item ${insight.type}`;
+
+        // Determine icon based on insight type or title
+        let iconClass = 'fa-regular fa-lightbulb';
+        if (insight.type === 'positive') iconClass = 'fa-solid fa-temperature-arrow-down';
+        if (insight.type === 'warning') iconClass = 'fa-regular fa-clock';
+
+        div.innerHTML = `
+            <div class="insight-icon"><i class="${iconClass}"></i></div>
+            <div class="insight-content">
+                <h4>${insight.title}</h4>
+                <p>${insight.message}</p>
+            </div>
+        `;
+        container.appendChild(div);
+    });
+
+    if (insights.length === 0) {
+        container.innerHTML = `
+            <div class="insight-item">
+                <div class="insight-content"><p>No interactions required at the moment.</p></div>
+            </div>`;
+    }
+}
+
@@ -0,0 +1,28 @@
+from app import app, db
+from datetime import datetime
+from app.models import User, EnergyCalculation
+from app.services.energy_use import ENERGY_USE_FIELDS, METRIC_FIELDS
+
+def backfill():
+    # Copy each user's latest_energy_calculation into the energy_calculation history table
+    # (the JSON doesn't say when it was calculated, so it's stamped with the backfill time)
+    with app.app_context():
+        now = datetime.utcnow()
+        users = User.query.filter(User.latest_energy_calculation != None).all()
+        already_saved = {user_id for (user_id,) in db.session.query(EnergyCalculation.user_id).distinct()}
+        rows = [
+            {'user_id': user.id, 'created_at': now,
+             **{field: user.latest_energy_calculation[field] for field in ENERGY_USE_FIELDS + METRIC_FIELDS}}
+            for user in users
+            if user.id not in already_saved
+        ]
+        print(f"Found {len(rows)} calculations to backfill.")
+
+        if rows:
+            saved = EnergyCalculation.save_many(rows)
+            print(f"Backfill complete: {saved} calculations saved.")
+        else:
+            print("No calculations needed backfill.")
+
+if __name__ == "__main__":
+    backfill()
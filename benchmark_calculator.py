@@ -0,0 +1,67 @@
+from app.services.calculator import EnergyCalculator
+from app.services.reading_store import ReadingStore
+from app import config
+from datetime import datetime
+import numpy as np
+import time
+
+READINGS = 1_000_000
+
+
+def build_store(count):
+    """One million random readings at the configured interval"""
+    rng = np.random.default_rng(42)
+    start = np.datetime64(datetime(2020, 1, 1), 'us')
+    step = np.timedelta64(int(config.READING_INTERVAL_MINUTES * 60 * 1_000_000), 'us')
+    timestamps = start + step * np.arange(count)
+    solar = rng.uniform(0, config.MAX_SOLAR_CAPACITY, count)
+    consumption = rng.uniform(config.BASE_CONSUMPTION, config.PEAK_CONSUMPTION, count)
+    store = ReadingStore(capacity=count)
+    store.extend_arrays(
+        timestamps,
+        solar_production=solar,
+        consumption=consumption,
+        grid_import=np.maximum(consumption - solar, 0),
+        grid_export=np.maximum(solar - consumption, 0),
+    )
+    return store
+
+
+def timed(label, func, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    print(f"{label:<32} {best * 1000:9.1f} ms  {READINGS / best / 1e6:8.1f} M readings/s")
+    return best
+
+
+def python_loop_metrics(readings, interval_hours):
+    """The per-reading loop the vectorized engine replaces"""
+    totals = {'solar_production': 0.0, 'consumption': 0.0, 'grid_import': 0.0, 'grid_export': 0.0}
+    for r in readings:
+        totals['solar_production'] += r.solar_production * interval_hours
+        totals['consumption'] += r.consumption * interval_hours
+        totals['grid_import'] += r.grid_import * interval_hours
+        totals['grid_export'] += r.grid_export * interval_hours
+    return totals
+
+
+def benchmark():
+    print(f"Building {READINGS:,} readings...")
+    store = build_store(READINGS)
+    window = store.all()
+    calculator = EnergyCalculator()
+
+    timed("dashboard metrics", lambda: calculator.calculate_dashboard_metrics(window))
+    for period in ('hour', 'day', 'week'):
+        timed(f"bucket totals ({period})", lambda: calculator.bucket_totals(window, period))
+    timed("aggregate_by_period (day)", lambda: calculator.aggregate_by_period(window, 'day'))
+
+    readings = window.to_readings()
+    timed("python loop baseline", lambda: python_loop_metrics(readings, calculator.interval_hours), repeat=1)
+
+
+if __name__ == "__main__":
+    benchmark()
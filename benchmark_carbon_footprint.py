@@ -0,0 +1,94 @@
+from app.forms import CarbonFootprintForm
+from app.services.carbon_footprint import CarbonFootprintCalculator
+import random
+import time
+
+QUESTIONNAIRES = 10_000
+
+
+def form_choices(field):
+    """The answers the questionnaire offers for one question (without the 'Select...' placeholder)"""
+    return [value for value, _ in CarbonFootprintForm.__dict__[field].kwargs['choices'] if value]
+
+
+def random_questionnaires(count, seed=42):
+    """Questionnaires built from random form answers, shaped the way routes.carbon_footprint builds them"""
+    rng = random.Random(seed)
+    pick = lambda field: rng.choice(form_choices(field))
+    ticked = lambda field: [choice for choice in form_choices(field) if rng.random() < 0.5]
+    return [
+        {
+            "food": {
+                "diet_type": pick('diet'),
+                "eating_out_spend_per_week": pick('food_spend'),
+                "waste_percentage": pick('food_waste'),
+                "local_sourcing": pick('local_food')
+            },
+            "travel": {
+                "general_vehicle": pick('travel_mode'),
+                "specific_vehicle": pick('vehicle_type'),
+                "car_hours_per_week": pick('car_hours'),
+                "train_hours_per_week": pick('train_hours'),
+                "bus_hours_per_week": pick('bus_hours'),
+                "flights": {
+                    "domestic": rng.randint(0, 4),
+                    "europe": rng.randint(0, 4),
+                    "long_haul": rng.randint(0, 2)
+                },
+                "flight_offset_percentage": pick('flight_offset')
+            },
+            "home": {
+                "house_type": pick('house_type'),
+                "bedrooms": pick('bedrooms'),
+                "people_count": pick('occupants'),
+                "heating_source": pick('heating_type'),
+                "green_tariff": pick('green_tariff'),
+                "lights_off": pick('regular_turn_off'),
+                "winter_temp": pick('winter_temp'),
+                "improvements": ticked('efficiency_improvements')
+            },
+            "stuff": {
+                "purchases": ticked('new_household_items'),
+                "clothes_spend": pick('clothes_spend'),
+                "pet_spend": pick('pet_spend'),
+                "beauty_spend": pick('health_spend'),
+                "contracts_spend": pick('contract_spend'),
+                "hobbies_spend": pick('entertainment_spend'),
+                "recycling": ticked('recycling')
+            }
+        }
+        for _ in range(count)
+    ]
+
+
+def timed(label, func, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    print(f"{label:<36} {best * 1000:9.1f} ms  {QUESTIONNAIRES / best / 1000:8.1f} k questionnaires/s")
+    return result
+
+
+def benchmark():
+    print(f"Building {QUESTIONNAIRES:,} questionnaires...")
+    questionnaires = random_questionnaires(QUESTIONNAIRES)
+
+    one_by_one = timed("calculate() per instance",
+                       lambda: [CarbonFootprintCalculator(data).calculate() for data in questionnaires])
+    # Real submissions repeat answers a lot, so most category results come from the caches
+    repeated = questionnaires[:QUESTIONNAIRES // 10] * 10
+    timed("calculate() on repeated answers",
+          lambda: [CarbonFootprintCalculator(data).calculate() for data in repeated])
+    batched = timed("calculate_many()", lambda: CarbonFootprintCalculator.calculate_many(questionnaires))
+    timed("score_many() (arrays only)", lambda: CarbonFootprintCalculator.score_many(questionnaires))
+    columns = timed("  encoding the answers", lambda: CarbonFootprintCalculator._TABLES.encode(questionnaires))
+    timed("  scoring encoded columns", lambda: CarbonFootprintCalculator.score_columns(columns))
+
+    mismatches = sum(a != b for a, b in zip(one_by_one, batched))
+    print(f"Results that differ from calculate(): {mismatches}")
+
+
+if __name__ == "__main__":
+    benchmark()
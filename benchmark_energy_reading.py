@@ -0,0 +1,65 @@
+from app.models.energy_data import EnergyReading
+from app.services.reading_store import READING_FIELDS
+from benchmark_calculator import build_store
+from dataclasses import dataclass
+from datetime import datetime
+import json
+import time
+import tracemalloc
+
+READINGS = 100_000
+
+
+@dataclass
+class DictEnergyReading:
+    """EnergyReading as it was before slots=True (every instance carries a __dict__)"""
+    timestamp: datetime
+    solar_production: float
+    consumption: float
+    grid_import: float
+    grid_export: float
+
+
+def bytes_per_reading(build):
+    """Memory allocated per reading by build() - timestamps and floats included"""
+    tracemalloc.start()
+    kept = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return size / READINGS
+
+
+def timed(label, func, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    print(f"{label:<36} {best * 1000:9.1f} ms  {READINGS / best / 1e6:8.2f} M readings/s")
+
+
+def benchmark():
+    print(f"Building {READINGS:,} readings...")
+    window = build_store(READINGS).all()
+
+    def rows():
+        """Fresh Python values for every reading (so they are counted too)"""
+        return zip(window.timestamps.astype(datetime).tolist(), *(window.column(field).tolist() for field in READING_FIELDS))
+
+    print("\nMemory per reading")
+    for label, build in (
+        ("dataclass with __dict__", lambda: [DictEnergyReading(*row) for row in rows()]),
+        ("dataclass(slots=True)", lambda: [EnergyReading(*row) for row in rows()]),
+        ("ReadingWindow columns", lambda: build_store(READINGS).all()),
+    ):
+        print(f"  {label:<34} {bytes_per_reading(build):7.1f} bytes")
+
+    print("\nJSON serialisation")
+    readings = window.to_readings()
+    timed("json.dumps([to_dict() ...])", lambda: json.dumps([r.to_dict() for r in readings]))
+    timed("ReadingWindow.to_json()", window.to_json)
+
+
+if __name__ == "__main__":
+    benchmark()
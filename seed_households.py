@@ -0,0 +1,31 @@
+from app import app, config
+from app.models import User
+from app.services.data_generator import EnergyDataGenerator
+from app.services.households import HouseholdRegistry
+from app.services.reading_store import MappedReadingStore
+import os
+import sys
+import uuid
+
+def seed(synthetic_count=0):
+    """
+    Give every user a readings partition with simulated history
+    Pass a number to also create that many extra synthetic households (for load tests)
+    """
+    with app.app_context():
+        public_ids = [user.public_id for user in User.query.filter(User.public_id != None).all()]
+    public_ids += [str(uuid.uuid4()) for _ in range(synthetic_count)]
+
+    registry = HouseholdRegistry(config.HOUSEHOLDS_DIR or os.path.join(app.instance_path, 'households'))
+    missing = [public_id for public_id in public_ids if not registry.exists(public_id)]
+    print(f"Found {len(missing)} households to seed.")
+
+    generator = EnergyDataGenerator()
+    for index, window in generator.iter_fleet(len(missing)):
+        MappedReadingStore.open(registry.path_for(missing[index])).extend(window)
+        print(f"Seeded household {missing[index]} ({len(window)} readings)")
+
+    print("Seeding complete.")
+
+if __name__ == "__main__":
+    seed(int(sys.argv[1]) if len(sys.argv) > 1 else 0)
@@ -0,0 +1,68 @@
+"""
+Shared test setup
+Points the reading history, household partitions and database at a scratch
+directory before anything from the app is imported
+"""
+
+import os
+import shutil
+import tempfile
+import uuid
+
+import pytest
+
+_scratch = tempfile.mkdtemp(prefix='rolsa-tests-')
+os.environ['ENERGY_HISTORY_DIR'] = os.path.join(_scratch, 'history')
+os.environ['ENERGY_HOUSEHOLDS_DIR'] = os.path.join(_scratch, 'households')
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(_scratch, 'site.db')
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(_scratch, ignore_errors=True)
+
+
+@pytest.fixture(scope='session')
+def dashboard():
+    """The Energy Dashboard API (app/app.py), with the demo home's history generated"""
+    from app.app import app
+    app.config['TESTING'] = True
+    return app
+
+
+@pytest.fixture
+def api(dashboard):
+    return dashboard.test_client()
+
+
+@pytest.fixture(scope='session')
+def site():
+    """The main website, with its tables created"""
+    from app import db, routes
+    # Importing app/app.py shadows the package's `app`, so take the Flask app from the routes
+    app = routes.app
+    app.config.update(TESTING=True, WTF_CSRF_ENABLED=False)
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+@pytest.fixture
+def client(site):
+    return site.test_client()
+
+
+@pytest.fixture
+def signed_in(site, client):
+    """A test client logged in as a new user (their id is client.user_id)"""
+    from app import db
+    from app.models import User
+    with site.app_context():
+        user = User(email=f'{uuid.uuid4()}@example.com')
+        user.set_password('password')
+        db.session.add(user)
+        db.session.commit()
+        client.user_id = user.id
+    with client.session_transaction() as session:
+        session['_user_id'] = str(client.user_id)
+        session['_fresh'] = True
+    return client
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from app.services.battery import BatterySimulator, simulate
+from app.services.reading_store import ReadingWindow
+
+# Three hourly readings: 8 kWh exported, then 3 and 10 kWh imported
+SURPLUS = np.array([8.0, 0.0, 0.0])
+DEFICIT = np.array([0.0, 3.0, 10.0])
+IMPORT_RATES = np.array([0.3, 0.3, 0.2])
+EXPORT_RATES = np.array([0.05, 0.05, 0.05])
+
+
+def test_simulation_matches_a_hand_worked_example():
+    # 81% round trip = 90% each way
+    # 10 kWh / 5 kW: stores 5 (4.5 held), supplies 3 (1.17 left), then 1.05
+    # 2 kWh / 1 kW: stores 1 (0.9 held), supplies 0.81, then nothing
+    stored, supplied, savings = simulate(SURPLUS, DEFICIT, [10.0, 2.0], [5.0, 1.0], 1.0,
+                                         IMPORT_RATES, EXPORT_RATES, efficiency=0.81)
+    assert stored == pytest.approx([5.0, 1.0])
+    assert supplied == pytest.approx([4.05, 0.81])
+    assert savings == pytest.approx([3 * 0.3 + 1.05 * 0.2 - 5 * 0.05, 0.81 * 0.3 - 1 * 0.05])
+
+
+def test_simulator_reports_the_same_sweep():
+    timestamps = np.datetime64('2024-06-01T10', 'us') + np.arange(3) * np.timedelta64(1, 'h')
+    window = ReadingWindow(timestamps, np.zeros(3), np.zeros(3), DEFICIT, SURPLUS)
+    simulator = BatterySimulator(window, 1.0, IMPORT_RATES, EXPORT_RATES, efficiency=0.81)
+    big, small = simulator.sweep([10.0, 2.0], [5.0, 1.0])[::3]
+    assert (big.capacity, big.power, big.energy_stored, big.energy_supplied) == (10.0, 5.0, 5.0, 4.05)
+    assert big.savings == 0.86
+    assert (small.capacity, small.power, small.energy_supplied, small.savings) == (2.0, 1.0, 0.81, 0.19)
+
+
+def test_too_many_configurations_are_refused(api):
+    capacities = ','.join(str(size) for size in range(1, 18))
+    powers = ','.join(str(power) for power in range(1, 17))
+    response = api.get(f'/api/battery/savings?capacities={capacities}&powers={powers}')
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Invalid battery sizes'
@@ -0,0 +1,105 @@
+import copy
+
+import pytest
+
+from benchmark_carbon_footprint import random_questionnaires
+from app.services.carbon_footprint import CarbonFootprintCalculator, FootprintInputError, MockDataProvider
+
+
+def test_calculate_many_matches_calculate():
+    questionnaires = random_questionnaires(2000, seed=22)
+    expected = [CarbonFootprintCalculator(data).calculate() for data in questionnaires]
+    assert CarbonFootprintCalculator.calculate_many(questionnaires) == expected
+
+
+def test_calculate_many_fills_in_missing_answers_like_calculate():
+    questionnaires = [{}, {'food': {}, 'travel': {'flights': {}}, 'home': {}, 'stuff': {}},
+                      MockDataProvider.get_mock_data()]
+    expected = [CarbonFootprintCalculator(data).calculate() for data in questionnaires]
+    assert CarbonFootprintCalculator.calculate_many(questionnaires) == expected
+
+
+def test_calculate_many_of_nothing():
+    assert CarbonFootprintCalculator.calculate_many([]) == []
+
+
+def odd_questionnaires():
+    """Mock answers with boxes ticked twice and None where an answer could be"""
+    questionnaires = []
+    for section, key, answer in [
+        ('home', 'improvements', ['Loft insulation', 'Loft insulation']),
+        ('home', 'improvements', ['Double glazing', 'Loft insulation', 'Double glazing']),
+        ('stuff', 'purchases', ['TV, laptop or PC', 'TV, laptop or PC', 'Mobile phone or tablet']),
+        ('stuff', 'recycling', ['Glass', 'Glass', 'Paper']),
+        ('home', 'improvements', None),
+        ('stuff', 'purchases', None),
+        ('stuff', 'recycling', None),
+    ]:
+        data = copy.deepcopy(MockDataProvider.get_mock_data())
+        data[section][key] = answer
+        questionnaires.append(data)
+    return questionnaires
+
+
+def test_calculate_many_matches_calculate_for_repeated_and_missing_boxes():
+    questionnaires = odd_questionnaires()
+    expected = [CarbonFootprintCalculator(data).calculate() for data in questionnaires]
+    assert CarbonFootprintCalculator.calculate_many(questionnaires) == expected
+
+
+def test_a_box_ticked_twice_counts_once():
+    once, twice = copy.deepcopy(MockDataProvider.get_mock_data()), odd_questionnaires()[0]
+    once['home']['improvements'] = ['Loft insulation']
+    assert CarbonFootprintCalculator(twice).calculate() == CarbonFootprintCalculator(once).calculate()
+
+
+def test_missing_flight_counts_are_the_same_error_in_both_paths():
+    data = copy.deepcopy(MockDataProvider.get_mock_data())
+    data['travel']['flights']['europe'] = None
+    with pytest.raises(FootprintInputError):
+        CarbonFootprintCalculator(data).calculate()
+    with pytest.raises(FootprintInputError):
+        CarbonFootprintCalculator.calculate_many([data])
+
+
+@pytest.mark.parametrize('data', [
+    {'food': {'diet_type': {'Vegan'}}},
+    {'travel': {'flights': {'domestic': 'abc'}}},
+    {'travel': {'flights': [1]}},
+    {'home': {'improvements': 3}},
+    {'stuff': ['£0']},
+])
+def test_unreadable_answers_are_a_validation_error(data):
+    with pytest.raises(FootprintInputError):
+        CarbonFootprintCalculator(data).calculate()
+
+
+def test_list_answers_are_scored_not_rejected():
+    data = MockDataProvider.get_mock_data()
+    data['food']['diet_type'] = ['Vegan']
+    assert CarbonFootprintCalculator(data).calculate()['total'] > 0
+
+
+def test_what_ifs_leave_the_cache_alone():
+    CarbonFootprintCalculator.clear_cache()
+    calculator = CarbonFootprintCalculator(MockDataProvider.get_mock_data())
+    calculator.sensitivity({('food', 'diet_type'): ['Vegan', 'Vegetarian', 'No beef'],
+                            ('stuff', 'recycling'): ['Glass', 'Paper']})
+    assert CarbonFootprintCalculator._cached_food_emissions.cache_info().currsize == 1
+    assert CarbonFootprintCalculator._cached_stuff_emissions.cache_info().currsize == 1
+
+
+def test_ticked_boxes_share_a_cache_entry_in_any_order():
+    CarbonFootprintCalculator.clear_cache()
+    forwards, backwards = (copy.deepcopy(MockDataProvider.get_mock_data()) for _ in range(2))
+    forwards['home']['improvements'] = ['Double glazing', 'Condensing boiler', 'Loft insulation']
+    backwards['home']['improvements'] = ['Loft insulation', 'Condensing boiler', 'Double glazing']
+    expected = CarbonFootprintCalculator.calculate_many([forwards])
+    assert CarbonFootprintCalculator(forwards).calculate() == CarbonFootprintCalculator(backwards).calculate()
+    assert [CarbonFootprintCalculator(forwards).calculate()] == expected
+    assert CarbonFootprintCalculator._cached_home_emissions.cache_info().currsize == 1
+
+
+def test_one_off_calculators_score_like_cached_ones():
+    for data in random_questionnaires(200, seed=23) + odd_questionnaires():
+        assert CarbonFootprintCalculator(data, cached=False).calculate() == CarbonFootprintCalculator(data).calculate()
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from app.services import columnar
+
+
+def sample_columns(rows=37):
+    rng = np.random.default_rng(14)
+    return {
+        'timestamp': np.datetime64('2024-01-01T00:00:00', 'us') + np.arange(rows) * np.timedelta64(15, 'm'),
+        'solar_production': rng.uniform(0, 5, rows),
+        'count': rng.integers(-1000, 1000, rows),
+    }
+
+
+def test_frames_round_trip_exactly():
+    columns = sample_columns()
+    (decoded,) = list(columnar.decode_frames(columnar.encode_frame(columns)))
+    assert list(decoded) == list(columns)
+    for name, values in columns.items():
+        assert decoded[name].dtype == values.dtype
+        assert np.array_equal(decoded[name], values)
+
+
+def test_float32_frames_round_trip_at_single_precision():
+    columns = sample_columns()
+    (decoded,) = list(columnar.decode_frames(columnar.encode_frame(columns, float32=True)))
+    assert decoded['solar_production'].dtype == np.float32
+    assert np.array_equal(decoded['solar_production'], columns['solar_production'].astype(np.float32))
+    assert np.array_equal(decoded['timestamp'], columns['timestamp'])
+
+
+def test_concatenated_and_empty_frames():
+    first, second = sample_columns(5), sample_columns(0)
+    frames = list(columnar.decode_frames(columnar.encode_frame(first) + columnar.encode_frame(second)))
+    assert [len(frame['timestamp']) for frame in frames] == [5, 0]
+
+
+@pytest.mark.parametrize('cut', [3, 20, -4])
+def test_truncated_frames_are_rejected(cut):
+    frame = columnar.encode_frame(sample_columns())
+    with pytest.raises(columnar.FrameError):
+        list(columnar.decode_frames(frame[:cut]))
+
+
+def test_column_names_must_be_utf8():
+    frame = bytearray(columnar.encode_frame({'ab': np.arange(3.0)}))
+    name = columnar._HEADER.size + 1
+    frame[name:name + 2] = b'\xff\xfe'
+    with pytest.raises(columnar.FrameError):
+        list(columnar.decode_frames(bytes(frame)))
+
+
+def test_readings_endpoint_sends_the_stored_columns(api):
+    response = api.get('/api/readings?hours=6', headers={'Accept': columnar.MEDIA_TYPE})
+    assert response.mimetype == columnar.MEDIA_TYPE
+    (frame,) = list(columnar.decode_frames(response.get_data()))
+    data = api.get('/api/readings?hours=6').get_json()
+    assert len(frame['timestamp']) == data['count']
+    # JSON values are rounded to 2 places, the frame sends them as stored
+    assert np.allclose(frame['consumption'], [reading['consumption'] for reading in data['readings']], atol=0.005)
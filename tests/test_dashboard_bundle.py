@@ -0,0 +1,31 @@
+import pytest
+
+
+def test_bundle_matches_the_separate_endpoints(api):
+    bundle = api.get('/api/dashboard/bundle?balance_period=day&days=7').get_json()
+    assert bundle['success'] is True
+
+    balance = api.get('/api/energy-balance?period=day&days=7').get_json()
+    assert bundle['energy_balance']['data'] == balance['data']
+    assert bundle['energy_balance']['total_points'] == balance['total_points']
+    breakdown = api.get('/api/consumption-breakdown').get_json()
+    assert bundle['breakdown'] == breakdown['breakdown']
+
+
+def test_bundle_round_trips_its_etag(api):
+    first = api.get('/api/dashboard/bundle?period=week')
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+
+    repeat = api.get('/api/dashboard/bundle?period=week', headers={'If-None-Match': etag})
+    assert repeat.status_code == 304
+    assert repeat.get_data() == b''
+    assert repeat.headers['ETag'] == etag
+
+
+@pytest.mark.parametrize('url', ['/api/dashboard/bundle', '/api/energy-balance'])
+@pytest.mark.parametrize('days', ['abc', '0', '-1', '1.5', '100000'])
+def test_chart_days_must_be_a_whole_number_in_range(api, url, days):
+    response = api.get(f'{url}?days={days}')
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Invalid days'
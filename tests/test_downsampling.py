@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from app.services.downsampling import CHART_FIELDS, MIN_POINTS, downsample_buckets, lttb
+
+
+@pytest.mark.parametrize('count, max_points', [(11, 10), (100, 3), (1000, 37), (5000, 500)])
+def test_lttb_keeps_the_endpoints_within_the_budget(count, max_points):
+    x = np.arange(count, dtype=float)
+    y = np.random.default_rng(count).normal(size=count)
+    selected = lttb(x, y, max_points)
+    assert len(selected) == max_points
+    assert selected[0] == 0 and selected[-1] == count - 1
+    assert np.all(np.diff(selected) > 0)
+
+
+def test_lttb_keeps_a_spike():
+    y = np.zeros(1000)
+    y[437] = 50.0
+    assert 437 in lttb(np.arange(1000), y, 20)
+
+
+@pytest.mark.parametrize('max_points', [5, 2])
+def test_short_series_are_left_alone(max_points):
+    assert lttb(np.arange(5), np.arange(5), max_points).tolist() == [0, 1, 2, 3, 4]
+
+
+@pytest.mark.parametrize('max_points', [MIN_POINTS, 11, 500])
+def test_downsampled_buckets_stay_within_max_points(max_points):
+    starts = np.datetime64('2024-01-01T00', 'h') + np.arange(24 * 365)
+    rng = np.random.default_rng(max_points)
+    totals = {field: rng.random(len(starts)) for field in CHART_FIELDS + ('grid_import',)}
+    kept, kept_totals = downsample_buckets(starts, totals, max_points)
+    assert len(kept) <= max_points
+    assert kept[0] == starts[0] and kept[-1] == starts[-1]
+    assert np.all(np.diff(kept) > np.timedelta64(0))
+    positions = np.searchsorted(starts, kept)
+    for field, values in kept_totals.items():
+        assert np.array_equal(values, totals[field][positions])
@@ -0,0 +1,58 @@
+from datetime import datetime
+
+import pytest
+
+from app.models import EnergyCalculation
+from app.services.energy_use import ENERGY_USE_FIELDS, EnergyUse
+
+INPUTS = [(100, 40, 10, 20, 500), (80, 60, 30, 10, 200), (120, 20, 0, 40, 900), (90, 50, 20, 0, 0)]
+DATES = [datetime(2024, 1, 5), datetime(2024, 1, 20), datetime(2024, 2, 3), datetime(2024, 3, 15)]
+
+
+@pytest.fixture
+def history(site, signed_in):
+    rows = [
+        {'user_id': signed_in.user_id, 'created_at': created_at, **EnergyUse(*values).gather_data()}
+        for values, created_at in zip(INPUTS, DATES)
+    ]
+    with site.app_context():
+        EnergyCalculation.save_many(rows, batch_size=3)
+    return rows
+
+
+def test_history_lists_calculations_newest_first(signed_in, history):
+    data = signed_in.get('/energy-use/history').get_json()
+    assert [row['created_at'] for row in data['calculations']] == [date.isoformat() for date in reversed(DATES)]
+    assert data['calculations'][-1]['cost_savings'] == history[0]['cost_savings']
+
+
+def test_history_range_and_limit(signed_in, history):
+    data = signed_in.get('/energy-use/history?start=2024-01-10&end=2024-03-01&limit=1').get_json()
+    assert [row['created_at'] for row in data['calculations']] == [DATES[2].isoformat()]
+    assert [month['calculations'] for month in data['trend']] == [1, 1]
+
+
+def test_monthly_trend_averages_each_month(signed_in, history):
+    trend = signed_in.get('/energy-use/history').get_json()['trend']
+    assert [month['calculations'] for month in trend] == [2, 1, 1]
+    january = history[:2]
+    assert trend[0]['total_consumption'] == round(sum(row['total_consumption'] for row in january) / 2, 2)
+    assert trend[2]['ev_share'] == history[3]['ev_share']
+
+
+def test_history_is_kept_per_user(site, signed_in, history):
+    with site.app_context():
+        assert EnergyCalculation.latest(signed_in.user_id).created_at == DATES[-1]
+        assert EnergyCalculation.history(signed_in.user_id + 1000).count() == 0
+
+
+def test_submitting_the_form_saves_a_calculation(site, signed_in):
+    form = dict(zip(ENERGY_USE_FIELDS, INPUTS[0]))
+    assert signed_in.post('/energy-use', data=form).status_code == 200
+    [row] = signed_in.get('/energy-use/history').get_json()['calculations']
+    assert {field: row[field] for field in ENERGY_USE_FIELDS} == form
+
+
+@pytest.mark.parametrize('query', ['start=yesterday', 'end=2024-13-01', 'limit=lots', 'limit=0', 'limit=-5'])
+def test_bad_ranges_are_400(signed_in, query):
+    assert signed_in.get(f'/energy-use/history?{query}').status_code == 400
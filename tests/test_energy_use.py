@@ -0,0 +1,82 @@
+import csv
+
+import numpy as np
+import pytest
+
+from app import config
+from app.services.calculator import EnergyCalculator
+from app.services.energy_use import ELECTRICITY_UNIT_RATE, ENERGY_USE_FIELDS, EnergyUse, EnergyUseBatch
+from app.services.tariffs import get_tariff
+
+
+def test_cost_savings_default_to_the_flat_unit_rate():
+    assert EnergyUse(10, 20, 5, 3, 100).cost_savings() == pytest.approx(20 * ELECTRICITY_UNIT_RATE)
+    batch = EnergyUseBatch([10], [20], [5], [3], [100])
+    assert batch.gather_data()['cost_savings'][0] == round(20 * ELECTRICITY_UNIT_RATE, 2)
+
+
+def test_the_default_tariff_prices_like_the_dashboard():
+    use = EnergyUse(10, 20, 5, 3, 100, tariff=get_tariff())
+    dashboard = EnergyCalculator().metrics_from_totals(
+        {'solar_production': 20, 'consumption': 25, 'grid_import': 10, 'grid_export': 5})
+    assert use.gather_data()['cost_savings'] == dashboard.cost_savings
+    assert get_tariff(config.DEFAULT_TARIFF).average_import_rate == config.GRID_RATE
+
+
+def test_time_of_use_tariffs_price_at_their_average_rate():
+    tariff = get_tariff('economy7')
+    rates = [rate for *_, rate in config.TARIFFS['economy7']['import']]
+    assert min(rates) < tariff.average_import_rate < max(rates)
+    assert EnergyUse(10, 20, 5, 3, 100, tariff=tariff).cost_savings() == pytest.approx(20 * tariff.average_import_rate)
+    batch = EnergyUseBatch([10], [20], [5], [3], [100], tariff=tariff)
+    assert batch.gather_data()['cost_savings'][0] == round(20 * tariff.average_import_rate, 2)
+
+
+def random_inputs(count=500):
+    rng = np.random.default_rng(20)
+    columns = [rng.uniform(0, 500, count).round(1) for _ in range(5)]
+    for column in columns:
+        column[rng.random(count) < 0.1] = 0  # Plenty of zero denominators
+    return columns
+
+
+def test_batch_matches_energy_use_row_by_row():
+    columns = random_inputs()
+    batch = EnergyUseBatch(*columns).gather_data()
+    for row, values in enumerate(zip(*columns)):
+        single = EnergyUse(*(float(value) for value in values)).gather_data()
+        for field, expected in single.items():
+            assert batch[field][row] == expected, (row, field)
+
+
+def test_csv_round_trip_matches_energy_use():
+    columns = random_inputs(50)
+    lines = ['id,' + ','.join(ENERGY_USE_FIELDS)] + [f'home "{i}",' + ','.join(map(str, row))
+                                                     for i, row in enumerate(zip(*columns))]
+    batch = EnergyUseBatch.from_csv(lines)
+    output = list(csv.DictReader(''.join(batch.iter_csv(chunk_rows=7)).splitlines()))
+    assert [row['id'] for row in output] == [f'home "{i}"' for i in range(50)]
+    for row, values in zip(output, zip(*columns)):
+        single = EnergyUse(*(float(value) for value in values)).gather_data()
+        for field, expected in single.items():
+            assert float(row[field]) == pytest.approx(expected, abs=0.005)
+
+
+def test_bad_csv_is_rejected():
+    with pytest.raises(ValueError):
+        EnergyUseBatch.from_csv(['grid_import_kwh,solar_generation_kwh'])
+    with pytest.raises(ValueError):
+        EnergyUseBatch.from_csv([','.join(ENERGY_USE_FIELDS), '1,2,x,4,5'])
+
+
+@pytest.mark.parametrize('body', [list(ENERGY_USE_FIELDS), 'grid_import_kwh', 5, None])
+def test_batch_endpoint_needs_a_json_object(signed_in, body):
+    response = signed_in.post('/energy-use/batch', json=body)
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Invalid energy use data'
+
+
+def test_batch_endpoint_streams_csv(signed_in):
+    response = signed_in.post('/energy-use/batch', json={field: [1, 2] for field in ENERGY_USE_FIELDS})
+    assert response.status_code == 200
+    assert len(response.get_data(as_text=True).splitlines()) == 3
@@ -0,0 +1,37 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from app.services.ev_scheduler import EVScheduler, surplus_forecast
+from app.services.reading_store import ReadingStore
+
+
+def test_no_slots_gives_an_empty_plan():
+    scheduler = EVScheduler()
+    now = datetime(2024, 6, 1, 12, 7)
+    slots = scheduler.slots(now, datetime(2024, 6, 1, 12))
+    assert not len(slots)
+    assert not len(surplus_forecast(ReadingStore(), slots, scheduler.slot_minutes))
+    plan = scheduler.plan(slots, np.zeros(0), 20.0, np.empty(0))
+    assert plan.energy_needed == 20.0
+    assert plan.energy_planned == 0.0
+    assert plan.sessions == []
+
+
+def test_schedule_plans_up_to_the_target(api):
+    response = api.get('/api/ev-charging/schedule?level=10&target=30&hours=12')
+    assert response.status_code == 200
+    plan = response.get_json()['plan']
+    assert plan['energy_needed'] == 20.0
+    assert plan['energy_planned'] == pytest.approx(20.0)
+
+
+@pytest.mark.parametrize('query', [
+    'hours=-1', 'hours=0', 'hours=abc', 'hours=1000', 'hours=nan',
+    'level=abc', 'level=-5', 'target=1e9', 'target=',
+])
+def test_bad_schedule_parameters_are_400(api, query):
+    response = api.get(f'/api/ev-charging/schedule?{query}')
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
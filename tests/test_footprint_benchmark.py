@@ -0,0 +1,102 @@
+import threading
+import uuid
+
+from sqlalchemy import update
+
+from app import db, models
+from app.models import FOOTPRINT_BENCHMARKS, FOOTPRINT_BENCHMARK_MIN_USERS, FootprintBenchmark, User
+from app.services.quantile_sketch import KLLSketch
+
+
+def footprint(total):
+    return {'total': total, 'breakdown': {'food': total / 4, 'travel': total / 4, 'home': total / 4,
+                                          'stuff': total / 4}}
+
+
+def stored(site):
+    with site.app_context():
+        return {row.category: row for row in FootprintBenchmark.query}
+
+
+def reset(site):
+    with site.app_context():
+        FootprintBenchmark.query.delete()
+        db.session.commit()
+
+
+def test_percentiles_appear_once_there_are_enough_footprints(site):
+    reset(site)
+    with site.app_context():
+        for total in range(1, FOOTPRINT_BENCHMARK_MIN_USERS):
+            assert FootprintBenchmark.record(footprint(total * 1000))['total'] is None
+        benchmarks = FootprintBenchmark.record(footprint(5500))
+    assert benchmarks['total'] == {'percentile': 55, 'median': 5000, 'users': FOOTPRINT_BENCHMARK_MIN_USERS}
+    assert stored(site)['total'].version == FOOTPRINT_BENCHMARK_MIN_USERS
+
+
+def test_simultaneous_submissions_are_all_counted(site):
+    reset(site)
+    threads, per_thread = 8, 10
+    start = threading.Barrier(threads)
+    errors = []
+
+    def submit(number):
+        try:
+            with site.app_context():
+                start.wait()  # Every thread's first submission races to create the rows
+                for i in range(per_thread):
+                    FootprintBenchmark.record(footprint(number * 100 + i))
+        except Exception as exc:
+            errors.append(exc)
+
+    workers = [threading.Thread(target=submit, args=(number,)) for number in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert errors == []
+    rows = stored(site)
+    assert set(rows) == set(FOOTPRINT_BENCHMARKS)
+    for row in rows.values():
+        assert row.sketch['count'] == threads * per_thread
+        assert row.version == threads * per_thread
+
+
+def test_a_lost_race_keeps_the_callers_pending_changes(site, monkeypatch):
+    reset(site)
+    with site.app_context():
+        FootprintBenchmark.record(footprint(1000))
+    # The first time a sketch is read, bump its version as another submission would
+    from_dict = KLLSketch.from_dict
+    raced = []
+
+    def read_then_race(data):
+        if not raced:
+            raced.append(True)
+            db.session.execute(update(FootprintBenchmark).values(version=FootprintBenchmark.version + 1))
+        return from_dict(data)
+
+    monkeypatch.setattr(KLLSketch, 'from_dict', staticmethod(read_then_race))
+    email = f'{uuid.uuid4()}@example.com'
+    with site.app_context():
+        db.session.add(User(email=email))
+        FootprintBenchmark.record(footprint(3000))
+    assert raced
+    with site.app_context():
+        assert User.query.filter_by(email=email).count() == 1
+    assert stored(site)['total'].sketch['count'] == 2
+
+
+def test_busy_sketches_still_compare_with_what_is_stored(site, monkeypatch, caplog):
+    reset(site)
+    with site.app_context():
+        for total in range(FOOTPRINT_BENCHMARK_MIN_USERS):
+            FootprintBenchmark.record(footprint(total * 1000))
+    monkeypatch.setattr(models, 'FOOTPRINT_BENCHMARK_TIMEOUT', 0)
+    monkeypatch.setattr(FootprintBenchmark, '_merge', classmethod(lambda cls, submitted: None))
+    with site.app_context():
+        benchmarks = FootprintBenchmark.record(footprint(4500))
+    assert benchmarks['total'] == {'percentile': 50, 'median': 4000, 'users': FOOTPRINT_BENCHMARK_MIN_USERS}
+    assert stored(site)['total'].sketch['count'] == FOOTPRINT_BENCHMARK_MIN_USERS
+    assert any(record.name == 'app.models' and record.levelname == 'WARNING' for record in caplog.records)
@@ -0,0 +1,40 @@
+import pytest
+
+from app.services.carbon_footprint import MockDataProvider
+
+
+def questionnaire(**changes):
+    """The mock questionnaire with some answers replaced, e.g. food={'diet_type': 'Vegan'}"""
+    data = MockDataProvider.get_mock_data()
+    for category, answers in changes.items():
+        data[category] = {**data[category], **answers}
+    return data
+
+
+def test_what_ifs_for_a_valid_questionnaire(client):
+    response = client.post('/carbon-footprint/sensitivity', json=questionnaire())
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['success'] and body['total'] > 0
+    diet = next(question for question in body['questions'] if question['field'] == 'diet')
+    assert diet['current'] == 'Meat in some meals'
+    assert all(alternative['answer'] != diet['current'] for alternative in diet['alternatives'])
+
+
+@pytest.mark.parametrize('data', [
+    questionnaire(food={'diet_type': ['Vegan']}),
+    questionnaire(food={'diet_type': 'Carnivore'}),
+    questionnaire(travel={'flights': {'domestic': 'abc'}}),
+    questionnaire(travel={'flights': [1]}),
+    questionnaire(travel={'flights': {'europe': -1}}),
+    questionnaire(travel={'flights': {'long_haul': True}}),
+    questionnaire(home={'improvements': 'Loft insulation'}),
+    questionnaire(stuff={'recycling': ['Uranium']}),
+    questionnaire(home={'bedrooms': None}),
+    {'food': []},
+    [],
+])
+def test_answers_the_form_could_not_send_are_rejected(client, data):
+    response = client.post('/carbon-footprint/sensitivity', json=data)
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
@@ -0,0 +1,19 @@
+import pytest
+
+from app import config
+
+
+def test_forecast_covers_the_requested_hours(api):
+    response = api.get('/api/forecast?hours=48')
+    assert response.status_code == 200
+    data = response.get_json()
+    assert len(data['forecast']) == 48
+    assert data['totals']['consumption'] == pytest.approx(
+        sum(hour['consumption'] for hour in data['forecast']), abs=0.5)
+
+
+@pytest.mark.parametrize('hours', ['abc', '1.5', '0', '-3', str(config.FORECAST_MAX_HOURS + 1), '10000000000'])
+def test_bad_forecast_hours_are_400(api, hours):
+    response = api.get(f'/api/forecast?hours={hours}')
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
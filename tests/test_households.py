@@ -0,0 +1,26 @@
+import importlib
+import uuid
+
+import pytest
+
+
+def test_bulk_upload_does_not_create_partitions(api):
+    households = importlib.import_module('app.app').households
+    public_id = str(uuid.uuid4())
+    response = api.post(f'/api/readings/bulk?household={public_id}', data=b'{}\n',
+                        headers={'Content-Type': 'application/x-ndjson'})
+    assert response.status_code == 404
+    assert response.get_json()['success'] is False
+    assert not households.exists(public_id)
+
+
+def test_malformed_household_ids_are_not_found(api):
+    response = api.get('/api/dashboard?household=../../etc')
+    assert response.status_code == 404
+
+
+@pytest.mark.parametrize('days', ['abc', '0', '-3', '2.5', '100000'])
+def test_fleet_chart_days_must_be_a_whole_number_in_range(api, days):
+    response = api.get(f'/api/fleet/energy-balance?days={days}')
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Invalid days'
@@ -0,0 +1,109 @@
+import json
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from app.services import columnar
+from app.services.ingest import ReadingIngestor
+from app.services.reading_store import ReadingStore, TIMESTAMP_DTYPE
+
+
+def ndjson(rows):
+    return [line.encode() for line in rows]
+
+
+def reading(minutes, consumption=2.0):
+    timestamp = datetime(2024, 1, 1) + timedelta(minutes=minutes)
+    return json.dumps({'timestamp': timestamp.isoformat(), 'solar_production': 1.0,
+                       'consumption': consumption, 'grid_import': consumption - 1.0, 'grid_export': 0.0})
+
+
+def body():
+    """10 rows: 2 unreadable, 1 that doesn't balance, 7 good"""
+    rows = [reading(15 * i) for i in range(10)]
+    rows[2] = '{"timestamp": "2024-01-01T00:30:00"'
+    rows[6] = 'not json'
+    rows[8] = reading(120, consumption=-5)
+    return rows
+
+
+def test_counts_match_the_rows_sent():
+    result = ReadingIngestor(batch_size=3).ingest_ndjson(ndjson(body()), ReadingStore())
+    assert (result.processed, result.accepted, result.rejected) == (10, 7, 3)
+    assert sorted(error['row'] for error in result.errors) == [2, 6, 8]
+
+
+def test_retry_after_backpressure_counts_every_row_once():
+    ingestor = ReadingIngestor(batch_size=3, max_pending=1, wait_seconds=0)
+    store = ReadingStore()
+    rows = body()
+
+    # The first batch gets through, then writes are busy
+    original = ingestor._slots.acquire
+    calls = []
+
+    def busy_after_first(timeout=None):
+        calls.append(1)
+        return len(calls) == 1 and original(timeout=timeout)
+
+    ingestor._slots.acquire = busy_after_first
+    first = ingestor.ingest_ndjson(ndjson(rows), store)
+    assert first.throttled
+    ingestor._slots.acquire = original
+
+    retry = ingestor.ingest_ndjson(ndjson(rows[first.resume_from:]), store)
+    assert not retry.throttled
+    assert first.processed + retry.processed == len(rows)
+    assert first.accepted + retry.accepted == 7 == len(store)
+    assert first.rejected + retry.rejected == 3
+
+
+def test_bulk_upload_with_nothing_accepted_is_422(api):
+    response = api.post('/api/readings/bulk', data='not json\n{}\n',
+                         headers={'Content-Type': 'application/x-ndjson'})
+    assert response.status_code == 422
+    data = response.get_json()
+    assert data['success'] is False
+    assert (data['accepted'], data['rejected']) == (0, 2)
+
+
+def test_resending_a_batch_stores_it_once():
+    ingestor, store = ReadingIngestor(batch_size=4), ReadingStore()
+    first = ingestor.ingest_ndjson(ndjson(body()), store)
+    retry = ingestor.ingest_ndjson(ndjson(body()), store)
+    assert (first.accepted, first.duplicates) == (7, 0)
+    assert (retry.processed, retry.accepted, retry.rejected, retry.duplicates) == (10, 0, 3, 7)
+    assert len(store) == 7
+
+
+def test_repeated_timestamps_in_one_batch_are_stored_once():
+    result = ReadingIngestor().ingest_ndjson(ndjson([reading(0), reading(0, consumption=3.0), reading(15)]), ReadingStore())
+    assert (result.accepted, result.duplicates) == (2, 1)
+
+
+def test_retried_upload_is_not_counted_twice(api):
+    rows = '\n'.join(reading(60 * 24 * 365 * -3 + 15 * i) for i in range(4))
+    headers = {'Content-Type': 'application/x-ndjson'}
+    first = api.post('/api/readings/bulk', data=rows, headers=headers)
+    retry = api.post('/api/readings/bulk', data=rows, headers=headers)
+    assert first.status_code == retry.status_code == 200
+    assert first.get_json()['accepted'] == 4
+    assert (retry.get_json()['accepted'], retry.get_json()['duplicates']) == (0, 4)
+
+
+def frame(**overrides):
+    timestamps = np.array(['2024-01-01T00:00', '2024-01-01T00:15'], dtype=TIMESTAMP_DTYPE)
+    columns = {'timestamp': timestamps, 'solar_production': np.ones(2), 'consumption': np.full(2, 2.0),
+               'grid_import': np.ones(2), 'grid_export': np.zeros(2)}
+    return columnar.encode_frame({**columns, **overrides})
+
+
+@pytest.mark.parametrize('overrides', [
+    {'timestamp': np.array([1.7e9, 1.7e9 + 900])},
+    {'consumption': np.array(['2024-01-01', '2024-01-02'], dtype='datetime64[us]')},
+])
+def test_frames_with_the_wrong_column_types_are_400(api, overrides):
+    response = api.post('/api/readings/bulk', data=frame(**overrides), headers={'Content-Type': columnar.MEDIA_TYPE})
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Invalid frame'
@@ -0,0 +1,54 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from app import config
+from app.services.data_generator import EnergyDataGenerator
+from app.services.insights import InsightsEngine
+from app.services.reading_store import READING_FIELDS, ReadingStore, ReadingWindow
+
+END = datetime(2024, 6, 10, 18, 30)
+
+
+@pytest.fixture(scope='module')
+def readings():
+    return EnergyDataGenerator(seed=11).generate_historical_data(days=5, end=END)
+
+
+def test_running_stats_match_a_full_scan(readings):
+    store = ReadingStore()
+    engine = InsightsEngine()
+    engine.attach(store)
+    # Fed in shuffled batches, so days are split across batches and arrive out of order
+    order = np.random.default_rng(3).permutation(len(readings))
+    for part in np.array_split(order, 9):
+        store.extend_arrays(readings.timestamps[part], **{f: readings.column(f)[part] for f in READING_FIELDS})
+
+    days = readings.timestamps.astype('datetime64[D]')
+    assert sorted(engine.days) == sorted(set(days.tolist()))
+    for day, stats in engine.days.items():
+        mask = days == np.datetime64(day)
+        assert stats.count == mask.sum()
+        for field in READING_FIELDS:
+            values = readings.column(field)[mask]
+            assert stats.mean(field) == pytest.approx(values.mean())
+            assert stats.std(field) == pytest.approx(values.std())
+            assert stats.minimum(field) == values.min()
+            assert stats.maximum(field) == values.max()
+        hours = readings.timestamps[mask].astype('datetime64[h]').astype(int) % 24
+        in_peak = (hours >= config.PEAK_HOURS_START) & (hours < config.PEAK_HOURS_END)
+        consumption = readings.consumption[mask]
+        assert stats.peak_share == pytest.approx(consumption[in_peak].sum() / consumption.sum())
+
+
+def test_rules_see_the_same_day_however_readings_arrive(readings):
+    whole, batched = InsightsEngine(), InsightsEngine()
+    whole.add(readings)
+    for part in np.array_split(np.arange(len(readings))[::-1], 4):
+        batched.add(ReadingWindow(readings.timestamps[part], *(readings.column(f)[part] for f in READING_FIELDS)))
+    assert batched.evaluate(END) == whole.evaluate(END)
+
+
+def test_no_readings_today_is_reported():
+    assert InsightsEngine().evaluate(END)[0]['title'] == 'No Data'
@@ -0,0 +1,44 @@
+import importlib
+import threading
+
+import pytest
+
+from app.services.live_feed import LiveFeed, LiveFeedFull
+
+
+def test_subscribers_are_capped_and_slots_are_freed():
+    feed = LiveFeed(lambda: {'value': 1}, interval=60, max_subscribers=2)
+    first, second = feed.subscribe(), feed.subscribe()
+    with pytest.raises(LiveFeedFull):
+        feed.subscribe()
+    feed.unsubscribe(first)
+    feed.subscribe()
+    assert feed.subscriber_count == 2
+
+
+def test_stream_answers_503_when_full(api, monkeypatch):
+    dashboard_module = importlib.import_module('app.app')
+    monkeypatch.setattr(dashboard_module.live_feed, 'max_subscribers', 0)
+    response = api.get('/api/stream')
+    assert response.status_code == 503
+    assert response.get_json()['success'] is False
+    assert 'Retry-After' in response.headers
+
+
+def test_producer_failures_are_logged_with_the_traceback(caplog):
+    tried = threading.Event()
+
+    def broken():
+        tried.set()
+        raise RuntimeError('meter offline')
+
+    feed = LiveFeed(broken, interval=60)
+    subscriber = feed.subscribe()
+    assert tried.wait(timeout=5)
+    thread = feed._thread
+    feed.unsubscribe(subscriber)
+    feed.poke()
+    thread.join(timeout=5)
+    [record] = [record for record in caplog.records if record.name == 'app.services.live_feed']
+    assert record.levelname == 'ERROR'
+    assert record.exc_info[1].args == ('meter offline',)
@@ -0,0 +1,61 @@
+import random
+from bisect import bisect_left, bisect_right
+
+from app.services.quantile_sketch import DEFAULT_K, KLLSketch
+
+# Rank error the sketch promises (module docstring: about 1.7 / k), with some room for bad luck
+RANK_ERROR = 2 / DEFAULT_K
+
+
+def true_rank(ordered, value):
+    return (bisect_left(ordered, value) + bisect_right(ordered, value)) / 2 / len(ordered)
+
+
+def max_rank_error(sketch, values):
+    ordered = sorted(values)
+    probes = ordered[::max(1, len(ordered) // 500)]
+    return max(abs(sketch.rank(value) - true_rank(ordered, value)) for value in probes)
+
+
+def test_ranks_are_within_the_error_bound():
+    rng = random.Random(25)
+    values = [rng.lognormvariate(8, 0.6) for _ in range(50_000)]
+    sketch = KLLSketch(seed=1)
+    for value in values:
+        sketch.update(value)
+    assert sketch.count == len(values)
+    assert max_rank_error(sketch, values) < RANK_ERROR
+    # And it stays small: far fewer values kept than went in
+    assert sum(len(level) for level in sketch.levels) < 4 * DEFAULT_K
+
+
+def test_merged_sketches_describe_both_streams():
+    rng = random.Random(26)
+    parts = [[rng.gauss(mean, 500) for _ in range(10_000)] for mean in (4000, 9000, 15000)]
+    merged = KLLSketch(seed=2)
+    for seed, values in enumerate(parts):
+        sketch = KLLSketch(seed=seed + 10)
+        for value in values:
+            sketch.update(value)
+        merged.merge(sketch)
+    everything = [value for values in parts for value in values]
+    assert merged.count == len(everything)
+    assert max_rank_error(merged, everything) < RANK_ERROR
+
+
+def test_small_sketches_are_exact():
+    sketch = KLLSketch()
+    for value in [5, 1, 3, 3, 9]:
+        sketch.update(value)
+    assert sketch.rank(3) == 0.4
+    assert sketch.quantile(0.5) == 3
+    assert KLLSketch().quantile(0.5) is None
+
+
+def test_dict_round_trip():
+    sketch = KLLSketch(seed=3)
+    for value in range(5000):
+        sketch.update(value)
+    copy = KLLSketch.from_dict(sketch.to_dict())
+    assert copy.count == sketch.count
+    assert copy.quantile(0.9) == sketch.quantile(0.9)
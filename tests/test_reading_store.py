@@ -0,0 +1,101 @@
+import threading
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from app.services.reading_store import READING_FIELDS, MappedReadingStore, TIMESTAMP_DTYPE
+
+
+def readings(start, count, minutes=15):
+    timestamps = (np.datetime64(start, 'us') + np.arange(count) * np.timedelta64(minutes, 'm')).astype(TIMESTAMP_DTYPE)
+    values = np.arange(count, dtype=np.float64)
+    return timestamps, {field: values + i for i, field in enumerate(READING_FIELDS)}
+
+
+def test_mapped_store_round_trips_and_merges_late_readings(tmp_path):
+    store = MappedReadingStore.open(str(tmp_path))
+    timestamps, columns = readings(datetime(2024, 1, 1), 100)
+    store.extend_arrays(timestamps[50:], **{f: v[50:] for f, v in columns.items()})
+    store.extend_arrays(timestamps[:50], **{f: v[:50] for f, v in columns.items()})
+
+    reopened = MappedReadingStore.open(str(tmp_path))
+    assert np.array_equal(reopened.timestamps, timestamps)
+    for field in READING_FIELDS:
+        assert np.array_equal(reopened.column(field), columns[field])
+    assert reopened.count(datetime(2024, 1, 1, 1), datetime(2024, 1, 1, 2)) == 4
+
+
+def test_listeners_are_never_called_from_two_threads_at_once(tmp_path):
+    store = MappedReadingStore.open(str(tmp_path))
+    active, overlaps, received = [0], [], []
+    lock = threading.Lock()
+
+    def listener(window, reset=False):
+        with lock:
+            active[0] += 1
+            overlaps.append(active[0] > 1)
+        received.append(len(window))
+        threading.Event().wait(0.001)
+        with lock:
+            active[0] -= 1
+
+    store.subscribe(listener)
+
+    def writer(offset):
+        for batch in range(10):
+            start = datetime(2024, 1, 1) + timedelta(days=offset * 10 + batch)
+            timestamps, columns = readings(start, 24)
+            store.extend_arrays(timestamps, **columns)
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not any(overlaps)
+    assert len(store) == 4 * 10 * 24
+    window = store.all()
+    assert all(len(window.column(field)) == len(window) for field in READING_FIELDS)
+
+
+def recorder(store):
+    """Subscribe to `store`, returning the list of (timestamps, reset) it gets told about"""
+    calls = []
+    store.subscribe(lambda window, reset=False: calls.append((window.timestamps.copy(), reset)))
+    return calls
+
+
+def test_late_readings_are_passed_on_alone(tmp_path):
+    store = MappedReadingStore.open(str(tmp_path))
+    timestamps, columns = readings(datetime(2024, 1, 1), 100)
+    on_time = np.r_[0:40, 60:100]
+    store.extend_arrays(timestamps[on_time], **{f: v[on_time] for f, v in columns.items()})
+    other = MappedReadingStore.open(str(tmp_path))  # Another process, mapping the same files
+    calls, other_calls = recorder(store), recorder(other)
+
+    store.extend_arrays(timestamps[40:60], **{f: v[40:60] for f, v in columns.items()})
+    store.extend_arrays(timestamps[-1:] + np.timedelta64(15, 'm'), **{f: v[:1] for f, v in columns.items()})
+    assert [(list(seen), reset) for seen, reset in calls] == [
+        (list(timestamps[40:60]), False), (list(timestamps[-1:] + np.timedelta64(15, 'm')), False)]
+
+    # The other process catches up on the merge and the append after it in one go
+    assert other.refresh()
+    [(seen, reset)] = other_calls
+    assert not reset
+    assert list(seen) == list(timestamps[40:60]) + list(timestamps[-1:] + np.timedelta64(15, 'm'))
+    assert np.array_equal(other.timestamps, store.timestamps)
+
+
+def test_a_process_two_merges_behind_starts_over(tmp_path):
+    store = MappedReadingStore.open(str(tmp_path))
+    timestamps, columns = readings(datetime(2024, 1, 1), 30)
+    store.extend_arrays(timestamps[20:], **{f: v[20:] for f, v in columns.items()})
+    other = MappedReadingStore.open(str(tmp_path))
+    other_calls = recorder(other)
+
+    store.extend_arrays(timestamps[10:20], **{f: v[10:20] for f, v in columns.items()})
+    store.extend_arrays(timestamps[:10], **{f: v[:10] for f, v in columns.items()})
+    assert other.refresh()
+    [(seen, reset)] = other_calls
+    assert reset and np.array_equal(seen, timestamps)
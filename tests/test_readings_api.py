@@ -0,0 +1,16 @@
+import pytest
+
+
+def test_readings_are_valid_json(api):
+    response = api.get('/api/readings?hours=6')
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['success'] is True
+    assert data['count'] == len(data['readings'])
+
+
+@pytest.mark.parametrize('hours', ['abc', 'nan', 'inf', '1e20', '0', '-5', str(31 * 24 + 1)])
+def test_hours_must_be_a_positive_number_in_range(api, hours):
+    response = api.get(f'/api/readings?hours={hours}')
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Invalid hours'
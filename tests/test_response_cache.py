@@ -0,0 +1,66 @@
+import importlib
+import uuid
+from datetime import datetime, timedelta
+
+from app.services.reading_store import ReadingWindow
+
+
+def test_repeat_requests_are_served_from_the_cache(api):
+    first = api.get('/api/dashboard?period=week')
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+
+    cache = importlib.import_module('app.app').response_cache
+    hits = cache.hits
+    second = api.get('/api/dashboard?period=week')
+    assert cache.hits == hits + 1
+    assert second.get_data() == first.get_data()
+    assert second.headers['ETag'] == etag
+
+
+def test_matching_etag_gets_an_empty_304(api):
+    etag = api.get('/api/consumption-breakdown').headers['ETag']
+    response = api.get('/api/consumption-breakdown', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.get_data() == b''
+    assert response.headers['ETag'] == etag
+
+    stale = api.get('/api/consumption-breakdown', headers={'If-None-Match': '"something-else"'})
+    assert stale.status_code == 200
+
+
+def test_new_readings_invalidate_cached_responses(api):
+    module = importlib.import_module('app.app')
+    api.get('/api/dashboard?period=all')
+    add_reading(module.historical_readings)
+
+    misses = module.response_cache.misses
+    api.get('/api/dashboard?period=all')
+    assert module.response_cache.misses == misses + 1
+
+
+def add_reading(store):
+    timestamp = datetime.now() - timedelta(seconds=1)
+    if store.last_timestamp and timestamp <= store.last_timestamp:
+        timestamp = store.last_timestamp + timedelta(seconds=1)
+    store.extend(ReadingWindow([timestamp], [1.0], [2.0], [1.0], [0.0]))
+
+
+def test_new_readings_only_invalidate_their_own_household(api):
+    module = importlib.import_module('app.app')
+    cache = module.response_cache
+    home_a, home_b = (module.households.get(str(uuid.uuid4()), create=True) for _ in range(2))
+    add_reading(home_a.store)
+    add_reading(home_b.store)
+
+    api.get(f'/api/dashboard?period=all&household={home_a.public_id}')
+    api.get(f'/api/dashboard?period=all&household={home_b.public_id}')
+    api.get('/api/fleet/summary?period=all')
+    add_reading(home_a.store)
+
+    hits = cache.hits
+    api.get(f'/api/dashboard?period=all&household={home_b.public_id}')
+    assert cache.hits == hits + 1
+    api.get(f'/api/dashboard?period=all&household={home_a.public_id}')
+    api.get('/api/fleet/summary?period=all')
+    assert cache.hits == hits + 1
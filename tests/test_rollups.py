@@ -0,0 +1,58 @@
+import random
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from app.services.calculator import EnergyCalculator
+from app.services.data_generator import EnergyDataGenerator
+from app.services.reading_store import READING_FIELDS, ReadingStore
+from app.services.rollups import ROLLUP_PERIODS, RollupTiers
+
+END = datetime(2024, 3, 15, 13, 7)
+
+
+@pytest.fixture(scope='module')
+def rolled_up():
+    window = EnergyDataGenerator(seed=4).generate_historical_data(days=60, end=END)
+    store = ReadingStore()
+    tiers = RollupTiers()
+    tiers.attach(store)
+    # Fed in batches, with some late readings merged back in
+    late = np.zeros(len(window), dtype=bool)
+    late[1000:1200] = True
+    for part in np.array_split(np.flatnonzero(~late), 7):
+        store.extend_arrays(window.timestamps[part], **{f: window.column(f)[part] for f in READING_FIELDS})
+    index = np.flatnonzero(late)
+    store.extend_arrays(window.timestamps[index], **{f: window.column(f)[index] for f in READING_FIELDS})
+    return store, tiers
+
+
+def random_ranges(count=40):
+    rng = random.Random(7)
+    first = END - timedelta(days=62)
+    for _ in range(count):
+        start = first + timedelta(minutes=rng.randrange(65 * 24 * 60))
+        yield start, start + timedelta(minutes=rng.randrange(1, 30 * 24 * 60))
+
+
+def test_energy_totals_match_a_full_scan(rolled_up):
+    store, tiers = rolled_up
+    calculator = EnergyCalculator()
+    for start, end in [(None, None)] + list(random_ranges()):
+        expected = calculator.energy_totals(store.range(start, end))
+        actual = tiers.energy_totals(start, end)
+        for field in READING_FIELDS:
+            assert actual[field] == pytest.approx(expected[field], rel=1e-9, abs=1e-9)
+
+
+@pytest.mark.parametrize('period', ROLLUP_PERIODS)
+def test_bucket_totals_match_a_full_scan(rolled_up, period):
+    store, tiers = rolled_up
+    calculator = EnergyCalculator()
+    for start, end in random_ranges(15):
+        expected_starts, expected = calculator.bucket_totals(store.range(start, end), period)
+        starts, totals = tiers.bucket_totals(period, start, end)
+        assert np.array_equal(starts, expected_starts.astype(starts.dtype))
+        for field in READING_FIELDS:
+            np.testing.assert_allclose(totals[field], expected[field], rtol=1e-9, atol=1e-9)
@@ -0,0 +1,66 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from app import config
+from app.services.data_generator import EnergyDataGenerator
+from app.services.reading_store import READING_FIELDS, ReadingStore
+from app.services.solar_sizing import SolarSizing, SolarSizingCache
+from app.services.tariffs import get_tariff
+
+INTERVAL_HOURS = config.READING_INTERVAL_MINUTES / 60
+
+
+@pytest.fixture(scope='module')
+def readings():
+    return EnergyDataGenerator(seed=21).generate_historical_data(days=4, end=datetime(2024, 7, 2, 9))
+
+
+@pytest.mark.parametrize('tariff', ['flat', 'economy7'])
+def test_totals_match_rescaling_every_reading(readings, tariff):
+    tariff = get_tariff(tariff)
+    sizing = SolarSizing(readings, INTERVAL_HOURS, tariff)
+    factors = np.array([0.0, 0.3, 1.0, 1.7, 4.0])
+    totals = sizing.totals(factors)
+
+    consumption = readings.consumption * INTERVAL_HOURS
+    solar = readings.solar_production * INTERVAL_HOURS
+    import_rates, export_rates = tariff.rates(readings.timestamps)
+    for i, factor in enumerate(factors):
+        net = consumption - factor * solar
+        imported, exported = np.maximum(net, 0), np.maximum(-net, 0)
+        assert totals['solar_production'][i] == pytest.approx(factor * solar.sum())
+        assert totals['grid_import'][i] == pytest.approx(imported.sum())
+        assert totals['grid_export'][i] == pytest.approx(exported.sum(), abs=1e-9)
+        assert totals['import_cost'][i] == pytest.approx(import_rates @ imported)
+        assert totals['export_revenue'][i] == pytest.approx(export_rates @ exported, abs=1e-9)
+        assert totals['cost_without_solar'][i] == pytest.approx(import_rates @ consumption)
+
+
+def test_the_installed_size_saves_what_solar_saved(readings):
+    sizing = SolarSizing(readings, INTERVAL_HOURS, get_tariff('flat'))
+    none, installed = sizing.scenarios([0, config.MAX_SOLAR_CAPACITY], config.MAX_SOLAR_CAPACITY)
+    assert none.to_dict()['savings'] == 0
+    assert installed.to_dict()['solar_production'] == round(float(readings.solar_production.sum() * INTERVAL_HOURS), 2)
+
+
+def test_cached_tables_are_rebuilt_after_new_readings(readings):
+    store = ReadingStore()
+    cache = SolarSizingCache(history_days=10000)
+    cache.attach(store)
+    half = len(readings) // 2
+    store.extend_arrays(readings.timestamps[:half], **{f: readings.column(f)[:half] for f in READING_FIELDS})
+    tariff = get_tariff('flat')
+    first = cache.get(tariff)
+    assert cache.get(tariff) is first
+
+    store.extend_arrays(readings.timestamps[half:], **{f: readings.column(f)[half:] for f in READING_FIELDS})
+    assert cache.get(tariff) is not first
+    assert cache.get(tariff).days > first.days
+
+
+def test_too_many_sizes_are_refused(api):
+    capacities = ','.join(['1'] * (config.SOLAR_SIZING_MAX_SIZES + 1))
+    response = api.get(f'/api/solar/sizing?capacities={capacities}')
+    assert response.status_code == 400
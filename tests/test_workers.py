@@ -0,0 +1,61 @@
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import config
+from app.services import workers
+from app.services.calculator import EnergyCalculator
+from app.services.data_generator import EnergyDataGenerator
+from app.services.households import HouseholdRegistry
+from app.services.reading_store import READING_FIELDS, MappedReadingStore
+
+
+@pytest.fixture(scope='module')
+def fleet(tmp_path_factory):
+    registry = HouseholdRegistry(str(tmp_path_factory.mktemp('fleet')))
+    ids = []
+    for index, window in EnergyDataGenerator(seed=9).iter_fleet(6, days=3, end=datetime(2024, 5, 1)):
+        ids.append(f'00000000-0000-4000-8000-{index:012d}')
+        MappedReadingStore.open(registry.path_for(ids[-1])).extend(window)
+    yield registry, ids
+    workers.reset_pool()
+
+
+def expected_totals(registry, ids, start, end):
+    calculator = EnergyCalculator()
+    totals = {field: 0.0 for field in READING_FIELDS}
+    for public_id in ids:
+        household = calculator.energy_totals(MappedReadingStore.open(registry.path_for(public_id)).range(start, end))
+        for field in READING_FIELDS:
+            totals[field] += household[field]
+    return totals
+
+
+def test_fleet_totals_in_the_pool_match_in_process(fleet, monkeypatch):
+    registry, ids = fleet
+    monkeypatch.setattr(config, 'FLEET_PARALLEL_THRESHOLD', 1)
+    monkeypatch.setattr(config, 'FLEET_WORKERS', 2)
+    start, end = datetime(2024, 4, 29), datetime(2024, 4, 30, 12)
+
+    totals, count = registry.fleet_totals(start=start, end=end)
+    expected = expected_totals(registry, ids, start, end)
+    assert count == len(ids)
+    for field in READING_FIELDS:
+        assert totals[field] == pytest.approx(expected[field])
+
+
+def test_a_broken_pool_is_replaced(fleet, monkeypatch):
+    registry, ids = fleet
+    monkeypatch.setattr(config, 'FLEET_PARALLEL_THRESHOLD', 1)
+    monkeypatch.setattr(config, 'FLEET_WORKERS', 2)
+
+    pool = workers.process_pool()
+    assert pool._mp_context.get_start_method() == 'spawn'
+    with pytest.raises(Exception):
+        pool.submit(os._exit, 1).result()
+
+    totals, count = registry.fleet_totals()
+    assert count == len(ids)
+    assert workers.process_pool() is not pool
+    assert totals['consumption'] == pytest.approx(expected_totals(registry, ids, None, None)['consumption'])